@@ -0,0 +1,460 @@
+"""Analyses the graph of the rooms of a world.
+
+A GraphAnalysis is attached to a world as a graph listener (see
+World.analysis) and keeps its own copy of the exits of every room indexed by
+room id.  It maintains incrementally, as exits are added and removed:
+
+* The connected components (ignoring the directions of the exits) in a
+  union-find structure.  Adding an exit unions two components; removing
+  one can split a component, so the structure is rebuilt on the next query.
+
+* The number of exits leading into every room.
+
+* The asymmetric exits: an exit from A to B in a direction while B has no
+  exit back to A in the opposite direction (Room.add_neighbor can create
+  them).
+
+The reachable rooms and the articulation rooms (the rooms whose removal
+disconnects their component) are computed on demand and cached until the
+next change.  Dead ends (rooms with a single exit) and orphans (rooms with
+no exits in or out) are found by scanning the exit tables.
+
+Example:
+
+    analysis = the_world.analysis
+    analysis.unreachable_from('theater')
+    analysis.summary('theater')
+"""
+
+import array
+import collections
+
+import impl.compact_world as compact_world
+
+# Aliases.
+NO_EXIT = compact_world.NO_EXIT
+
+# The number of sources whose reachable rooms are cached.
+REACHABLE_CACHE_SIZE = 4
+
+
+class GraphAnalysis:
+    """Maintains the analysis of the graph of a world.
+
+    :ivar World _world: The analysed world.
+    :ivar DirectionTable _directions: The directions of the world.
+    :ivar int _width: The number of directions.
+    :ivar dict _slots: Maps the directions to their slots.
+    :ivar tuple _opposite_slots: The slot of the opposite of each slot.
+    :ivar array _adjacency: _width slots per room id holding the id of the
+    neighbor in each direction or NO_EXIT.
+
+    :ivar array _in_degrees: The number of exits leading into each room.
+    :ivar array _parents: The union-find parent of each room id.
+    :ivar bool _components_stale: The union-find must be rebuilt.
+    :ivar set _asymmetric: The (room id, slot) pairs of the asymmetric exits.
+    :ivar OrderedDict _reachable: Caches the reachable room ids of the
+    REACHABLE_CACHE_SIZE most recently queried source room ids.
+    :ivar list _articulation: Caches the ids of the articulation rooms.
+    """
+
+    def __init__(self, world):
+        """Initializer.
+
+        Reads the exits of all the rooms once; call World.analysis rather
+        than creating an analysis so it is notified of the changes.
+
+        :param World world: The world to analyse.
+        """
+        self._world = world
+        self._directions = world.directions
+        self._width = world.directions.width
+        self._slots = world.directions.slots
+        self._opposite_slots = world.directions.opposite_slots
+        self._adjacency = array.array('i')
+        self._in_degrees = array.array('i')
+        self._parents = array.array('i')
+        self._components_stale = False
+        self._asymmetric = set()
+        self._reachable = collections.OrderedDict()
+        self._articulation = None
+        self._grow()
+        get_room_by_id = world.get_room_by_id
+        for room_id in range(len(world)):
+            for direction, neighbor in \
+                    get_room_by_id(room_id).neighbors.items():
+                if neighbor.room_id is None:
+                    continue
+                self._set_exit(room_id, self._slots[direction],
+                               neighbor.room_id)
+
+    def _grow(self):
+        """Extends the tables to the rooms added to the world."""
+        count = len(self._world)
+        known = len(self._parents)
+        if count > known:
+            self._adjacency.extend(
+                [NO_EXIT] * ((count - known) * self._width)
+            )
+            self._in_degrees.extend(bytes(4 * (count - known)))
+            self._parents.extend(range(known, count))
+
+    def _set_exit(self, room_id, slot, neighbor_id):
+        """Records the exit of a room.
+
+        :param int room_id: The id of the room.
+        :param int slot: The adjacency slot of the direction.
+        :param int neighbor_id: The id of the neighbor or NO_EXIT.
+        """
+        self._grow()
+        adjacency = self._adjacency
+        opposite_slots = self._opposite_slots
+        index = room_id * self._width + slot
+        previous_id = adjacency[index]
+        if previous_id == neighbor_id:
+            return
+        adjacency[index] = neighbor_id
+        if previous_id != NO_EXIT:
+            self._in_degrees[previous_id] -= 1
+            self._update_symmetry(previous_id, opposite_slots[slot])
+            self._components_stale = True
+        if neighbor_id != NO_EXIT:
+            self._in_degrees[neighbor_id] += 1
+            self._update_symmetry(neighbor_id, opposite_slots[slot])
+            if not self._components_stale:
+                self._union(room_id, neighbor_id)
+        self._update_symmetry(room_id, slot)
+        self._reachable.clear()
+        self._articulation = None
+
+    def _update_symmetry(self, room_id, slot):
+        """Checks if the exit of a room in a direction is asymmetric.
+
+        :param int room_id: The id of the room.
+        :param int slot: The adjacency slot of the direction.
+        """
+        adjacency = self._adjacency
+        width = self._width
+        neighbor_id = adjacency[room_id * width + slot]
+        if neighbor_id == NO_EXIT or adjacency[
+                neighbor_id * width + self._opposite_slots[slot]] == room_id:
+            self._asymmetric.discard((room_id, slot))
+        else:
+            self._asymmetric.add((room_id, slot))
+
+    def on_neighbor_added(self, the_room, direction, neighbor):
+        """Records a new exit.
+
+        The exits leading to rooms outside the world are ignored.
+
+        :param Room the_room: The room that got a new exit.
+        :param Direction direction: The direction of the exit.
+        :param Room neighbor: The room the exit leads to.
+        """
+        if neighbor.room_id is None:
+            return
+        self._set_exit(the_room.room_id, self._slots[direction],
+                       neighbor.room_id)
+
+    def on_neighbor_removed(self, the_room, direction, neighbor):
+        """Records a removed exit.
+
+        :param Room the_room: The room that lost an exit.
+        :param Direction direction: The direction of the exit.
+        :param Room neighbor: The room the exit used to lead to.
+        """
+        slot = self._slots[direction]
+        if self._adjacency[the_room.room_id * self._width + slot] == \
+                neighbor.room_id:
+            self._set_exit(the_room.room_id, slot, NO_EXIT)
+
+    def _find(self, room_id):
+        """Finds the representative of the component of a room.
+
+        :param int room_id: The id of the room.
+        :rtype: int.
+        """
+        parents = self._parents
+        root = room_id
+        while parents[root] != root:
+            root = parents[root]
+        while parents[room_id] != root:
+            parents[room_id], room_id = root, parents[room_id]
+        return root
+
+    def _union(self, room_id_1, room_id_2):
+        """Merges the components of two rooms.
+
+        :param int room_id_1: The id of the first room.
+        :param int room_id_2: The id of the second room.
+        """
+        root_1 = self._find(room_id_1)
+        root_2 = self._find(room_id_2)
+        if root_1 != root_2:
+            # The smaller id becomes the representative.
+            if root_1 < root_2:
+                self._parents[root_2] = root_1
+            else:
+                self._parents[root_1] = root_2
+
+    def _refresh_components(self):
+        """Rebuilds the union-find after exits were removed."""
+        self._grow()
+        if not self._components_stale:
+            return
+        self._components_stale = False
+        self._parents = array.array('i', range(len(self._parents)))
+        adjacency = self._adjacency
+        width = self._width
+        for index, neighbor_id in enumerate(adjacency):
+            if neighbor_id != NO_EXIT:
+                self._union(index // width, neighbor_id)
+
+    def _get_id(self, name):
+        """Returns the id of a room.
+
+        :param str name: The name of the room.
+        :rtype: int.
+
+        :raises: RoomDoesNotExist.
+        """
+        return self._world.get_room_id(name)
+
+    def _get_names(self, room_ids):
+        """Returns the names of rooms.
+
+        :param iterable room_ids: The ids of the rooms.
+        :rtype: list.
+        """
+        get_room_by_id = self._world.get_room_by_id
+        return [get_room_by_id(room_id).name for room_id in room_ids]
+
+    def same_component(self, room_name_1, room_name_2):
+        """Checks if two rooms are connected ignoring the directions.
+
+        :param str room_name_1: The name of the first room.
+        :param str room_name_2: The name of the second room.
+        :rtype: bool.
+
+        :raises: RoomDoesNotExist.
+        """
+        self._refresh_components()
+        return self._find(self._get_id(room_name_1)) == \
+            self._find(self._get_id(room_name_2))
+
+    def component_count(self):
+        """Returns the number of connected components.
+
+        :rtype: int.
+        """
+        self._refresh_components()
+        return sum(1 for room_id in range(len(self._parents))
+                   if self._find(room_id) == room_id)
+
+    def components(self):
+        """Returns the connected components, largest first.
+
+        :return: The lists of the room names of every component.
+        :rtype: list.
+        """
+        self._refresh_components()
+        members = {}
+        for room_id in range(len(self._parents)):
+            members.setdefault(self._find(room_id), []).append(room_id)
+        return [self._get_names(room_ids) for room_ids in
+                sorted(members.values(), key=len, reverse=True)]
+
+    def _get_reachable(self, room_id):
+        """Returns the ids of the rooms reachable from a room.
+
+        :param int room_id: The id of the room.
+        :rtype: bytearray.
+        """
+        self._grow()
+        reachable = self._reachable.get(room_id)
+        if reachable is not None:
+            self._reachable.move_to_end(room_id)
+            return reachable
+        adjacency = self._adjacency
+        width = self._width
+        reachable = bytearray(len(self._parents))
+        reachable[room_id] = 1
+        stack = [room_id]
+        while stack:
+            start = stack.pop() * width
+            for neighbor_id in adjacency[start:start + width]:
+                if neighbor_id != NO_EXIT and not reachable[neighbor_id]:
+                    reachable[neighbor_id] = 1
+                    stack.append(neighbor_id)
+        self._reachable[room_id] = reachable
+        if len(self._reachable) > REACHABLE_CACHE_SIZE:
+            self._reachable.popitem(last=False)
+        return reachable
+
+    def is_reachable(self, source, target):
+        """Checks if a room can be reached from another following the exits.
+
+        :param str source: The name of the room to start from.
+        :param str target: The name of the room to reach.
+        :rtype: bool.
+
+        :raises: RoomDoesNotExist.
+        """
+        return bool(self._get_reachable(self._get_id(source))[
+            self._get_id(target)])
+
+    def reachable_from(self, source):
+        """Returns the rooms that can be reached from a room.
+
+        :param str source: The name of the room to start from.
+        :rtype: list.
+
+        :raises: RoomDoesNotExist.
+        """
+        reachable = self._get_reachable(self._get_id(source))
+        return self._get_names(room_id for room_id, flag
+                               in enumerate(reachable) if flag)
+
+    def unreachable_from(self, source):
+        """Returns the rooms that cannot be reached from a room.
+
+        :param str source: The name of the room to start from.
+        :rtype: list.
+
+        :raises: RoomDoesNotExist.
+        """
+        reachable = self._get_reachable(self._get_id(source))
+        return self._get_names(room_id for room_id, flag
+                               in enumerate(reachable) if not flag)
+
+    def _get_exit_count(self, room_id):
+        """Returns the number of exits of a room.
+
+        :param int room_id: The id of the room.
+        :rtype: int.
+        """
+        width = self._width
+        start = room_id * width
+        return width - self._adjacency[start:start + width].count(NO_EXIT)
+
+    def dead_ends(self):
+        """Returns the rooms with a single exit.
+
+        :rtype: list.
+        """
+        self._grow()
+        return self._get_names(room_id
+                               for room_id in range(len(self._parents))
+                               if self._get_exit_count(room_id) == 1)
+
+    def orphans(self):
+        """Returns the rooms without exits that no exit leads to.
+
+        :rtype: list.
+        """
+        self._grow()
+        in_degrees = self._in_degrees
+        return self._get_names(room_id
+                               for room_id in range(len(self._parents))
+                               if not in_degrees[room_id] and
+                               not self._get_exit_count(room_id))
+
+    def asymmetric_links(self):
+        """Returns the exits without an exit back in the opposite direction.
+
+        :return: Tuples of the name of the room, the direction and the name
+        of the neighbor.
+        :rtype: list.
+        """
+        get_room_by_id = self._world.get_room_by_id
+        directions = self._directions.directions
+        width = self._width
+        return [
+            (get_room_by_id(room_id).name, directions[slot],
+             get_room_by_id(self._adjacency[room_id * width + slot]).name)
+            for room_id, slot in sorted(self._asymmetric)
+        ]
+
+    def articulation_rooms(self):
+        """Returns the rooms whose removal disconnects their component.
+
+        The directions of the exits are ignored.
+
+        :rtype: list.
+        """
+        self._grow()
+        if self._articulation is None:
+            self._articulation = self._find_articulation_rooms()
+        return self._get_names(self._articulation)
+
+    def _find_articulation_rooms(self):
+        """Finds the articulation rooms (iterative Hopcroft-Tarjan).
+
+        :return: The sorted ids of the articulation rooms.
+        :rtype: list.
+        """
+        count = len(self._parents)
+        adjacency = self._adjacency
+        width = self._width
+        neighbors = [set() for _ in range(count)]
+        for index, neighbor_id in enumerate(adjacency):
+            if neighbor_id != NO_EXIT and neighbor_id != index // width:
+                neighbors[index // width].add(neighbor_id)
+                neighbors[neighbor_id].add(index // width)
+
+        order = array.array('i', [-1]) * count
+        low = array.array('i', bytes(4 * count))
+        articulation = set()
+        counter = 0
+        for root in range(count):
+            if order[root] != -1:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            root_children = 0
+            stack = [(root, -1, iter(neighbors[root]))]
+            while stack:
+                room_id, parent_id, pending = stack[-1]
+                for neighbor_id in pending:
+                    if order[neighbor_id] == -1:
+                        order[neighbor_id] = low[neighbor_id] = counter
+                        counter += 1
+                        stack.append((neighbor_id, room_id,
+                                      iter(neighbors[neighbor_id])))
+                        break
+                    if neighbor_id != parent_id:
+                        low[room_id] = min(low[room_id], order[neighbor_id])
+                else:
+                    stack.pop()
+                    if parent_id == -1:
+                        continue
+                    low[parent_id] = min(low[parent_id], low[room_id])
+                    if parent_id == root:
+                        root_children += 1
+                    elif low[room_id] >= order[parent_id]:
+                        articulation.add(parent_id)
+            if root_children > 1:
+                articulation.add(root)
+        return sorted(articulation)
+
+    def summary(self, start_room=None):
+        """Counts the problems of the world.
+
+        :param str start_room: The name of the starting room; the rooms that
+        cannot be reached from it are counted when given.
+
+        :rtype: dict.
+
+        :raises: RoomDoesNotExist.
+        """
+        summary = {
+            'rooms': len(self._world),
+            'components': self.component_count(),
+            'dead_ends': len(self.dead_ends()),
+            'orphans': len(self.orphans()),
+            'asymmetric_links': len(self._asymmetric),
+            'articulation_rooms': len(self.articulation_rooms()),
+        }
+        if start_room is not None:
+            summary['unreachable'] = len(self.unreachable_from(start_room))
+        return summary
@@ -0,0 +1,404 @@
+"""Benchmarks the core operations on generated worlds.
+
+Every benchmark runs on square grid worlds of increasing size and reports
+one or more metrics:
+
+* build: the rates of World.add_room and World.connect_rooms and the memory
+  per room.
+
+* move: the throughput of the "move" command walking the grid.
+
+* dispatch: the latency of parsing and dispatching a user command with
+  execute_user_command.
+
+* have_won: the cost of checking a goal and of a have_won override.
+
+* players: the memory per player.
+
+The results are written as JSON so two runs can be compared:
+
+    python -m impl.benchmark run --sizes 100 10000 --output new.json
+    python -m impl.benchmark compare old.json new.json
+
+compare exits with status 1 when a metric regressed by more than the
+threshold.
+"""
+
+import argparse
+import gc
+import json
+import math
+import platform
+import sys
+import time
+import tracemalloc
+
+import impl.generator as generator
+import impl.goals as goals
+import impl.player as player
+import impl.room as room
+import impl.world as world
+
+# Aliases.
+Direction = room.Direction
+Player = player.Player
+room_name = generator.grid_room_name
+World = world.World
+
+# The default sizes (number of rooms) of the generated worlds.
+SIZES = (10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5)
+
+# The largest supported size.
+MAX_SIZE = 10 ** 6
+
+# The number of timed repetitions; the best one is reported.
+REPEAT = 3
+
+# The number of timed operations per repetition.
+OPERATIONS = 20000
+
+# The default relative change considered a regression.
+THRESHOLD = 0.10
+
+# The version of the JSON layout of the results.
+FORMAT_VERSION = 1
+
+
+def make_players(side):
+    """Makes the player classes whose goal is to visit the far corner of a
+    grid.
+
+    :param int side: The number of rooms per side.
+
+    :return: A class declaring the goal and a class implementing have_won
+    by hand.
+    :rtype: tuple.
+    """
+    corner = room_name(side - 1, side - 1)
+
+    class GoalPlayer(Player):
+        """A player whose goal is to visit the far corner of the grid."""
+
+        goal = goals.visited(corner)
+
+    class OverridePlayer(Player):
+        """A player implementing have_won by hand."""
+
+        def have_won(self):
+            """Checks if the player visited the far corner of the grid.
+
+            :rtype: bool.
+            """
+            return self.has_already_visited(corner)
+
+    return GoalPlayer, OverridePlayer
+
+
+def get_side(size):
+    """Returns the side of the square grid closest to a number of rooms.
+
+    :param int size: The number of rooms.
+    :rtype: int.
+    """
+    return max(2, math.isqrt(size))
+
+
+def make_grid_world(side, world_class=World):
+    """Makes a square grid of rooms connected east-west and north-south.
+
+    :param int side: The number of rooms per side.
+    :param type world_class: The class of the world.
+
+    :return: The world and the name of its first room.
+    :rtype: tuple.
+    """
+    return generator.generate(generator.Grid(side), the_world=world_class())
+
+
+def best_time(function, repeat=REPEAT):
+    """Times a function returning its fastest run.
+
+    :param callable function: The function to time.
+    :param int repeat: The number of runs.
+
+    :return: The duration of the fastest run in seconds.
+    :rtype: float.
+    """
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def measure_memory(function):
+    """Measures the memory allocated by a function and kept after it.
+
+    :param callable function: The function to measure; its return value is
+    kept alive while measuring.
+
+    :return: The number of bytes allocated.
+    :rtype: int.
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = function()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return after - before
+
+
+def make_result(name, size, value, unit, better):
+    """Creates the record of a metric.
+
+    :param str name: The name of the metric.
+    :param int size: The number of rooms of the world.
+    :param float value: The measured value.
+    :param str unit: The unit of the value.
+    :param str better: "higher" or "lower".
+    :rtype: dict.
+    """
+    return {'name': name, 'size': size, 'value': value, 'unit': unit,
+            'better': better}
+
+
+def bench_build(size):
+    """Measures building a grid world.
+
+    :param int size: The number of rooms.
+    :rtype: list.
+    """
+    side = get_side(size)
+    rooms = side * side
+    names = [room_name(x, y) for y in range(side) for x in range(side)]
+    connections = [
+        (room_name(x, y), room_name(x + 1, y), Direction.EAST)
+        for y in range(side) for x in range(side - 1)
+    ]
+
+    def add_rooms():
+        the_world = World()
+        for name in names:
+            the_world.add_room(name, name)
+        return the_world
+
+    def connect_rooms():
+        the_world = add_rooms()
+        start = time.perf_counter()
+        for name_1, name_2, direction in connections:
+            the_world.connect_rooms(name_1, name_2, direction)
+        return time.perf_counter() - start
+
+    repeat = 1 if rooms > 10 ** 5 else REPEAT
+    add_time = best_time(add_rooms, repeat)
+    connect_time = min(connect_rooms() for _ in range(repeat))
+    return [
+        make_result('build.add_room', rooms, rooms / add_time,
+                    'rooms/s', 'higher'),
+        make_result('build.connect_rooms', rooms,
+                    len(connections) / connect_time, 'connections/s',
+                    'higher'),
+        make_result('memory.room', rooms,
+                    measure_memory(lambda: make_grid_world(side)) / rooms,
+                    'bytes', 'lower'),
+    ]
+
+
+def bench_move(the_world, start_room, size):
+    """Measures the throughput of the "move" command.
+
+    :param World the_world: The grid world.
+    :param str start_room: The first room.
+    :param int size: The number of rooms.
+    :rtype: list.
+    """
+    _, override_player = make_players(get_side(size))
+    the_player = override_player(the_world, start_room)
+    execute = the_player.execute
+    commands = ['move right', 'move left'] * (OPERATIONS // 2)
+
+    def move():
+        for command in commands:
+            execute(command)
+
+    return [make_result('move.throughput', size,
+                        len(commands) / best_time(move), 'moves/s',
+                        'higher')]
+
+
+def bench_dispatch(the_world, start_room, size):
+    """Measures the latency of parsing and dispatching commands.
+
+    :param World the_world: The grid world.
+    :param str start_room: The first room.
+    :param int size: The number of rooms.
+    :rtype: list.
+    """
+    _, override_player = make_players(get_side(size))
+    the_player = override_player(the_world, start_room)
+    execute_user_command = the_player.execute_user_command
+    commands = ['move right', 'move left', 'ls'] * (OPERATIONS // 3)
+    timer = time.perf_counter_ns
+    latencies = []
+    append = latencies.append
+    for command in commands:
+        start = timer()
+        execute_user_command(command)
+        append(timer() - start)
+    latencies.sort()
+    return [
+        make_result('dispatch.p50', size, latencies[len(latencies) // 2],
+                    'ns', 'lower'),
+        make_result('dispatch.p99', size,
+                    latencies[len(latencies) * 99 // 100], 'ns', 'lower'),
+    ]
+
+
+def bench_have_won(the_world, start_room, size):
+    """Measures checking the win condition.
+
+    :param World the_world: The grid world.
+    :param str start_room: The first room.
+    :param int size: The number of rooms.
+    :rtype: list.
+    """
+    results = []
+    players = make_players(get_side(size))
+    for name, player_class in zip(['have_won.goal', 'have_won.override'],
+                                  players):
+        have_won = player_class(the_world, start_room).have_won
+
+        def check():
+            for _ in range(OPERATIONS):
+                have_won()
+
+        results.append(make_result(name, size,
+                                   best_time(check) / OPERATIONS * 1e9,
+                                   'ns', 'lower'))
+    return results
+
+
+def bench_players(the_world, start_room, size):
+    """Measures the memory per player.
+
+    :param World the_world: The grid world.
+    :param str start_room: The first room.
+    :param int size: The number of rooms.
+    :rtype: list.
+    """
+    count = 1000
+    goal_player, _ = make_players(get_side(size))
+    memory = measure_memory(lambda: [
+        goal_player(the_world, start_room) for _ in range(count)
+    ])
+    return [make_result('memory.player', size, memory / count, 'bytes',
+                        'lower')]
+
+
+def run(sizes=SIZES, log=None):
+    """Runs all the benchmarks.
+
+    :param iterable sizes: The sizes of the generated worlds.
+    :param callable log: Called with a progress message per size.
+
+    :return: The results with the description of the environment.
+    :rtype: dict.
+    """
+    results = []
+    for size in sizes:
+        if size > MAX_SIZE:
+            raise ValueError("The largest size is {}.".format(MAX_SIZE))
+        if log is not None:
+            log("Benchmarking {} rooms...".format(size))
+        results.extend(bench_build(size))
+        the_world, start_room = make_grid_world(get_side(size))
+        rooms = len(the_world)
+        results.extend(bench_move(the_world, start_room, rooms))
+        results.extend(bench_dispatch(the_world, start_room, rooms))
+        results.extend(bench_have_won(the_world, start_room, rooms))
+        results.extend(bench_players(the_world, start_room, rooms))
+    return {
+        'version': FORMAT_VERSION,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'time': time.time(),
+        'results': results,
+    }
+
+
+def compare(old, new, threshold=THRESHOLD):
+    """Compares the results of two runs.
+
+    :param dict old: The results of the baseline run.
+    :param dict new: The results of the new run.
+    :param float threshold: The relative change considered a regression.
+
+    :return: A tuple of (name, size, old value, new value, relative change,
+    regressed) for every metric of both runs; a positive change is an
+    improvement.
+    :rtype: list.
+    """
+    baseline = {(result['name'], result['size']): result
+                for result in old['results']}
+    rows = []
+    for result in new['results']:
+        previous = baseline.get((result['name'], result['size']))
+        if previous is None or not previous['value']:
+            continue
+        change = (result['value'] - previous['value']) / previous['value']
+        if result['better'] == 'lower':
+            change = -change
+        rows.append((result['name'], result['size'], previous['value'],
+                     result['value'], change, change < -threshold))
+    return rows
+
+
+def main():
+    """Runs or compares benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    run_parser = commands.add_parser('run', help='Runs the benchmarks.')
+    run_parser.add_argument('--sizes', type=int, nargs='+',
+                            default=list(SIZES))
+    run_parser.add_argument('--output', default='-',
+                            help='The JSON file to write (- for stdout).')
+    compare_parser = commands.add_parser('compare',
+                                         help='Compares two runs.')
+    compare_parser.add_argument('old')
+    compare_parser.add_argument('new')
+    compare_parser.add_argument('--threshold', type=float,
+                                default=THRESHOLD)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run(args.sizes,
+                      log=lambda msg: print(msg, file=sys.stderr))
+        if args.output == '-':
+            json.dump(results, sys.stdout, indent=2)
+        else:
+            with open(args.output, 'w') as output_file:
+                json.dump(results, output_file, indent=2)
+        return
+
+    with open(args.old) as old_file, open(args.new) as new_file:
+        rows = compare(json.load(old_file), json.load(new_file),
+                       args.threshold)
+    for name, size, old_value, new_value, change, regressed in rows:
+        print('{:22} {:>8} {:>14.1f} {:>14.1f} {:>+8.1%}{}'.format(
+            name, size, old_value, new_value, change,
+            '  REGRESSION' if regressed else ''
+        ))
+    if any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
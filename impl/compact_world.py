@@ -0,0 +1,618 @@
+"""Implements a memory efficient world backed by flat tables.
+
+The regular World keeps a Room object per room and every Room keeps a dict
+of its neighbors.  For very large maps this costs several hundred bytes per
+room, so the CompactWorld assigns an integer id to every room and stores:
+
+* The adjacency in a single array with one slot per direction of its
+  DirectionTable (-1 when there is no exit in that direction).
+
+* The names, descriptions and room classes in interned tables.
+
+Room objects are only created on demand as lightweight views over these
+tables, so existing code using get_room, connect_rooms and
+Room.get_neighbor keeps working unchanged.
+"""
+
+import array
+import sys
+import weakref
+
+import impl.directions as directions
+import impl.events as events
+import impl.exceptions as exceptions
+import impl.room as room
+import impl.routing as routing
+
+# Aliases.
+Direction = room.Direction
+FOUR_WAY = directions.FOUR_WAY
+Room = room.Room
+RoomAlreadyExists = exceptions.RoomAlreadyExists
+RoomDoesNotExist = exceptions.RoomDoesNotExist
+RoomEvents = events.RoomEvents
+UnsupportedDirection = exceptions.UnsupportedDirection
+
+# The directions of the default table in the order of their adjacency slots.
+DIRECTIONS = FOUR_WAY.directions
+
+# The number of adjacency slots for each room with the default table.
+WIDTH = FOUR_WAY.width
+
+# Signifies that there is no exit in a direction.
+NO_EXIT = -1
+
+
+def slot_of(direction):
+    """Returns the adjacency slot of a direction with the default table.
+
+    :param Direction direction: The direction.
+
+    :return: The index of the direction within a room's adjacency row.
+    :rtype: int.
+    """
+    return FOUR_WAY.slots[direction]
+
+
+class RoomView(Room):
+    """A lightweight Room reading its data from a CompactWorld.
+
+    Views are never instantiated directly; the CompactWorld creates them
+    on demand mixing this class with the room class of each room so
+    specialized behaviour (like update_player) keeps working.
+
+    Note that views are transient: the room classes used in a
+    CompactWorld should not rely on instance state.
+
+    :ivar CompactWorld _world: The world holding the room's data.
+    :ivar int _room_id: The id of the room in the world.
+    """
+
+    _world = None
+    _room_id = None
+
+    def __init__(self, description):
+        """Initializer.
+
+        :param str description: Ignored; views are created by the world.
+
+        :raises: TypeError.
+        """
+        raise TypeError("Room views are created by CompactWorld.")
+
+    @property
+    def room_id(self):
+        """Returns the id of the room.
+
+        :return: The id of the room in its world.
+        :rtype: int.
+        """
+        return self._room_id
+
+    @property
+    def name(self):
+        """Returns the name of the room.
+
+        :return: The name of the room.
+        :rtype: str.
+        """
+        return self._world.get_room_name(self._room_id)
+
+    def add_neighbor(self, direction, adjacent_room):
+        """ Define an adjacent_room.
+
+        :param Direction direction: The direction of the adjacent_room.
+        :param RoomView adjacent_room: The adjacent_room.
+
+        :raises: ValueError.
+        """
+        self._world.set_exit(
+            self._room_id, direction, self._world.id_of(adjacent_room)
+        )
+
+    def remove_neighbor(self, direction):
+        """Removes an adjacent_room.
+
+        :param Direction direction: The direction of the adjacent_room.
+
+        :raises: KeyError.
+        """
+        if self._world.get_exit(self._room_id, direction) == NO_EXIT:
+            raise KeyError(direction)
+        self._world.set_exit(self._room_id, direction, NO_EXIT)
+
+    def __str__(self):
+        """ Returns The short description of the room."""
+        return self._world.get_room_description(self._room_id)
+
+    def __eq__(self, other):
+        """Two views are equal when they refer to the same room.
+
+        :param other: The object to compare with.
+
+        :return: True if both refer to the same room of the same world.
+        :rtype: bool.
+        """
+        if not isinstance(other, RoomView):
+            return NotImplemented
+        return self._world is other._world and \
+            self._room_id == other._room_id
+
+    def __hash__(self):
+        """Returns the hash of the view."""
+        return hash((id(self._world), self._room_id))
+
+    @property
+    def neighbors(self):
+        """Returns the adjacent rooms.
+
+        :returns: The adjacent rooms by direction.
+        :rtype: dict.
+        """
+        the_world = self._world
+        adjacency = the_world.adjacency
+        start = self._room_id * the_world.width
+        return {
+            direction: the_world.get_room_by_id(adjacency[start + index])
+            for index, direction in enumerate(the_world.directions.directions)
+            if adjacency[start + index] != NO_EXIT
+        }
+
+    @property
+    def neighoring_directions(self):
+        """ Return a string describing all the neighoring_directions.
+
+        :returns: Details of the room's exits.
+        :rtype: str.
+        """
+        the_world = self._world
+        adjacency = the_world.adjacency
+        start = self._room_id * the_world.width
+        return [
+            direction.label
+            for index, direction in enumerate(the_world.directions.directions)
+            if adjacency[start + index] != NO_EXIT
+        ]
+
+    def get_neighbor(self, direction):
+        """Gets neighbor room by directiion.
+
+        If there is no room in that direction, return None.
+
+        :param Direction direction: The neighbor's direction.
+
+        :returns:  The room in the given direction.
+        :rtype: Room.
+        """
+        neighbor_id = self._world.get_exit(self._room_id, direction)
+        if neighbor_id == NO_EXIT:
+            return None
+        return self._world.get_room_by_id(neighbor_id)
+
+
+class CompactWorld:
+    """A world storing its rooms in flat, interned tables.
+
+    :ivar dict _room_ids: Maps room names to room ids.
+    :ivar list _names: The room names indexed by room id.
+
+    :ivar array _descriptions: The index of the description of each room in
+    the _description_table.
+
+    :ivar list _description_table: The distinct room descriptions.
+    :ivar dict _description_ids: Maps descriptions to their index.
+
+    :ivar array _classes: The index of the room class of each room in the
+    _room_classes table.
+
+    :ivar list _room_classes: The distinct room classes.
+    :ivar list _view_classes: The view class for each room class.
+    :ivar dict _room_class_ids: Maps room classes to their index.
+
+    :ivar DirectionTable directions: The directions the rooms can be
+    connected in.
+
+    :ivar int width: The number of adjacency slots per room.
+    :ivar dict _slots: Maps the directions to their adjacency slots.
+
+    :ivar array adjacency: Holds width slots per room with the id of the
+    neighbor in each direction or NO_EXIT.
+
+    :ivar WeakValueDictionary _views: The views currently in use.
+    :ivar RoomEvents events: The handlers of the room classes.
+    """
+
+    def __init__(self, directions=FOUR_WAY):
+        """Initializer.
+
+        :param DirectionTable directions: The directions the rooms can be
+        connected in.
+        """
+        self._set_directions(directions)
+        self._room_ids = {}
+        self._names = []
+        self._descriptions = array.array('i')
+        self._description_table = []
+        self._description_ids = {}
+        self._classes = array.array('H')
+        self._room_classes = []
+        self._view_classes = []
+        self._room_class_ids = {}
+        self.adjacency = array.array('i')
+        self._views = weakref.WeakValueDictionary()
+        self._graph_listeners = []
+        self._router = None
+        self.events = RoomEvents()
+        self._analysis = None
+
+    def _set_directions(self, directions):
+        """Sets the directions the rooms can be connected in.
+
+        :param DirectionTable directions: The directions.
+        """
+        self.directions = directions
+        self.width = directions.width
+        self._slots = directions.slots
+
+    def __len__(self):
+        """Returns the number of rooms."""
+        return len(self._names)
+
+    def __contains__(self, name):
+        """Checks if a room exists.
+
+        :param str name: The name of the room.
+        """
+        return name in self._room_ids
+
+    def __iter__(self):
+        """Iterates over the room names in the order of their ids."""
+        return iter(self._names)
+
+    def save_snapshot(self, path):
+        """Saves the world in a binary snapshot file.
+
+        :param str path: The path of the snapshot file.
+        """
+        import impl.snapshot as snapshot
+        snapshot.save_snapshot(self, path)
+
+    @staticmethod
+    def open_snapshot(path):
+        """Opens a world from a binary snapshot file.
+
+        :param str path: The path of the snapshot file.
+
+        :return: The world backed by the memory mapped snapshot.
+        :rtype: SnapshotWorld.
+        """
+        import impl.snapshot as snapshot
+        return snapshot.SnapshotWorld(path)
+
+    def add_room(self, name, description, room_class=None):
+        """Adds a room.
+
+        :param str name: The name of the room.
+        :param str description: The description of the room.
+
+        :param Room room_class: A Room derived class in case you need to
+        specialize the room construction.
+
+        :raises: RoomAlreadyExists.
+        """
+        if name in self._room_ids:
+            raise RoomAlreadyExists(
+                "Room {} already exists.".format(name)
+            )
+        name = sys.intern(name)
+        self._room_ids[name] = len(self._names)
+        self._names.append(name)
+        self._descriptions.append(self._intern_description(description))
+        self._classes.append(self._intern_room_class(room_class or Room))
+        self.adjacency.extend([NO_EXIT] * self.width)
+
+    def add_rooms(self, rooms):
+        """Adds many rooms at once.
+
+        None of the rooms is added if any of them already exists.
+
+        :param iterable rooms: Tuples of name, description and room class
+        (which can be None).
+
+        :raises: RoomAlreadyExists.
+        """
+        rooms = list(rooms)
+        new_names = set()
+        for name, _, _ in rooms:
+            if name in self._room_ids or name in new_names:
+                raise RoomAlreadyExists(
+                    "Room {} already exists.".format(name)
+                )
+            new_names.add(name)
+
+        intern = sys.intern
+        next_id = len(self._names)
+        for name, description, room_class in rooms:
+            name = intern(name)
+            self._room_ids[name] = next_id
+            self._names.append(name)
+            next_id += 1
+        self._descriptions.extend(
+            self._intern_description(description)
+            for _, description, _ in rooms
+        )
+        self._classes.extend(
+            self._intern_room_class(room_class or Room)
+            for _, _, room_class in rooms
+        )
+        self.adjacency.extend([NO_EXIT] * (self.width * len(rooms)))
+
+    def get_room(self, name):
+        """Gets a room by its name.
+
+        :param str name: The name of the room.
+
+        :returns: The room for the passed-in name.
+        :rtype: Room.
+
+        :raises: RoomDoesNotExist.
+        """
+        return self.get_room_by_id(self.get_room_id(name))
+
+    def get_room_id(self, name):
+        """Gets the id of a room by its name.
+
+        :param str name: The name of the room.
+
+        :returns: The id of the room.
+        :rtype: int.
+
+        :raises: RoomDoesNotExist.
+        """
+        try:
+            return self._room_ids[name]
+        except KeyError:
+            raise RoomDoesNotExist("Room {} does not exist.".format(name))
+
+    def get_room_by_id(self, room_id):
+        """Gets the view of a room by its id.
+
+        :param int room_id: The id of the room.
+
+        :returns: The room view.
+        :rtype: RoomView.
+        """
+        view = self._views.get(room_id)
+        if view is None:
+            view = object.__new__(self._get_view_class(room_id))
+            view._world = self
+            view._room_id = room_id
+            self._views[room_id] = view
+        return view
+
+    def _get_view_class(self, room_id):
+        """Returns the view class to use for a room.
+
+        :param int room_id: The id of the room.
+        :rtype: type.
+        """
+        return self._view_classes[self._classes[room_id]]
+
+    def get_room_name(self, room_id):
+        """Returns the name of a room.
+
+        :param int room_id: The id of the room.
+        :rtype: str.
+        """
+        return self._names[room_id]
+
+    def get_room_description(self, room_id):
+        """Returns the description of a room.
+
+        :param int room_id: The id of the room.
+        :rtype: str.
+        """
+        return self._description_table[self._descriptions[room_id]]
+
+    def get_room_class(self, room_id):
+        """Returns the room class of a room.
+
+        :param int room_id: The id of the room.
+        :rtype: type.
+        """
+        return self._room_classes[self._classes[room_id]]
+
+    def get_exit(self, room_id, direction):
+        """Returns the id of the neighbor in a direction.
+
+        :param int room_id: The id of the room.
+        :param Direction direction: The direction of the exit.
+
+        :return: The id of the neighbor or NO_EXIT (also for the directions
+        the world does not support).
+        :rtype: int.
+        """
+        slot = self._slots.get(direction)
+        if slot is None:
+            return NO_EXIT
+        return self.adjacency[room_id * self.width + slot]
+
+    def set_exit(self, room_id, direction, neighbor_id):
+        """Sets the neighbor of a room in a direction.
+
+        :param int room_id: The id of the room.
+        :param Direction direction: The direction of the exit.
+        :param int neighbor_id: The id of the neighbor or NO_EXIT.
+
+        :raises: UnsupportedDirection.
+        """
+        slot = room_id * self.width + self._get_slot(direction)
+        previous_id = self.adjacency[slot]
+        self.adjacency[slot] = neighbor_id
+        if self._graph_listeners:
+            the_room = self.get_room_by_id(room_id)
+            if previous_id != NO_EXIT:
+                self.on_neighbor_removed(the_room, direction,
+                                         self.get_room_by_id(previous_id))
+            if neighbor_id != NO_EXIT:
+                self.on_neighbor_added(the_room, direction,
+                                       self.get_room_by_id(neighbor_id))
+
+    def _get_slot(self, direction):
+        """Returns the adjacency slot of a direction.
+
+        :param Direction direction: The direction.
+        :rtype: int.
+
+        :raises: UnsupportedDirection.
+        """
+        try:
+            return self._slots[direction]
+        except KeyError:
+            raise UnsupportedDirection("{} does not support {}.".format(
+                self.directions.name, direction.name
+            ))
+
+    def id_of(self, the_room):
+        """Returns the id of a room view belonging to this world.
+
+        :param RoomView the_room: The room.
+
+        :return: The id of the room.
+        :rtype: int.
+
+        :raises: ValueError.
+        """
+        if not isinstance(the_room, RoomView) or the_room._world is not self:
+            raise ValueError("The room does not belong to this world.")
+        return the_room._room_id
+
+    def connect_rooms(self, room_name_1, room_name_2, direction):
+        """Connects two rooms.
+
+        :param str room_name_1: The name of the room to connect.
+        :param str room_name_2: The name of the room to be connected.
+        :param Direction direction: The direction to connect.
+
+        :raises: RoomDoesNotExist, UnsupportedDirection.
+        """
+        room_id_1 = self.get_room_id(room_name_1)
+        room_id_2 = self.get_room_id(room_name_2)
+        self._get_slot(direction)
+        self.set_exit(room_id_1, direction, room_id_2)
+        self.set_exit(room_id_2, direction.opposite, room_id_1)
+
+    def connect_many(self, connections):
+        """Connects many pairs of rooms at once.
+
+        None of the rooms is connected if any of them does not exist.
+
+        :param iterable connections: Tuples of the names of the two rooms
+        and the direction from the first to the second.
+
+        :raises: RoomDoesNotExist, UnsupportedDirection.
+        """
+        get_room_id = self.get_room_id
+        get_slot = self._get_slot
+        resolved = [
+            (get_room_id(room_name_1), get_room_id(room_name_2),
+             get_slot(direction), direction)
+            for room_name_1, room_name_2, direction in connections
+        ]
+        if self._graph_listeners:
+            for room_id_1, room_id_2, _, direction in resolved:
+                self.set_exit(room_id_1, direction, room_id_2)
+                self.set_exit(room_id_2, direction.opposite, room_id_1)
+            return
+        adjacency = self.adjacency
+        width = self.width
+        opposite_slots = self.directions.opposite_slots
+        for room_id_1, room_id_2, slot, _ in resolved:
+            adjacency[room_id_1 * width + slot] = room_id_2
+            adjacency[room_id_2 * width + opposite_slots[slot]] = room_id_1
+
+    @property
+    def router(self):
+        """Returns the router finding the shortest paths between rooms.
+
+        :rtype: Router.
+        """
+        if self._router is None:
+            self._router = routing.Router()
+            self.add_graph_listener(self._router)
+        return self._router
+
+    @property
+    def analysis(self):
+        """Returns the analysis of the graph of the rooms.
+
+        The analysis is created on first access and then kept up to date
+        as the exits of the rooms change.
+
+        :rtype: GraphAnalysis.
+        """
+        if self._analysis is None:
+            import impl.analysis as analysis
+            self._analysis = analysis.GraphAnalysis(self)
+            self.add_graph_listener(self._analysis)
+        return self._analysis
+
+    def add_graph_listener(self, listener):
+        """Adds a listener to the changes of the exits of the rooms.
+
+        :param listener: An object implementing on_neighbor_added and
+        on_neighbor_removed, both receiving the room, the direction and the
+        neighbor.
+        """
+        self._graph_listeners.append(listener)
+
+    def on_neighbor_added(self, the_room, direction, neighbor):
+        """Notifies the graph listeners of a new exit.
+
+        :param Room the_room: The room that got a new exit.
+        :param Direction direction: The direction of the exit.
+        :param Room neighbor: The room the exit leads to.
+        """
+        for listener in self._graph_listeners:
+            listener.on_neighbor_added(the_room, direction, neighbor)
+
+    def on_neighbor_removed(self, the_room, direction, neighbor):
+        """Notifies the graph listeners of a removed exit.
+
+        :param Room the_room: The room that lost an exit.
+        :param Direction direction: The direction of the exit.
+        :param Room neighbor: The room the exit used to lead to.
+        """
+        for listener in self._graph_listeners:
+            listener.on_neighbor_removed(the_room, direction, neighbor)
+
+    def _intern_description(self, description):
+        """Returns the index of a description adding it if needed.
+
+        :param str description: The description.
+        :rtype: int.
+        """
+        try:
+            return self._description_ids[description]
+        except KeyError:
+            index = len(self._description_table)
+            self._description_table.append(description)
+            self._description_ids[description] = index
+            return index
+
+    def _intern_room_class(self, room_class):
+        """Returns the index of a room class adding it if needed.
+
+        :param type room_class: The Room derived class.
+        :rtype: int.
+        """
+        try:
+            return self._room_class_ids[room_class]
+        except KeyError:
+            index = len(self._room_classes)
+            self._room_classes.append(room_class)
+            self._view_classes.append(
+                type(room_class.__name__, (RoomView, room_class), {})
+            )
+            self._room_class_ids[room_class] = index
+            return index
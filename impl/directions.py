@@ -0,0 +1,142 @@
+"""Defines the sets of directions a world can use.
+
+A DirectionTable lists the directions of a topology in the order of their
+adjacency slots, together with the names the players type to move:
+
+* FOUR_WAY: up, down, left and right (the default).
+
+* EIGHT_WAY: FOUR_WAY plus the diagonals up-left, up-right, down-left and
+  down-right.
+
+* FLOORS: FOUR_WAY plus upstairs and downstairs, for buildings with
+  several floors.
+
+* HEX: the six neighbors of a hexagonal cell with pointy tops: left,
+  right and the four diagonals.
+
+The table of a world decides which directions connect_rooms accepts and how
+many adjacency slots a CompactWorld keeps per room; the table of a Player
+class decides which directions the "move" command parses:
+
+    the_world = World(directions=FLOORS)
+    the_world.connect_rooms('lobby', 'office', Direction.UP)
+
+    class ElevatorPlayer(Player):
+        directions = FLOORS
+
+Everything about a direction is precomputed, so looking up its opposite,
+label or slot is a table lookup.
+"""
+
+import impl.room as room
+
+# Aliases.
+Direction = room.Direction
+
+
+class DirectionTable:
+    """The directions of a topology.
+
+    :ivar str name: The name of the table.
+    :ivar int code: Identifies the table in snapshot files.
+    :ivar tuple directions: The directions in the order of their slots.
+    :ivar int width: The number of directions.
+    :ivar dict labels: Maps the directions to the names the players type.
+    :ivar dict parse: Maps the names the players type to the directions.
+    :ivar dict slots: Maps the directions to their slots.
+    :ivar tuple opposite_slots: The slot of the opposite of each slot.
+    """
+
+    def __init__(self, name, code, labels):
+        """Initializer.
+
+        :param str name: The name of the table.
+        :param int code: Identifies the table in snapshot files.
+
+        :param dict labels: Maps the directions, in the order of their
+        slots, to the names the players type.
+
+        :raises: ValueError.
+        """
+        self.name = name
+        self.code = code
+        self.directions = tuple(labels)
+        self.width = len(self.directions)
+        self.labels = dict(labels)
+        self.parse = {label: direction for direction, label in labels.items()}
+        self.slots = {direction: slot
+                      for slot, direction in enumerate(self.directions)}
+        if len(self.parse) != self.width:
+            raise ValueError("The labels of {} are not unique.".format(name))
+        for direction in self.directions:
+            if direction.opposite not in self.slots:
+                raise ValueError("{} lacks the opposite of {}.".format(
+                    name, direction.name
+                ))
+        self.opposite_slots = tuple(self.slots[direction.opposite]
+                                    for direction in self.directions)
+
+    def __len__(self):
+        """Returns the number of directions."""
+        return self.width
+
+    def __iter__(self):
+        """Iterates over the directions in the order of their slots."""
+        return iter(self.directions)
+
+    def __contains__(self, direction):
+        """Checks if the table holds a direction.
+
+        :param Direction direction: The direction.
+        """
+        return direction in self.slots
+
+    def __repr__(self):
+        """Returns the name of the table."""
+        return '<DirectionTable {}>'.format(self.name)
+
+
+def _with_default_labels(*directions):
+    """Maps directions to their default labels.
+
+    :param directions: The directions in the order of their slots.
+    :rtype: dict.
+    """
+    return {direction: direction.label for direction in directions}
+
+
+FOUR_WAY = DirectionTable('four_way', 0, _with_default_labels(
+    Direction.NORTH, Direction.SOUTH, Direction.WEST, Direction.EAST,
+))
+
+EIGHT_WAY = DirectionTable('eight_way', 1, _with_default_labels(
+    Direction.NORTH, Direction.SOUTH, Direction.WEST, Direction.EAST,
+    Direction.NORTHWEST, Direction.NORTHEAST, Direction.SOUTHWEST,
+    Direction.SOUTHEAST,
+))
+
+FLOORS = DirectionTable('floors', 2, _with_default_labels(
+    Direction.NORTH, Direction.SOUTH, Direction.WEST, Direction.EAST,
+    Direction.UP, Direction.DOWN,
+))
+
+HEX = DirectionTable('hex', 3, _with_default_labels(
+    Direction.WEST, Direction.EAST, Direction.NORTHWEST, Direction.NORTHEAST,
+    Direction.SOUTHWEST, Direction.SOUTHEAST,
+))
+
+# The tables by code.
+TABLES = (FOUR_WAY, EIGHT_WAY, FLOORS, HEX)
+
+
+def get_table(code):
+    """Returns a table by its code.
+
+    :param int code: The code of the table.
+    :rtype: DirectionTable.
+
+    :raises: ValueError.
+    """
+    if not 0 <= code < len(TABLES):
+        raise ValueError("Unknown direction table: {}".format(code))
+    return TABLES[code]
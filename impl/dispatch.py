@@ -0,0 +1,261 @@
+"""Implements the compiled dispatcher of the user commands.
+
+PlayerMeta compiles a Dispatcher for every Player class once, when the
+class is created:
+
+* The number of arguments of every command is computed from its signature
+  so a wrong number of arguments is reported before the command runs.
+
+* Arguments with a converter (like the direction of "move") are converted
+  while parsing.
+
+* Command names are kept in a trie so a unique prefix ("mo up") selects
+  the command it abbreviates.
+
+* The parsed lines are kept in a least recently used cache, so bots
+  sending the same lines over and over parse each one once.
+"""
+
+import collections
+import inspect
+
+import impl.exceptions as exceptions
+
+# Aliases.
+CommandCannotBeExecuted = exceptions.CommandCannotBeExecuted
+FailedToExecuteAction = exceptions.FailedToExecuteAction
+UnsupportedCommand = exceptions.UnsupportedCommand
+
+# The default maximum number of cached lines per Player class.
+MAX_PARSED_LINES = 4096
+
+# A parsed command: the full name of the command, the UserCommand to call
+# and the tuple of its converted arguments.
+ParsedCommand = collections.namedtuple(
+    'ParsedCommand', ['name', 'command', 'args']
+)
+
+
+def format_user_input(user_input):
+    """Formats the user input for an error message.
+
+    :param user_input: Either a string or a tuple of the command name and
+    the list of its arguments.
+
+    :rtype: str.
+    """
+    if isinstance(user_input, str):
+        return user_input
+    command_name, args = user_input
+    return ' '.join([command_name, *map(str, args)])
+
+
+def get_arity(function):
+    """Returns the number of arguments a user command accepts.
+
+    :param callable function: The member method of the command.
+
+    :return: A tuple of the minimum and the maximum number of arguments
+    (None when there is no maximum) and the names of the positional
+    parameters, all excluding self.
+    :rtype: tuple.
+    """
+    parameters = list(inspect.signature(function).parameters.values())[1:]
+    names = []
+    minimum = 0
+    maximum = 0
+    for parameter in parameters:
+        if parameter.kind == parameter.VAR_POSITIONAL:
+            maximum = None
+        elif parameter.kind in (parameter.POSITIONAL_ONLY,
+                                parameter.POSITIONAL_OR_KEYWORD):
+            names.append(parameter.name)
+            maximum += 1
+            if parameter.default is parameter.empty:
+                minimum += 1
+    return minimum, maximum, tuple(names)
+
+
+class CommandTrie:
+    """A trie of command names resolving unique prefixes.
+
+    Every node is a dict mapping characters to child nodes; the None key
+    holds the names of the commands below the node.
+
+    :ivar dict _root: The root node.
+    """
+
+    def __init__(self, names=()):
+        """Initializer.
+
+        :param iterable names: The command names to add.
+        """
+        self._root = {None: set()}
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        """Adds a command name.
+
+        :param str name: The name to add.
+        """
+        node = self._root
+        node[None].add(name)
+        for character in name:
+            node = node.setdefault(character, {None: set()})
+            node[None].add(name)
+
+    def get_completions(self, prefix):
+        """Returns the command names starting with a prefix.
+
+        :param str prefix: The prefix.
+        :rtype: set.
+        """
+        node = self._root
+        for character in prefix:
+            try:
+                node = node[character]
+            except KeyError:
+                return set()
+        return node[None]
+
+    def resolve(self, prefix):
+        """Resolves a command name or a unique prefix of it.
+
+        :param str prefix: The name or prefix.
+
+        :return: The full command name or None if the prefix matches no
+        command or more than one.
+        :rtype: str.
+        """
+        completions = self.get_completions(prefix)
+        if prefix in completions:
+            return prefix
+        if len(completions) == 1:
+            return next(iter(completions))
+        return None
+
+
+class Dispatcher:
+    """Parses user input into calls of the user commands of a Player class.
+
+    :ivar dict commands: Maps the command names to the UserCommands.
+
+    :ivar dict _converters: Maps the command names to a tuple holding the
+    converter (or None) of each positional parameter.
+
+    :ivar CommandTrie _trie: The trie of the command names (None when
+    abbreviations are not allowed).
+
+    :ivar int _max_parsed_lines: The maximum number of cached lines.
+
+    :ivar OrderedDict _parsed_lines: Maps the user input to the
+    ParsedCommand in least recently used order.
+    """
+
+    def __init__(self, player_class, commands,
+                 allow_abbreviations=True, max_parsed_lines=MAX_PARSED_LINES):
+        """Initializer.
+
+        :param type player_class: The Player class; converters given by name
+        are looked up on it.
+
+        :param dict commands: Maps the command names to the UserCommands.
+        :param bool allow_abbreviations: Accepts unique prefixes of names.
+        :param int max_parsed_lines: The maximum number of cached lines.
+        """
+        self.commands = commands
+        self._converters = {}
+        for name, command in commands.items():
+            converters = []
+            for parameter in command.parameter_names:
+                converter = command.converters.get(parameter)
+                if isinstance(converter, str):
+                    converter = getattr(player_class, converter)
+                converters.append(converter)
+            self._converters[name] = tuple(converters)
+        self._trie = CommandTrie(commands) if allow_abbreviations else None
+        self._max_parsed_lines = max_parsed_lines
+        self._parsed_lines = collections.OrderedDict()
+
+    def get_command(self, command_name):
+        """Returns the full name and the UserCommand of a command.
+
+        :param str command_name: The name or a unique prefix of the name.
+        :rtype: tuple.
+
+        :raises: UnsupportedCommand.
+        """
+        command = self.commands.get(command_name)
+        if command is not None:
+            return command_name, command
+        if self._trie is not None:
+            full_name = self._trie.resolve(command_name)
+            if full_name is not None:
+                return full_name, self.commands[full_name]
+        raise UnsupportedCommand(
+            "Command: {} not supported".format(command_name)
+        )
+
+    def parse(self, user_input):
+        """Parses a line of user input.
+
+        :param str user_input: The space delimited command and arguments.
+        :rtype: ParsedCommand.
+
+        :raises: UnsupportedCommand, FailedToExecuteAction.
+        """
+        parsed_lines = self._parsed_lines
+        parsed = parsed_lines.get(user_input)
+        if parsed is not None:
+            parsed_lines.move_to_end(user_input)
+            return parsed
+
+        tokens = user_input.split()
+        if not tokens:
+            raise UnsupportedCommand("Command:  not supported")
+        parsed = self.bind(tokens[0], tokens[1:], user_input)
+        parsed_lines[user_input] = parsed
+        if len(parsed_lines) > self._max_parsed_lines:
+            parsed_lines.popitem(last=False)
+        return parsed
+
+    def bind(self, command_name, args, user_input=None):
+        """Checks and converts the arguments of a command.
+
+        :param str command_name: The name or a unique prefix of the name.
+        :param list args: The arguments as strings.
+
+        :param user_input: The user input used in the error messages
+        (defaults to the command name and arguments).
+
+        :rtype: ParsedCommand.
+
+        :raises: UnsupportedCommand, FailedToExecuteAction.
+        """
+        name, command = self.get_command(command_name)
+        if user_input is None:
+            user_input = (command_name, args)
+        if len(args) < command.minimum or \
+                (command.maximum is not None and len(args) > command.maximum):
+            raise FailedToExecuteAction(
+                "Failed to execute: {} ".format(format_user_input(user_input))
+            )
+
+        converted = list(args)
+        for index, converter in enumerate(self._converters[name]):
+            if converter is None or index >= len(converted):
+                continue
+            try:
+                converted[index] = converter(converted[index])
+            except CommandCannotBeExecuted:
+                raise FailedToExecuteAction(
+                    "Command <{}> cannot be executed.".format(
+                        format_user_input(user_input)
+                    )
+                )
+        return ParsedCommand(name, command, tuple(converted))
+
+    def clear(self):
+        """Drops the cached lines."""
+        self._parsed_lines.clear()
@@ -1,6 +1,7 @@
 """Implements a dummy game that you use for testing."""
 
 import impl.game as game
+import impl.output as output
 import impl.player as player
 import impl.room as room
 import impl.world as world
@@ -61,7 +62,7 @@ def read_from_stdio():
 
 
 def write_to_stdio(msg):
-    """Writes a message to the standard output.
+    """Writes a message to the standard output without buffering it.
 
     :param str msg: The string to write.
     """
@@ -76,7 +77,7 @@ def main():
 
     the_game = Game(
         input_reader=read_from_stdio,
-        output_writer=write_to_stdio,
+        output_writer=output.make_stdio_writer(),
         the_player=the_player
     )
     the_game.play()
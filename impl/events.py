@@ -0,0 +1,290 @@
+"""Indexes the rooms by the effects of their classes and publishes room
+events.
+
+Most rooms are plain Room instances whose hooks (update_player, on_enter
+and on_exit) do nothing.  Every world holds a RoomEvents instance which
+computes once per room class the handlers a player must call when entering
+or leaving a room of that class:
+
+* The hooks that the class overrides.
+
+* The callables subscribed to the entry to the rooms of the class (or of
+  any of its base classes).
+
+A player then calls nothing for the rooms without effects.  Other code can
+subscribe to room entries by room class or room name:
+
+    the_world.events.subscribe(on_restaurant, room_class=RestaurantRoom)
+    the_world.events.subscribe(on_exam, room_name='exam_room')
+
+Subscribers are called with the room and the player, like the hooks.
+
+Only the presence of the hooks is cached: the handlers look the hooks up on
+the room when they are called.  Replacing a hook of a room class recomputes
+the handlers of that class and of its derived classes; a room replacing
+its own hooks is indexed by its class and the replaced hooks (its
+_events_key), so only that room gets the extra handlers.
+"""
+
+import weakref
+
+import impl.room as room
+
+# Aliases.
+add_hook_listener = room.add_hook_listener
+Room = room.Room
+
+# The hooks called when a player enters a room in the order they are called.
+ENTER_HOOKS = ('update_player', 'on_enter')
+
+# The hooks called when a player leaves a room.
+EXIT_HOOKS = ('on_exit',)
+
+# The capabilities computed per room class.
+_capabilities = {}
+
+# The RoomEvents of all the worlds.
+_all_events = weakref.WeakSet()
+
+
+def get_capabilities(room_class):
+    """Returns the hooks a room class overrides.
+
+    :param type room_class: The Room derived class.
+
+    :return: The names of the overridden hooks.
+    :rtype: frozenset.
+    """
+    capabilities = _capabilities.get(room_class)
+    if capabilities is None:
+        capabilities = _capabilities[room_class] = frozenset(
+            hook for hook in ENTER_HOOKS + EXIT_HOOKS
+            if getattr(room_class, hook) is not getattr(Room, hook)
+        )
+    return capabilities
+
+
+def get_room_capabilities(the_room):
+    """Returns the hooks a room overrides through its class or on its own.
+
+    :param Room the_room: The room.
+
+    :return: The names of the overridden hooks.
+    :rtype: frozenset.
+    """
+    return _get_key_capabilities(the_room._events_key)
+
+
+def _get_key_capabilities(key):
+    """Returns the hooks overridden by the rooms of an _events_key.
+
+    :param key: A room class or a room class and the hooks replaced on a
+    room.
+    :rtype: frozenset.
+    """
+    if type(key) is tuple:
+        room_class, replaced = key
+        return get_capabilities(room_class) | replaced
+    return get_capabilities(key)
+
+
+def _get_key_class(key):
+    """Returns the room class of an _events_key.
+
+    :param key: A room class or a room class and the hooks replaced on a
+    room.
+    :rtype: type.
+    """
+    return key[0] if type(key) is tuple else key
+
+
+def _call_hook(hook):
+    """Creates a handler calling a hook of the room.
+
+    :param str hook: The name of the hook.
+    :rtype: callable.
+    """
+    def call(the_room, the_player):
+        return getattr(the_room, hook)(the_player)
+
+    call.__name__ = call.__qualname__ = hook
+    return call
+
+
+# The handlers calling each hook.
+_HOOK_CALLERS = {hook: _call_hook(hook) for hook in ENTER_HOOKS + EXIT_HOOKS}
+
+
+def _on_hook_replaced(room_class, hook):
+    """Forgets the handlers of a room class and of its derived classes when
+    one of its hooks is replaced.
+
+    :param type room_class: The room class.
+    :param str hook: The name of the hook.
+    """
+    for cached_class in list(_capabilities):
+        if issubclass(cached_class, room_class):
+            del _capabilities[cached_class]
+    for room_events in _all_events:
+        room_events.forget(room_class)
+
+
+add_hook_listener(_on_hook_replaced)
+
+
+class _HandlerIndex(dict):
+    """Maps the _events_key of the rooms to their handlers computing them on
+    first use.
+
+    :ivar callable _build: Called with a key to get its handlers.
+    """
+
+    def __init__(self, build):
+        """Initializer.
+
+        :param callable build: Called with a key to get its handlers.
+        """
+        super().__init__()
+        self._build = build
+
+    def __missing__(self, key):
+        """Computes the handlers of a key.
+
+        :param key: A room class or a room class and the hooks replaced on
+        a room.
+        :rtype: tuple.
+        """
+        handlers = self[key] = self._build(key)
+        return handlers
+
+    def forget(self, room_class):
+        """Drops the handlers of a room class and of its derived classes.
+
+        :param type room_class: The room class.
+        """
+        for key in [key for key in self
+                    if issubclass(_get_key_class(key), room_class)]:
+            del self[key]
+
+
+class RoomEvents:
+    """The handlers of the room classes of a world and the subscribers to
+    room entries.
+
+    :ivar dict on_enter: Maps the _events_key of the rooms (usually their
+    class) to the tuple of the callables to call with the room and the
+    player when a player enters a room.
+
+    :ivar dict on_exit: Maps the _events_key of the rooms to the tuple of
+    the callables to call with the room and the player when a player leaves
+    a room.
+
+    :ivar dict by_name: Maps room names to the tuple of the callables
+    subscribed to the entry to the room.
+
+    :ivar list _subscribers: The (callable, room class) pairs subscribed by
+    room class.
+    """
+
+    def __init__(self):
+        """Initializer."""
+        self.on_enter = _HandlerIndex(self._get_enter_handlers)
+        self.on_exit = _HandlerIndex(self._get_exit_handlers)
+        self.by_name = {}
+        self._subscribers = []
+        _all_events.add(self)
+
+    def subscribe(self, callback, room_class=None, room_name=None):
+        """Subscribes to the entries to rooms.
+
+        :param callable callback: Called with the room and the player after
+        a player enters a matching room.
+
+        :param type room_class: Only the rooms of this class (or of derived
+        classes) match.
+
+        :param str room_name: Only the room with this name matches.
+        """
+        assert callable(callback)
+        if room_name is not None:
+            if room_class is not None:
+                raise ValueError("Subscribe by room class or by name.")
+            self.by_name[room_name] = \
+                self.by_name.get(room_name, ()) + (callback,)
+        else:
+            self._subscribers.append((callback, room_class or Room))
+            self.on_enter.clear()
+
+    def unsubscribe(self, callback):
+        """Removes all the subscriptions of a callable.
+
+        :param callable callback: The subscribed callable.
+        """
+        self._subscribers = [(subscriber, room_class)
+                             for subscriber, room_class in self._subscribers
+                             if subscriber != callback]
+        self.on_enter.clear()
+        for room_name, callbacks in list(self.by_name.items()):
+            callbacks = tuple(subscriber for subscriber in callbacks
+                              if subscriber != callback)
+            if callbacks:
+                self.by_name[room_name] = callbacks
+            else:
+                del self.by_name[room_name]
+
+    def forget(self, room_class):
+        """Drops the handlers of a room class and of its derived classes.
+
+        :param type room_class: The room class.
+        """
+        self.on_enter.forget(room_class)
+        self.on_exit.forget(room_class)
+
+    def has_effects(self, room_class):
+        """Checks if entering or leaving the rooms of a class calls anything.
+
+        Subscriptions by room name are not considered.
+
+        :param type room_class: The room class.
+        :rtype: bool.
+        """
+        return bool(self.on_enter[room_class] or self.on_exit[room_class])
+
+    def get_enter_handlers(self, the_room):
+        """Returns the callables to call when a player enters a room.
+
+        :param Room the_room: The room.
+        :rtype: tuple.
+        """
+        handlers = self.on_enter[the_room._events_key]
+        if self.by_name:
+            handlers += self.by_name.get(the_room.name, ())
+        return handlers
+
+    def _get_enter_handlers(self, key):
+        """Computes the entry handlers of the rooms of an _events_key.
+
+        :param key: A room class or a room class and the hooks replaced on
+        a room.
+        :rtype: tuple.
+        """
+        capabilities = _get_key_capabilities(key)
+        room_class = _get_key_class(key)
+        handlers = [_HOOK_CALLERS[hook] for hook in ENTER_HOOKS
+                    if hook in capabilities]
+        handlers.extend(callback for callback, subscribed_class
+                        in self._subscribers
+                        if issubclass(room_class, subscribed_class))
+        return tuple(handlers)
+
+    @staticmethod
+    def _get_exit_handlers(key):
+        """Computes the exit handlers of the rooms of an _events_key.
+
+        :param key: A room class or a room class and the hooks replaced on
+        a room.
+        :rtype: tuple.
+        """
+        capabilities = _get_key_capabilities(key)
+        return tuple(_HOOK_CALLERS[hook] for hook in EXIT_HOOKS
+                     if hook in capabilities)
@@ -27,3 +27,39 @@ class CommandCannotBeExecuted(ZuulException):
 
 class ThePlayerWonTheGame(ZuulException):
     """The player won the game."""
+
+
+class InvalidWorldDefinition(ZuulException):
+    """The definition of a world is not valid."""
+
+
+class WorldIsReadOnly(ZuulException):
+    """The world cannot be modified."""
+
+
+class InvalidSnapshot(ZuulException):
+    """The snapshot file is not valid."""
+
+
+class ThePlayerQuitTheGame(ZuulException):
+    """The player quit the game."""
+
+
+class InventoryFull(ZuulException):
+    """The inventory cannot hold more items."""
+
+
+class ItemNotInInventory(ZuulException):
+    """The inventory does not hold enough of an item."""
+
+
+class SolverLimitReached(ZuulException):
+    """The solver explored too many states."""
+
+
+class InvalidJournal(ZuulException):
+    """The journal of a session is not valid."""
+
+
+class UnsupportedDirection(ZuulException):
+    """The direction is not part of the directions of the world."""
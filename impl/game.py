@@ -1,17 +1,32 @@
 """Runs a game."""
 
 import sys
+import time
 
 import impl.room as room
-import impl.exceptions as exceptions
+import impl.result as result
 
 # Aliases.
 Direction = room.Direction
-ThePlayerWonTheGame = exceptions.ThePlayerWonTheGame
-ZuulException = exceptions.ZuulException
 
 # The message to signify a win.
-WINNING_MSG = 'You won!'
+WINNING_MSG = result.WINNING_MSG
+
+
+def run_command(the_player, user_input):
+    """Executes a user command on behalf of a player.
+
+    :param Player the_player: The player executing the command.
+    :param str user_input: The user input to execute.
+
+    :return: A tuple consisting of the message to write back to the user
+    (which is None if there is nothing to write) and a boolean that is True
+    when the game is over.
+    :rtype: tuple.
+    """
+    command_result = the_player.execute(user_input)
+    return command_result.message, command_result.game_over
+
 
 class Game:
     """Represents a generic Game.
@@ -24,16 +39,30 @@ class Game:
     communicate with the user. Must be a callable receiving a single argument.
 
     :ivar Player _the_player: The instance of the Player.
+
+    :ivar bool _flush_on_input: Flushes a buffered output writer (one with
+    a flush method, like impl.output.BufferedWriter) before reading the
+    user input, so interactive users see every response.
+
+    :ivar list _exit_hooks: Callables called with the player when the game
+    ends.
+
+    :ivar Metrics _metrics: Records the latency of the rounds and the
+    finished games (None to record nothing).
     """
 
     _input_reader = None
     _output_writer = None
     _the_player = None
+    _flush_on_input = True
+    _metrics = None
 
     def __init__(self,
                  input_reader=None,
                  output_writer=None,
-                 the_player=None):
+                 the_player=None,
+                 flush_on_input=True,
+                 metrics=None):
         """Initializer.
         
         :param callable input_reader: Callable to read the user input.
@@ -43,10 +72,19 @@ class Game:
         a single argument.
 
         :param Player the_player: The instance of the player to use.
+
+        :param bool flush_on_input: Flushes a buffered output writer before
+        reading the user input (turn off for scripted input).
+
+        :param Metrics metrics: Records the latency of the rounds and the
+        finished games.
         """
         self.bind_input_reader(input_reader)
         self.bind_output_writer(output_writer)
         self.bind_player(the_player)
+        self._flush_on_input = flush_on_input
+        self._exit_hooks = []
+        self._metrics = metrics
 
     def bind_input_reader(self, input_reader):
         """Binds an input reader callable.
@@ -71,6 +109,20 @@ class Game:
         """
         self._the_player = the_player
 
+    def add_exit_hook(self, hook):
+        """Adds a callable to call with the player when the game ends.
+
+        :param callable hook: The callable to add.
+        """
+        assert callable(hook)
+        self._exit_hooks.append(hook)
+
+    def flush_output(self):
+        """Flushes the output writer if it is buffered."""
+        flush = getattr(self._output_writer, 'flush', None)
+        if flush is not None:
+            flush()
+
     def exit(self):
         """Exits the application."""
         sys.exit(0)
@@ -83,15 +135,28 @@ class Game:
             "You must provide the input writer."
         assert self._the_player, "You must provide the player."
 
-        while True:
-            try:
-                user_input = self._input_reader()
-                output = self._the_player.execute_user_command(user_input)
-            except ThePlayerWonTheGame:
-                self._output_writer(WINNING_MSG)
-                break
-            except ZuulException as ex:
-                self._output_writer(str(ex))
-            else:
-                self._output_writer(output)
+        input_reader = self._input_reader
+        output_writer = self._output_writer
+        flush = getattr(output_writer, 'flush', None) \
+            if self._flush_on_input else None
+        metrics = self._metrics
+        game_over = False
+        try:
+            while not game_over:
+                if flush is not None:
+                    flush()
+                user_input = input_reader()
+                if metrics is not None:
+                    start = time.perf_counter_ns()
+                output, game_over = run_command(self._the_player, user_input)
+                if output is not None:
+                    output_writer(output)
+                if metrics is not None:
+                    metrics.record_round(time.perf_counter_ns() - start)
+        finally:
+            self.flush_output()
+            if metrics is not None and game_over:
+                metrics.games += 1
+            for hook in self._exit_hooks:
+                hook(self._the_player)
         self.exit()
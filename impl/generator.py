@@ -0,0 +1,573 @@
+"""Generates worlds procedurally.
+
+A topology describes the rooms of a world by their index (0 to the number
+of rooms minus one) and produces the connections between them:
+
+* Grid: a rectangle of rooms connected east-west and north-south.
+
+* Maze: a random spanning tree of a grid (a perfect maze) with an optional
+  fraction of the remaining grid walls removed to add loops.
+
+* Tree: a random tree where every room hangs from a random earlier room.
+
+* SmallWorld: a ring of rooms connected east-west plus random north-south
+  shortcuts between distant rooms.
+
+* Building: the floors of a building sharing the plan of another topology
+  and connected upstairs and downstairs by stairs.
+
+The directions of a topology (its DirectionTable, see impl.directions)
+are the directions of the world generate creates for it.
+
+Every topology is deterministic for a seed and never uses a direction of a
+room twice, so all the links are symmetric as World.connect_rooms makes
+them.  A placer chooses the Room class of each room:
+
+    topology = generator.Maze(1000, seed=7, loops=0.05)
+    placer = generator.weighted_placer([(RestaurantRoom, 0.01)], seed=7)
+    the_world, start_room = generator.generate(topology, placer)
+
+Nothing is kept twice in memory: rooms and connections are streamed into the
+world in batches, or into a world file in the format of impl.loader:
+
+    generator.write_world('campus.jsonl', topology, placer)
+"""
+
+import array
+import csv
+import json
+import random
+
+import impl.directions as directions
+import impl.loader as loader
+import impl.room as room
+import impl.world as world
+
+# Aliases.
+Direction = room.Direction
+FLOORS = directions.FLOORS
+FOUR_WAY = directions.FOUR_WAY
+World = world.World
+
+# The number of rooms or connections passed to the world at once.
+BATCH_SIZE = loader.BATCH_SIZE
+
+# The columns of a generated CSV world file.
+CSV_FIELDS = ('kind', 'name', 'description', 'room_class', 'path', 'from',
+              'to', 'direction')
+
+# Maps the directions of the grids to their bit in the exit masks.
+_BITS = {direction: 1 << slot for direction, slot in FOUR_WAY.slots.items()}
+
+# The largest value of _mix plus one.
+_MIX_RANGE = 1 << 64
+
+
+def _mix(seed, value):
+    """Hashes an integer with a seed (the splitmix64 finalizer).
+
+    :param int seed: The seed.
+    :param int value: The value to hash.
+    :rtype: int.
+    """
+    z = (seed * 0x9E3779B97F4A7C15 + value + 1) % _MIX_RANGE
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) % _MIX_RANGE
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) % _MIX_RANGE
+    return z ^ (z >> 31)
+
+
+class Topology:
+    """The base class of the topologies.
+
+    :ivar int seed: The seed of the random choices.
+    :ivar DirectionTable directions: The directions of the connections.
+    """
+
+    seed = 0
+    directions = FOUR_WAY
+
+    def __len__(self):
+        """Returns the number of rooms."""
+        raise NotImplementedError()
+
+    def room_name(self, index):
+        """Returns the name of a room.
+
+        :param int index: The index of the room.
+        :rtype: str.
+        """
+        return 'r{}'.format(index)
+
+    def iter_connections(self):
+        """Streams the connections between the rooms.
+
+        :return: A generator of tuples of the indexes of the two rooms and
+        the direction from the first to the second.
+        :rtype: generator.
+        """
+        raise NotImplementedError()
+
+
+class Grid(Topology):
+    """A rectangle of rooms; room (x, y) is east of (x - 1, y) and south of
+    (x, y - 1).
+
+    :ivar int width: The number of columns.
+    :ivar int height: The number of rows.
+    """
+
+    def __init__(self, width, height=None):
+        """Initializer.
+
+        :param int width: The number of columns.
+        :param int height: The number of rows (defaults to width).
+        """
+        self.width = width
+        self.height = width if height is None else height
+
+    def __len__(self):
+        """Returns the number of rooms."""
+        return self.width * self.height
+
+    def room_name(self, index):
+        """Returns the name of a room ("r<x>_<y>").
+
+        :param int index: The index of the room.
+        :rtype: str.
+        """
+        return grid_room_name(index % self.width, index // self.width)
+
+    def get_adjacent(self, index):
+        """Returns the cells of the grid next to a room.
+
+        :param int index: The index of the room.
+
+        :return: Tuples of the direction and the index of the neighbor.
+        :rtype: list.
+        """
+        width = self.width
+        x, y = index % width, index // width
+        neighbors = []
+        if y > 0:
+            neighbors.append((Direction.NORTH, index - width))
+        if y + 1 < self.height:
+            neighbors.append((Direction.SOUTH, index + width))
+        if x > 0:
+            neighbors.append((Direction.WEST, index - 1))
+        if x + 1 < width:
+            neighbors.append((Direction.EAST, index + 1))
+        return neighbors
+
+    def iter_connections(self):
+        """Streams the connections between the rooms."""
+        width = self.width
+        for y in range(self.height):
+            row = y * width
+            for x in range(width):
+                index = row + x
+                if x + 1 < width:
+                    yield index, index + 1, Direction.EAST
+                if y + 1 < self.height:
+                    yield index, index + width, Direction.SOUTH
+
+
+class Maze(Grid):
+    """A random perfect maze carved in a grid.
+
+    :ivar float loops: The probability of removing each remaining wall.
+    """
+
+    def __init__(self, width, height=None, seed=0, loops=0.0):
+        """Initializer.
+
+        :param int width: The number of columns.
+        :param int height: The number of rows (defaults to width).
+        :param int seed: The seed of the random choices.
+        :param float loops: The probability of removing each remaining wall.
+        """
+        super().__init__(width, height)
+        self.seed = seed
+        self.loops = loops
+
+    def iter_connections(self):
+        """Streams the passages of the maze (a randomized depth first
+        search)."""
+        rng = random.Random(self.seed)
+        size = len(self)
+        masks = bytearray(size)
+        visited = bytearray(size)
+        get_adjacent = self.get_adjacent
+        if size:
+            visited[0] = 1
+            stack = array.array('i', [0])
+        else:
+            stack = array.array('i')
+        while stack:
+            index = stack[-1]
+            choices = [(direction, neighbor)
+                       for direction, neighbor in get_adjacent(index)
+                       if not visited[neighbor]]
+            if not choices:
+                stack.pop()
+                continue
+            direction, neighbor = choices[rng.randrange(len(choices))]
+            visited[neighbor] = 1
+            masks[index] |= _BITS[direction]
+            masks[neighbor] |= _BITS[direction.opposite]
+            stack.append(neighbor)
+            yield index, neighbor, direction
+
+        if self.loops > 0:
+            for index, neighbor, direction in super().iter_connections():
+                if not masks[index] & _BITS[direction] and \
+                        rng.random() < self.loops:
+                    yield index, neighbor, direction
+
+
+class Tree(Topology):
+    """A random tree where every room hangs from a random earlier room.
+
+    :ivar int size: The number of rooms.
+    """
+
+    def __init__(self, size, seed=0, directions=FOUR_WAY):
+        """Initializer.
+
+        :param int size: The number of rooms.
+        :param int seed: The seed of the random choices.
+
+        :param DirectionTable directions: The directions the branches use
+        (at most 8).
+        """
+        assert directions.width <= 8
+        self.size = size
+        self.seed = seed
+        self.directions = directions
+
+    def __len__(self):
+        """Returns the number of rooms."""
+        return self.size
+
+    def iter_connections(self):
+        """Streams the branches of the tree."""
+        rng = random.Random(self.seed)
+        all_directions = self.directions.directions
+        bits = {direction: 1 << slot
+                for direction, slot in self.directions.slots.items()}
+        full = (1 << len(all_directions)) - 1
+        masks = bytearray(self.size)
+        # The rooms with a free direction.
+        open_rooms = array.array('i', [0] if self.size else [])
+        for index in range(1, self.size):
+            position = rng.randrange(len(open_rooms))
+            parent = open_rooms[position]
+            free = [direction for direction in all_directions
+                    if not masks[parent] & bits[direction]]
+            direction = free[rng.randrange(len(free))]
+            masks[parent] |= bits[direction]
+            if masks[parent] == full:
+                open_rooms[position] = open_rooms[-1]
+                open_rooms.pop()
+            masks[index] = bits[direction.opposite]
+            open_rooms.append(index)
+            yield parent, index, direction
+
+
+class SmallWorld(Topology):
+    """A ring of rooms with random shortcuts (a Newman-Watts small world).
+
+    Room i + 1 is east of room i and the last room is west of the first.
+    Every room gets a north shortcut to a random room with the probability
+    shortcuts; since the directions of a room cannot be reused, a shortcut
+    is dropped when no free room is found after a few attempts.
+
+    :ivar int size: The number of rooms.
+    :ivar float shortcuts: The probability of a shortcut per room.
+    """
+
+    # The number of random rooms tried for each shortcut.
+    ATTEMPTS = 8
+
+    def __init__(self, size, seed=0, shortcuts=0.1):
+        """Initializer.
+
+        :param int size: The number of rooms.
+        :param int seed: The seed of the random choices.
+        :param float shortcuts: The probability of a shortcut per room.
+        """
+        self.size = size
+        self.seed = seed
+        self.shortcuts = shortcuts
+
+    def __len__(self):
+        """Returns the number of rooms."""
+        return self.size
+
+    def iter_connections(self):
+        """Streams the ring and then the shortcuts."""
+        size = self.size
+        if size < 2:
+            return
+        for index in range(size - 1):
+            yield index, index + 1, Direction.EAST
+        if size > 2:
+            yield size - 1, 0, Direction.EAST
+
+        rng = random.Random(self.seed)
+        # Only shortcuts use north and south: 1 when the south is taken and
+        # 2 when the north is taken.
+        masks = bytearray(size)
+        for index in range(size):
+            if masks[index] & 2 or rng.random() >= self.shortcuts:
+                continue
+            for _ in range(self.ATTEMPTS):
+                target = rng.randrange(size)
+                if target != index and not masks[target] & 1:
+                    masks[index] |= 2
+                    masks[target] |= 1
+                    yield index, target, Direction.NORTH
+                    break
+
+
+class Building(Topology):
+    """The floors of a building sharing a floor plan.
+
+    Every floor holds the rooms of the plan; the rooms of the stairs are
+    connected upstairs to the same room of the floor above.  Room i of
+    floor f has index f * len(plan) + i and is named after the room of the
+    plan with the floor appended ("r3_4_f2").
+
+    :ivar Topology plan: The topology of every floor.
+    :ivar int floors: The number of floors.
+    :ivar tuple stairs: The indexes in the plan of the rooms with stairs.
+    """
+
+    directions = FLOORS
+
+    def __init__(self, plan, floors, stairs=(0,)):
+        """Initializer.
+
+        :param Topology plan: The topology of every floor (using the four
+        directions).
+
+        :param int floors: The number of floors.
+        :param tuple stairs: The indexes in the plan of the rooms with
+        stairs.
+        """
+        assert plan.directions is FOUR_WAY
+        self.plan = plan
+        self.floors = floors
+        self.stairs = tuple(stairs)
+        self.seed = plan.seed
+
+    def __len__(self):
+        """Returns the number of rooms."""
+        return len(self.plan) * self.floors
+
+    def room_name(self, index):
+        """Returns the name of a room ("<name in the plan>_f<floor>").
+
+        :param int index: The index of the room.
+        :rtype: str.
+        """
+        floor, index = divmod(index, len(self.plan))
+        return '{}_f{}'.format(self.plan.room_name(index), floor)
+
+    def iter_connections(self):
+        """Streams the connections of every floor and then the stairs."""
+        plan_size = len(self.plan)
+        connections = list(self.plan.iter_connections())
+        for floor in range(self.floors):
+            offset = floor * plan_size
+            for index_1, index_2, direction in connections:
+                yield index_1 + offset, index_2 + offset, direction
+        for floor in range(self.floors - 1):
+            offset = floor * plan_size
+            for index in self.stairs:
+                yield index + offset, index + offset + plan_size, Direction.UP
+
+
+def grid_room_name(x, y):
+    """Returns the name of a room of a grid.
+
+    :param int x: The column of the room.
+    :param int y: The row of the room.
+    :rtype: str.
+    """
+    return 'r{}_{}'.format(x, y)
+
+
+def weighted_placer(weights, seed=0):
+    """Creates a placer choosing room classes at random.
+
+    The choice of a room depends only on the seed and its index, so rooms
+    can be placed in any order.
+
+    :param list weights: Tuples of a Room derived class and the probability
+    of a room being of that class; the remaining probability is left to
+    the plain Room.
+
+    :param int seed: The seed of the random choices.
+
+    :return: A placer for generate, iter_rooms and write_world.
+    :rtype: callable.
+
+    :raises: ValueError.
+    """
+    thresholds = []
+    total = 0
+    for room_class, weight in weights:
+        total += weight
+        thresholds.append((int(total * _MIX_RANGE), room_class))
+    if total > 1:
+        raise ValueError("The weights add up to more than 1.")
+
+    def place(index):
+        value = _mix(seed, index)
+        for threshold, room_class in thresholds:
+            if value < threshold:
+                return room_class
+        return None
+
+    return place
+
+
+def iter_rooms(topology, placer=None, describe=None):
+    """Streams the rooms of a topology.
+
+    :param Topology topology: The topology.
+
+    :param callable placer: Called with the index of a room to get its Room
+    class (or None for the plain Room).
+
+    :param callable describe: Called with the index and the name of a room
+    to get its description (defaults to the name).
+
+    :return: A generator of tuples of the name, the description and the
+    room class for World.add_rooms.
+    :rtype: generator.
+    """
+    room_name = topology.room_name
+    for index in range(len(topology)):
+        name = room_name(index)
+        yield (name,
+               name if describe is None else describe(index, name),
+               None if placer is None else placer(index))
+
+
+def generate(topology, placer=None, describe=None, the_world=None,
+             batch_size=BATCH_SIZE):
+    """Generates a world.
+
+    :param Topology topology: The topology.
+    :param callable placer: Called with the index of a room to get its Room
+    class (or None for the plain Room).
+
+    :param callable describe: Called with the index and the name of a room
+    to get its description (defaults to the name).
+
+    :param the_world: The world to add the rooms to (like a CompactWorld)
+    which must support the directions of the topology.  A new World with
+    the directions of the topology is created when omitted.
+
+    :param int batch_size: The number of rooms or connections passed to the
+    world at once.
+
+    :return: The world and the name of its first room.
+    :rtype: tuple.
+    """
+    if the_world is None:
+        the_world = World(directions=topology.directions)
+    for batch in _batches(iter_rooms(topology, placer, describe),
+                          batch_size):
+        the_world.add_rooms(batch)
+    room_name = topology.room_name
+    connections = (
+        (room_name(index_1), room_name(index_2), direction)
+        for index_1, index_2, direction in topology.iter_connections()
+    )
+    for batch in _batches(connections, batch_size):
+        the_world.connect_many(batch)
+    return the_world, room_name(0) if len(topology) else None
+
+
+def iter_records(topology, placer=None, describe=None):
+    """Streams the records of a world file (see impl.loader).
+
+    A room_class record is emitted before the first room of every class.
+
+    :param Topology topology: The topology.
+    :param callable placer: Called with the index of a room to get its Room
+    class (or None for the plain Room).
+
+    :param callable describe: Called with the index and the name of a room
+    to get its description (defaults to the name).
+
+    :return: A generator of record dicts.
+    :rtype: generator.
+    """
+    aliases = {}
+    for name, description, room_class in iter_rooms(topology, placer,
+                                                    describe):
+        record = {'kind': 'room', 'name': name, 'description': description}
+        if room_class is not None:
+            alias = aliases.get(room_class)
+            if alias is None:
+                alias = aliases[room_class] = room_class.__name__
+                yield {'kind': 'room_class', 'name': alias,
+                       'path': '{}.{}'.format(room_class.__module__,
+                                              room_class.__qualname__)}
+            record['room_class'] = alias
+        yield record
+    room_name = topology.room_name
+    for index_1, index_2, direction in topology.iter_connections():
+        yield {'kind': 'connect', 'from': room_name(index_1),
+               'to': room_name(index_2), 'direction': direction.name}
+    if len(topology):
+        yield {'kind': 'start', 'name': room_name(0)}
+
+
+def write_world(path, topology, placer=None, describe=None,
+                file_format=None):
+    """Writes a world file that impl.loader can load.
+
+    :param str path: The path of the file.
+    :param Topology topology: The topology.
+    :param callable placer: Called with the index of a room to get its Room
+    class (or None for the plain Room).
+
+    :param callable describe: Called with the index and the name of a room
+    to get its description (defaults to the name).
+
+    :param str file_format: Either "jsonl" or "csv". When omitted it is
+    deduced by the file extension.
+    """
+    if file_format is None:
+        file_format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+    records = iter_records(topology, placer, describe)
+    with open(path, 'w', newline='', encoding='utf-8') as stream:
+        if file_format == 'csv':
+            writer = csv.DictWriter(stream, CSV_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            for record in records:
+                stream.write(json.dumps(record))
+                stream.write('\n')
+
+
+def _batches(iterable, batch_size):
+    """Splits a stream in lists.
+
+    :param iterable iterable: The stream.
+    :param int batch_size: The size of the lists.
+    :rtype: generator.
+    """
+    batch = []
+    for value in iterable:
+        batch.append(value)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
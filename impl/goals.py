@@ -0,0 +1,312 @@
+"""Implements declarative, incrementally evaluated win conditions.
+
+A goal is an expression built from the visited and has_item conditions
+combined with & (and), | (or) and ~ (not):
+
+    goal = visited('exam_room', 'mentoring-room') & has_item('textbook')
+
+Assigning a goal to a Player derived class makes its default have_won
+return whether the goal is satisfied:
+
+    class MentoringPlayer(Player):
+        goal = visited('exam_room', 'mentoring-room') & has_item('textbook')
+
+The expression is compiled once into a flat table of nodes.  Every player
+keeps a GoalTracker holding the state of each node which is updated only
+when one of the rooms or items that the goal refers to changes, so checking
+the goal costs the same no matter how many clauses it has.
+"""
+
+import array
+
+
+class Goal:
+    """The base class of the goal expressions.
+
+    :ivar CompiledGoal _compiled: The compiled goal, created on first use.
+    """
+
+    _compiled = None
+
+    def __and__(self, other):
+        """Combines two goals requiring both of them."""
+        return All(self, other)
+
+    def __or__(self, other):
+        """Combines two goals requiring either of them."""
+        return Any(self, other)
+
+    def __invert__(self):
+        """Negates a goal."""
+        return Not(self)
+
+    def compile(self):
+        """Compiles the goal.
+
+        :return: The compiled goal (created once per expression).
+        :rtype: CompiledGoal.
+        """
+        if self._compiled is None:
+            self._compiled = CompiledGoal(self)
+        return self._compiled
+
+    def track(self):
+        """Creates a tracker of the goal for a player.
+
+        :rtype: GoalTracker.
+        """
+        return GoalTracker(self.compile())
+
+
+class Visited(Goal):
+    """Satisfied when a room has been visited.
+
+    :ivar str room_name: The name of the room.
+    """
+
+    def __init__(self, room_name):
+        """Initializer.
+
+        :param str room_name: The name of the room.
+        """
+        self.room_name = room_name
+
+
+class HasItem(Goal):
+    """Satisfied when the bag holds at least a number of an item.
+
+    :ivar str item: The item.
+    :ivar int count: The minimum number of items.
+    """
+
+    def __init__(self, item, count=1):
+        """Initializer.
+
+        :param str item: The item.
+        :param int count: The minimum number of items.
+        """
+        self.item = item
+        self.count = count
+
+
+class All(Goal):
+    """Satisfied when all the sub goals are satisfied.
+
+    :ivar tuple goals: The sub goals.
+    """
+
+    def __init__(self, *goals):
+        """Initializer.
+
+        :param goals: The sub goals.
+        """
+        self.goals = goals
+
+    def __and__(self, other):
+        """Flattens chains of & into a single node."""
+        return All(*self.goals, other)
+
+
+class Any(Goal):
+    """Satisfied when any of the sub goals is satisfied.
+
+    :ivar tuple goals: The sub goals.
+    """
+
+    def __init__(self, *goals):
+        """Initializer.
+
+        :param goals: The sub goals.
+        """
+        self.goals = goals
+
+    def __or__(self, other):
+        """Flattens chains of | into a single node."""
+        return Any(*self.goals, other)
+
+
+class Not(Goal):
+    """Satisfied when the sub goal is not satisfied.
+
+    :ivar Goal goal: The sub goal.
+    """
+
+    def __init__(self, goal):
+        """Initializer.
+
+        :param Goal goal: The sub goal.
+        """
+        self.goal = goal
+
+
+def visited(*room_names):
+    """Returns a goal satisfied when all the rooms have been visited.
+
+    :param room_names: The names of the rooms.
+    :rtype: Goal.
+    """
+    if len(room_names) == 1:
+        return Visited(room_names[0])
+    return All(*[Visited(room_name) for room_name in room_names])
+
+
+def has_item(item, count=1):
+    """Returns a goal satisfied when the bag holds an item.
+
+    :param str item: The item.
+    :param int count: The minimum number of items.
+    :rtype: Goal.
+    """
+    return HasItem(item, count)
+
+
+class CompiledGoal:
+    """A goal flattened into a table of nodes.
+
+    Node 0 is the root.  A node is satisfied when the number of its
+    satisfied children reaches its threshold, negated for Not nodes.
+
+    :ivar array parents: The parent of each node (-1 for the root).
+    :ivar array thresholds: The satisfied children needed by each node.
+    :ivar bytearray negated: 1 for the Not nodes.
+
+    :ivar dict rooms: Maps room names to the Visited nodes watching them.
+
+    :ivar dict items: Maps items to lists of (node, count) tuples of the
+    HasItem nodes watching them.
+
+    :ivar bytes initial_values: The state of the nodes when nothing has
+    been visited or collected.
+
+    :ivar array initial_counts: The satisfied children of each node when
+    nothing has been visited or collected.
+    """
+
+    def __init__(self, goal):
+        """Initializer.
+
+        :param Goal goal: The goal to compile.
+
+        :raises: TypeError.
+        """
+        self.parents = array.array('i')
+        self.thresholds = array.array('i')
+        self.negated = bytearray()
+        self.rooms = {}
+        self.items = {}
+        self._add(goal, -1)
+
+        values = bytearray(len(self.parents))
+        counts = array.array('i', [0]) * len(self.parents)
+        for node in reversed(range(len(self.parents))):
+            values[node] = (counts[node] >= self.thresholds[node]) ^ \
+                self.negated[node]
+            if values[node] and self.parents[node] >= 0:
+                counts[self.parents[node]] += 1
+        self.initial_values = bytes(values)
+        self.initial_counts = counts
+
+    def _add(self, goal, parent):
+        """Adds the nodes of a goal.
+
+        Children always get greater indices than their parents.
+
+        :param Goal goal: The goal to add.
+        :param int parent: The index of the parent node.
+
+        :raises: TypeError.
+        """
+        node = len(self.parents)
+        self.parents.append(parent)
+        self.negated.append(isinstance(goal, Not))
+        if isinstance(goal, Visited):
+            self.thresholds.append(1)
+            self.rooms.setdefault(goal.room_name, []).append(node)
+        elif isinstance(goal, HasItem):
+            self.thresholds.append(1)
+            self.items.setdefault(goal.item, []).append((node, goal.count))
+        elif isinstance(goal, All):
+            self.thresholds.append(len(goal.goals))
+            for sub_goal in goal.goals:
+                self._add(sub_goal, node)
+        elif isinstance(goal, Any):
+            self.thresholds.append(1)
+            for sub_goal in goal.goals:
+                self._add(sub_goal, node)
+        elif isinstance(goal, Not):
+            self.thresholds.append(1)
+            self._add(goal.goal, node)
+        else:
+            raise TypeError("Not a goal: {!r}".format(goal))
+
+
+class GoalTracker:
+    """Keeps the state of a compiled goal for a player.
+
+    :ivar CompiledGoal _goal: The compiled goal.
+    :ivar bytearray _values: 1 for each satisfied node.
+    :ivar array _counts: The satisfied children of each node.
+    :ivar dict _item_counts: The counts of the items the goal refers to.
+    """
+
+    def __init__(self, compiled_goal):
+        """Initializer.
+
+        :param CompiledGoal compiled_goal: The goal to track.
+        """
+        self._goal = compiled_goal
+        self._values = bytearray(compiled_goal.initial_values)
+        self._counts = array.array('i', compiled_goal.initial_counts)
+        self._item_counts = dict.fromkeys(compiled_goal.items, 0)
+
+    @property
+    def satisfied(self):
+        """Returns True if the goal is satisfied.
+
+        :rtype: bool.
+        """
+        return bool(self._values[0])
+
+    def on_visit(self, room_name):
+        """Updates the goal for a visited room.
+
+        :param str room_name: The name of the visited room.
+        """
+        for node in self._goal.rooms.get(room_name, ()):
+            self._set_leaf(node, 1)
+
+    def on_item_changed(self, item, delta):
+        """Updates the goal for an item added to or removed from the bag.
+
+        :param str item: The item.
+        :param int delta: The change of the number of items.
+        """
+        try:
+            count = self._item_counts[item] + delta
+        except KeyError:
+            return
+        self._item_counts[item] = count
+        for node, minimum in self._goal.items[item]:
+            self._set_leaf(node, count >= minimum)
+
+    def _set_leaf(self, node, satisfied):
+        """Sets the state of a leaf propagating it to the root.
+
+        :param int node: The leaf node.
+        :param int satisfied: The new state of the condition.
+        """
+        values = self._values
+        counts = self._counts
+        parents = self._goal.parents
+        thresholds = self._goal.thresholds
+        negated = self._goal.negated
+
+        counts[node] = satisfied
+        value = (satisfied >= thresholds[node]) ^ negated[node]
+        while values[node] != value:
+            values[node] = value
+            node = parents[node]
+            if node < 0:
+                break
+            counts[node] += 1 if value else -1
+            value = (counts[node] >= thresholds[node]) ^ negated[node]
@@ -0,0 +1,114 @@
+"""Implements the Inventory class holding the items of a player."""
+
+import sys
+
+import impl.exceptions as exceptions
+
+# Aliases.
+InventoryFull = exceptions.InventoryFull
+ItemNotInInventory = exceptions.ItemNotInInventory
+
+
+class Inventory:
+    """A multiset of items with an optional capacity.
+
+    Items are kept as interned strings mapped to their counts, so holding
+    many copies of an item costs the same as holding one.
+
+    :ivar dict _counts: Maps the items to their counts.
+    :ivar int _size: The total number of items.
+    :ivar int capacity: The maximum total number of items (None for no limit).
+    """
+
+    __slots__ = ('_counts', '_size', 'capacity')
+
+    def __init__(self, capacity=None):
+        """Initializer.
+
+        :param int capacity: The maximum total number of items.
+        """
+        self._counts = {}
+        self._size = 0
+        self.capacity = capacity
+
+    def __contains__(self, item):
+        """Checks if the inventory holds an item.
+
+        :param str item: The item to check.
+        :rtype: bool.
+        """
+        return item in self._counts
+
+    def __len__(self):
+        """Returns the total number of items."""
+        return self._size
+
+    def __iter__(self):
+        """Iterates over the distinct items."""
+        return iter(self._counts)
+
+    def items(self):
+        """Returns the distinct items with their counts.
+
+        :return: Pairs of items and counts.
+        :rtype: iterable.
+        """
+        return self._counts.items()
+
+    def count(self, item):
+        """Returns the number of copies of an item.
+
+        :param str item: The item.
+        :rtype: int.
+        """
+        return self._counts.get(item, 0)
+
+    def add(self, item, count=1):
+        """Adds copies of an item.
+
+        :param str item: The item to add.
+        :param int count: The number of copies to add.
+
+        :raises: InventoryFull.
+        """
+        if self.capacity is not None and self._size + count > self.capacity:
+            raise InventoryFull("Cannot hold more than {} items.".format(
+                self.capacity
+            ))
+        counts = self._counts
+        if item in counts:
+            counts[item] += count
+        else:
+            counts[sys.intern(item)] = count
+        self._size += count
+
+    def remove(self, item, count=1):
+        """Removes copies of an item.
+
+        :param str item: The item to remove.
+        :param int count: The number of copies to remove.
+
+        :raises: ItemNotInInventory.
+        """
+        if not self.consume(item, count):
+            raise ItemNotInInventory("Not enough {}.".format(item))
+
+    def consume(self, item, count=1):
+        """Removes copies of an item if there are enough of them.
+
+        :param str item: The item to remove.
+        :param int count: The number of copies to remove.
+
+        :return: True if the copies were removed.
+        :rtype: bool.
+        """
+        counts = self._counts
+        remaining = counts.get(item, 0) - count
+        if remaining < 0:
+            return False
+        if remaining:
+            counts[item] = remaining
+        else:
+            counts.pop(item, None)
+        self._size -= count
+        return True
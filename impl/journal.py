@@ -0,0 +1,398 @@
+"""Persists game sessions in append-only journals.
+
+A session keeps two files:
+
+* The journal: a header holding the name of the starting room followed by
+  one record per executed command.  Every record holds the length and the
+  CRC32 of the UTF-8 encoded command; records are only ever appended, so a
+  crash can at most leave a torn record at the end which is dropped on
+  recovery.
+
+* The snapshot (the journal path plus ".snapshot"): the state of the
+  player and the size of the journal when the state was taken.  It is
+  rewritten atomically every snapshot_every commands and when the session
+  is closed.
+
+Restoring a session loads the snapshot and replays only the commands
+appended after it:
+
+    session = JournaledSession.start(the_player, 'sessions/42.journal')
+    session.execute('move up')
+    ...
+    session = JournaledSession.restore('sessions/42.journal', the_world,
+                                       MentoringPlayer)
+
+Only the commands that succeeded or won the game are journaled since
+rejected commands do not change the state of the player.
+"""
+
+import array
+import os
+import struct
+import zlib
+
+import impl.dispatch as dispatch
+import impl.exceptions as exceptions
+import impl.player as player
+
+# Aliases.
+format_user_input = dispatch.format_user_input
+InvalidJournal = exceptions.InvalidJournal
+PlayerState = player.PlayerState
+
+# Identifies a journal file.
+MAGIC = b'ZUUJ'
+
+# Identifies a snapshot file.
+SNAPSHOT_MAGIC = b'ZUUS'
+
+# The version of the binary layouts.
+VERSION = 1
+
+# The suffix added to the journal path to get the snapshot path.
+SNAPSHOT_SUFFIX = '.snapshot'
+
+# The default number of journaled commands between snapshots.
+SNAPSHOT_EVERY = 256
+
+# magic, version and the length of the name of the starting room.
+_HEADER = struct.Struct('<4sHH')
+
+# The length and the CRC32 of the command of a record.
+_RECORD = struct.Struct('<II')
+
+# magic, version, journal size, command count, current room id, the number
+# of visited rooms and the number of distinct items.
+_SNAPSHOT_HEADER = struct.Struct('<4sHQQiII')
+
+# The length of the name of an item and its count.
+_ITEM = struct.Struct('<Hi')
+
+
+def encode_state(state, journal_size, command_count):
+    """Encodes the state of a player for a snapshot file.
+
+    :param PlayerState state: The state of the player.
+    :param int journal_size: The size of the journal holding the state.
+    :param int command_count: The number of journaled commands.
+    :rtype: bytes.
+    """
+    parts = [
+        _SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, VERSION, journal_size,
+                              command_count, state.room_id,
+                              len(state.visited), len(state.items)),
+        array.array('i', state.visited).tobytes(),
+    ]
+    for item, count in state.items:
+        encoded = item.encode('utf-8')
+        parts.append(_ITEM.pack(len(encoded), count))
+        parts.append(encoded)
+    return b''.join(parts)
+
+
+def decode_state(data):
+    """Decodes a snapshot file.
+
+    :param bytes data: The contents of the snapshot file.
+
+    :return: A tuple of the PlayerState, the size of the journal holding
+    the state and the number of journaled commands.
+    :rtype: tuple.
+
+    :raises: InvalidJournal.
+    """
+    try:
+        magic, version, journal_size, command_count, room_id, \
+            visited_count, item_count = _SNAPSHOT_HEADER.unpack_from(data)
+        if magic != SNAPSHOT_MAGIC or version != VERSION:
+            raise InvalidJournal("Not a version {} snapshot.".format(VERSION))
+        offset = _SNAPSHOT_HEADER.size
+        visited = array.array('i')
+        visited.frombytes(data[offset:offset + visited_count * 4])
+        offset += visited_count * 4
+        items = []
+        for _ in range(item_count):
+            length, count = _ITEM.unpack_from(data, offset)
+            offset += _ITEM.size
+            items.append((bytes(data[offset:offset + length]).decode('utf-8'),
+                          count))
+            offset += length
+    except (struct.error, ValueError, UnicodeDecodeError) as ex:
+        raise InvalidJournal("Corrupted snapshot: {}".format(ex))
+    if len(visited) != visited_count:
+        raise InvalidJournal("Corrupted snapshot: truncated rooms.")
+    return (PlayerState(room_id, visited.tolist(), items), journal_size,
+            command_count)
+
+
+def read_journal(path, offset=None):
+    """Reads the commands of a journal.
+
+    :param str path: The path of the journal.
+
+    :param int offset: The offset of the first record to read (defaults to
+    the first record of the journal); only the header and the records from
+    the offset on are read.
+
+    :return: A tuple of the name of the starting room, the list of the
+    commands and the size of the valid part of the journal (a torn record at
+    the end is not part of it).
+    :rtype: tuple.
+
+    :raises: InvalidJournal.
+    """
+    with open(path, 'rb') as journal_file:
+        try:
+            magic, version, name_length = _HEADER.unpack(
+                journal_file.read(_HEADER.size)
+            )
+        except struct.error:
+            raise InvalidJournal("Truncated journal header: {}".format(path))
+        if magic != MAGIC or version != VERSION:
+            raise InvalidJournal("Not a version {} journal: {}".format(
+                VERSION, path
+            ))
+        header_size = _HEADER.size + name_length
+        start_room = journal_file.read(name_length).decode('utf-8')
+
+        journal_size = os.fstat(journal_file.fileno()).st_size
+        if offset is not None and not header_size <= offset <= journal_size:
+            raise InvalidJournal("The snapshot does not match the journal: {}"
+                                 .format(path))
+        base = header_size if offset is None else offset
+        journal_file.seek(base)
+        data = journal_file.read()
+
+    view = memoryview(data)
+    position = 0
+    commands = []
+    append = commands.append
+    record_size = _RECORD.size
+    while position + record_size <= len(data):
+        length, checksum = _RECORD.unpack_from(data, position)
+        end = position + record_size + length
+        if end > len(data):
+            break
+        payload = view[position + record_size:end]
+        if zlib.crc32(payload) != checksum:
+            break
+        append(str(payload, 'utf-8'))
+        position = end
+    return start_room, commands, base + position
+
+
+class Journal:
+    """An append-only file of commands.
+
+    :ivar str path: The path of the journal.
+    :ivar bool fsync: Syncs every record to the disk.
+    :ivar int size: The size of the journal.
+    :ivar file _file: The unbuffered journal file.
+    """
+
+    def __init__(self, path, start_room=None, size=None, fsync=False):
+        """Initializer.
+
+        Creates the journal when start_room is given and opens an existing
+        one otherwise.
+
+        :param str path: The path of the journal.
+        :param str start_room: The name of the starting room of a new journal.
+
+        :param int size: The size of the valid part of an existing journal;
+        anything after it (a torn record) is truncated.
+
+        :param bool fsync: Syncs every record to the disk.
+        """
+        self.path = path
+        self.fsync = fsync
+        self.size = 0
+        if start_room is not None:
+            self._file = open(path, 'wb', buffering=0)
+            name = start_room.encode('utf-8')
+            self._write(_HEADER.pack(MAGIC, VERSION, len(name)) + name)
+        else:
+            self._file = open(path, 'r+b', buffering=0)
+            if size is not None:
+                self._file.truncate(size)
+        self.size = self._file.seek(0, os.SEEK_END)
+
+    def append(self, command):
+        """Appends a command.
+
+        :param str command: The command.
+        """
+        payload = command.encode('utf-8')
+        self._write(_RECORD.pack(len(payload), zlib.crc32(payload)) + payload)
+
+    def _write(self, data):
+        """Writes data at the end of the journal.
+
+        :param bytes data: The data to write.
+        """
+        view = memoryview(data)
+        while view:
+            view = view[self._file.write(view):]
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.size += len(data)
+
+    def close(self):
+        """Closes the journal."""
+        self._file.close()
+
+
+class JournaledSession:
+    """Executes the commands of a player recording them in a journal.
+
+    The session can be passed to Game and run_command in place of the
+    player.
+
+    :ivar Player player: The player of the session.
+    :ivar Journal journal: The journal of the session.
+    :ivar int snapshot_every: The number of commands between snapshots.
+    :ivar int command_count: The number of journaled commands.
+    :ivar int _snapshot_count: The command count of the last snapshot.
+    """
+
+    def __init__(self, the_player, journal, snapshot_every=SNAPSHOT_EVERY,
+                 command_count=0):
+        """Initializer.
+
+        :param Player the_player: The player of the session.
+        :param Journal journal: The journal of the session.
+        :param int snapshot_every: The number of commands between snapshots.
+        :param int command_count: The number of journaled commands.
+        """
+        self.player = the_player
+        self.journal = journal
+        self.snapshot_every = snapshot_every
+        self.command_count = command_count
+        self._snapshot_count = command_count
+
+    @classmethod
+    def start(cls, the_player, path, snapshot_every=SNAPSHOT_EVERY,
+              fsync=False):
+        """Starts journaling a new session.
+
+        :param Player the_player: The player, standing in its starting room.
+        :param str path: The path of the journal to create.
+        :param int snapshot_every: The number of commands between snapshots.
+        :param bool fsync: Syncs every record to the disk.
+        :rtype: JournaledSession.
+        """
+        # The snapshot of an older session must not outlive its journal.
+        snapshot_path = path + SNAPSHOT_SUFFIX
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+        journal = Journal(path, start_room=the_player.current_room.name,
+                          fsync=fsync)
+        return cls(the_player, journal, snapshot_every)
+
+    @classmethod
+    def restore(cls, path, world, player_class,
+                snapshot_every=SNAPSHOT_EVERY, fsync=False):
+        """Restores a session from its snapshot and journal.
+
+        :param str path: The path of the journal.
+        :param World world: The world of the session.
+        :param type player_class: The Player derived class.
+        :param int snapshot_every: The number of commands between snapshots.
+        :param bool fsync: Syncs every record to the disk.
+        :rtype: JournaledSession.
+
+        :raises: InvalidJournal.
+        """
+        state = None
+        offset = None
+        command_count = 0
+        try:
+            with open(path + SNAPSHOT_SUFFIX, 'rb') as snapshot_file:
+                state, offset, command_count = decode_state(
+                    snapshot_file.read()
+                )
+        except FileNotFoundError:
+            pass
+
+        start_room, commands, size = read_journal(path, offset)
+        the_player = player_class(world, start_room)
+        if state is not None:
+            the_player.restore_state(state)
+        execute = the_player.execute
+        for command in commands:
+            execute(command)
+
+        journal = Journal(path, size=size, fsync=fsync)
+        session = cls(the_player, journal, snapshot_every,
+                      command_count + len(commands))
+        session._snapshot_count = command_count
+        return session
+
+    def execute(self, user_input):
+        """Executes a command journaling it if it changed the player.
+
+        :param user_input: Either the space delimited command and arguments
+        or a tuple of the command name and the list of its arguments.
+
+        :rtype: CommandResult.
+        """
+        command_result = self.player.execute(user_input)
+        if command_result.ok or command_result.won:
+            self.journal.append(format_user_input(user_input))
+            self.command_count += 1
+            if self.command_count - self._snapshot_count >= \
+                    self.snapshot_every:
+                self.snapshot()
+        return command_result
+
+    def execute_user_command(self, user_input):
+        """Executes a command raising the exceptions of Player.
+
+        :param str user_input: The command and its arguments.
+
+        :return: The output of the command.
+        :rtype: str.
+        """
+        return self.execute(user_input).raise_for_status()
+
+    def snapshot(self):
+        """Saves the state of the player replacing the previous snapshot."""
+        snapshot_path = self.journal.path + SNAPSHOT_SUFFIX
+        temporary_path = snapshot_path + '.tmp'
+        with open(temporary_path, 'wb') as snapshot_file:
+            snapshot_file.write(encode_state(
+                self.player.get_state(), self.journal.size,
+                self.command_count
+            ))
+            if self.journal.fsync:
+                snapshot_file.flush()
+                os.fsync(snapshot_file.fileno())
+        os.replace(temporary_path, snapshot_path)
+        self._snapshot_count = self.command_count
+
+    def close(self):
+        """Saves a final snapshot and closes the journal."""
+        if self.command_count != self._snapshot_count:
+            self.snapshot()
+        self.journal.close()
+
+
+def restore_sessions(paths, world, player_class,
+                     snapshot_every=SNAPSHOT_EVERY):
+    """Restores many sessions sharing a world.
+
+    :param iterable paths: The paths of the journals.
+    :param World world: The world of the sessions.
+    :param type player_class: The Player derived class.
+    :param int snapshot_every: The number of commands between snapshots.
+
+    :return: Maps the journal paths to the restored sessions.
+    :rtype: dict.
+
+    :raises: InvalidJournal.
+    """
+    return {
+        path: JournaledSession.restore(path, world, player_class,
+                                       snapshot_every)
+        for path in paths
+    }
@@ -0,0 +1,517 @@
+"""Implements a world generating its rooms on demand.
+
+A LazyWorld never holds all its rooms.  It calls a deterministic function
+with the name of a room the first time get_room (or Room.get_neighbor)
+reaches it; the function returns a RoomSpec with the description, the room
+class and the names of the neighbors by direction:
+
+    def generate_room(name):
+        ...
+        return RoomSpec(description, room_class, {Direction.NORTH: 'r0_1'})
+
+    the_world = LazyWorld(generate_room, capacity=10000)
+    the_player = Player(the_world, 'r0_0')
+
+The rooms are kept in a least recently used cache of capacity rooms; a room
+that falls out of it is generated again, identically, when it is reached
+again.  Rooms refer to their neighbors by name so players holding an
+evicted room keep working.  Like the views of CompactWorld, rooms should
+not rely on instance state since it is lost on eviction.
+
+The generating function must be symmetric (if B is north of A then A is
+south of B) and return None for the names that are not rooms.  The ids of
+the rooms are derived from their names by a RoomIds pair of functions,
+passed to the LazyWorld or held by the room_ids attribute of the generating
+function, so the world keeps nothing but the cached rooms.  Without them
+the world numbers the rooms as it reaches them and keeps their names.
+
+grid_rooms and infinite_grid adapt the topologies of impl.generator; the
+ids of the rooms of an infinite grid grow with the square of their
+distance from r0_0.
+"""
+
+import collections
+import math
+import re
+
+import impl.directions as directions
+import impl.events as events
+import impl.exceptions as exceptions
+import impl.generator as generator
+import impl.room as room
+
+# Aliases.
+Direction = room.Direction
+FOUR_WAY = directions.FOUR_WAY
+grid_room_name = generator.grid_room_name
+Room = room.Room
+RoomDoesNotExist = exceptions.RoomDoesNotExist
+RoomEvents = events.RoomEvents
+WorldIsReadOnly = exceptions.WorldIsReadOnly
+
+# The default maximum number of cached rooms.
+CAPACITY = 4096
+
+# The default maximum number of rooms a path search explores.
+MAX_SEARCHED_ROOMS = 10000
+
+# The description, the Room class (None for Room) and the names of the
+# neighbors by direction of a generated room.
+RoomSpec = collections.namedtuple(
+    'RoomSpec', ['description', 'room_class', 'exits']
+)
+
+# Converts room names to stable ids (get_id) and back (get_name).
+RoomIds = collections.namedtuple('RoomIds', ['get_id', 'get_name'])
+
+# Parses the names of the rooms of a grid.
+_GRID_NAME = re.compile(r'r(-?\d+)_(-?\d+)\Z')
+
+# The offsets of the neighbors of a room of a grid by direction.
+_OFFSETS = {
+    Direction.NORTH: (0, -1),
+    Direction.SOUTH: (0, 1),
+    Direction.WEST: (-1, 0),
+    Direction.EAST: (1, 0),
+}
+
+
+class LazyRoom(Room):
+    """A Room generated by a LazyWorld.
+
+    The LazyWorld mixes this class with the room class of each room.
+
+    :ivar LazyWorld _world: The world holding the room.
+    :ivar dict _exits: Maps directions to the names of the neighbors.
+    """
+
+    _exits = None
+
+    def add_neighbor(self, direction, adjacent_room):
+        """The exits of a generated room cannot change.
+
+        :raises: WorldIsReadOnly.
+        """
+        raise WorldIsReadOnly("Cannot connect the rooms of a lazy world.")
+
+    def remove_neighbor(self, direction):
+        """The exits of a generated room cannot change.
+
+        :raises: WorldIsReadOnly.
+        """
+        raise WorldIsReadOnly("Cannot connect the rooms of a lazy world.")
+
+    def __eq__(self, other):
+        """Two rooms are equal when they are the same room of a world.
+
+        The world can generate the same room again after evicting it.
+
+        :param other: The object to compare with.
+        :rtype: bool.
+        """
+        if not isinstance(other, LazyRoom):
+            return NotImplemented
+        return self._world is other._world and \
+            self._room_id == other._room_id
+
+    def __hash__(self):
+        """Returns the hash of the room."""
+        return hash((id(self._world), self._room_id))
+
+    @property
+    def neighbors(self):
+        """Returns the adjacent rooms, generating them if needed.
+
+        :returns: The adjacent rooms by direction.
+        :rtype: dict.
+        """
+        get_room = self._world.get_room
+        return {direction: get_room(name)
+                for direction, name in self._exits.items()}
+
+    @property
+    def neighoring_directions(self):
+        """ Return a string describing all the neighoring_directions.
+
+        :returns: Details of the room's exits.
+        :rtype: str.
+        """
+        return [direction.label for direction in self._exits]
+
+    def get_neighbor(self, direction):
+        """Gets neighbor room by direction generating it if needed.
+
+        If there is no room in that direction, return None.
+
+        :param Direction direction: The neighbor's direction.
+
+        :returns:  The room in the given direction.
+        :rtype: Room.
+        """
+        name = self._exits.get(direction)
+        if name is None:
+            return None
+        return self._world.get_room(name)
+
+
+class LocalRouter:
+    """Finds shortest paths in a LazyWorld exploring a bounded number of
+    rooms.
+
+    The search reads the exits of the rooms it explores without generating
+    the rooms, so it does not evict the cached rooms.
+
+    :ivar int max_rooms: The maximum number of rooms a search explores.
+    """
+
+    def __init__(self, max_rooms=MAX_SEARCHED_ROOMS):
+        """Initializer.
+
+        :param int max_rooms: The maximum number of rooms a search explores.
+        """
+        self.max_rooms = max_rooms
+
+    def find_path(self, source, target):
+        """Finds the shortest path between two rooms.
+
+        :param Room source: The room to start from.
+        :param Room target: The room to reach.
+
+        :return: The list of directions to follow or None if the target is
+        not found within max_rooms rooms.
+        :rtype: list.
+        """
+        get_exits = source._world.get_exits
+        target_name = target.name
+        parents = {source.name: None}
+        queue = collections.deque([source.name])
+        while queue and len(parents) <= self.max_rooms:
+            name = queue.popleft()
+            if name == target_name:
+                path = []
+                while parents[name] is not None:
+                    name, direction = parents[name]
+                    path.append(direction)
+                path.reverse()
+                return path
+            for direction, neighbor in get_exits(name).items():
+                if neighbor not in parents:
+                    parents[neighbor] = (name, direction)
+                    queue.append(neighbor)
+        return None
+
+
+class LazyWorld:
+    """A world generating its rooms on demand and caching the recent ones.
+
+    :ivar callable _generate_room: Called with the name of a room to get its
+    RoomSpec (or None if there is no such room).
+
+    :ivar int capacity: The maximum number of cached rooms.
+    :ivar OrderedDict _rooms: Maps names to the cached rooms in least
+    recently used order.
+
+    :ivar RoomIds _room_ids: Converts the names of the rooms to their ids
+    and back.
+    :ivar dict _view_classes: Maps room classes to their LazyRoom classes.
+    :ivar int generated: The number of times a room was generated.
+    :ivar int evicted: The number of rooms evicted from the cache.
+    :ivar RoomEvents events: The handlers of the room classes.
+    :ivar DirectionTable directions: The directions of the exits.
+    """
+
+    def __init__(self, generate_room, capacity=CAPACITY,
+                 max_searched_rooms=MAX_SEARCHED_ROOMS, directions=FOUR_WAY,
+                 room_ids=None):
+        """Initializer.
+
+        :param callable generate_room: Called with the name of a room to get
+        its RoomSpec (or None if there is no such room).
+
+        :param int capacity: The maximum number of cached rooms.
+        :param int max_searched_rooms: The maximum number of rooms a path
+        search explores.
+
+        :param DirectionTable directions: The directions of the exits the
+        generating function returns.
+
+        :param RoomIds room_ids: Converts the names of the rooms to their
+        ids and back (defaults to the room_ids attribute of generate_room,
+        or to numbering the rooms as they are reached).
+        """
+        self._generate_room = generate_room
+        self.capacity = capacity
+        self._rooms = collections.OrderedDict()
+        if room_ids is None:
+            room_ids = getattr(generate_room, 'room_ids', None)
+        self._room_ids = room_ids or _numbered_room_ids()
+        self._view_classes = {}
+        self._router = LocalRouter(max_searched_rooms)
+        self.events = RoomEvents()
+        self.directions = directions
+        self.generated = 0
+        self.evicted = 0
+
+    def __len__(self):
+        """Returns the number of cached rooms."""
+        return len(self._rooms)
+
+    def __contains__(self, name):
+        """Checks if a room exists, generating it if needed.
+
+        :param str name: The name of the room.
+        """
+        try:
+            self.get_room(name)
+        except RoomDoesNotExist:
+            return False
+        return True
+
+    def __iter__(self):
+        """Iterates over the names of the cached rooms."""
+        return iter(list(self._rooms))
+
+    def add_room(self, name, description, room_class=None):
+        """Rooms cannot be added to a lazy world.
+
+        :raises: WorldIsReadOnly.
+        """
+        raise WorldIsReadOnly("Cannot add rooms to a lazy world.")
+
+    def add_rooms(self, rooms):
+        """Rooms cannot be added to a lazy world.
+
+        :raises: WorldIsReadOnly.
+        """
+        raise WorldIsReadOnly("Cannot add rooms to a lazy world.")
+
+    def connect_rooms(self, room_name_1, room_name_2, direction):
+        """The rooms of a lazy world cannot be connected.
+
+        :raises: WorldIsReadOnly.
+        """
+        raise WorldIsReadOnly("Cannot connect the rooms of a lazy world.")
+
+    def connect_many(self, connections):
+        """The rooms of a lazy world cannot be connected.
+
+        :raises: WorldIsReadOnly.
+        """
+        raise WorldIsReadOnly("Cannot connect the rooms of a lazy world.")
+
+    def get_room(self, name):
+        """Gets a room by its name generating it if needed.
+
+        :param str name: The name of the room.
+
+        :returns: The room for the passed-in name.
+        :rtype: Room.
+
+        :raises: RoomDoesNotExist.
+        """
+        rooms = self._rooms
+        the_room = rooms.get(name)
+        if the_room is not None:
+            rooms.move_to_end(name)
+            return the_room
+
+        spec = self._generate_room(name)
+        if spec is None:
+            raise RoomDoesNotExist("Room {} does not exist.".format(name))
+        self.generated += 1
+        the_room = self._get_view_class(spec.room_class)(spec.description)
+        the_room.bind_world(self, name, self._room_ids.get_id(name))
+        the_room._exits = dict(spec.exits)
+        rooms[name] = the_room
+        if len(rooms) > self.capacity:
+            rooms.popitem(last=False)
+            self.evicted += 1
+        return the_room
+
+    def get_room_id(self, name):
+        """Gets the id of a room by its name.
+
+        :param str name: The name of the room.
+
+        :returns: The id of the room.
+        :rtype: int.
+
+        :raises: RoomDoesNotExist.
+        """
+        return self.get_room(name).room_id
+
+    def get_room_by_id(self, room_id):
+        """Gets a room by its id generating it if needed.
+
+        :param int room_id: The id of the room.
+
+        :returns: The room.
+        :rtype: Room.
+        """
+        return self.get_room(self._room_ids.get_name(room_id))
+
+    def get_exits(self, name):
+        """Returns the exits of a room without caching it.
+
+        :param str name: The name of the room.
+
+        :return: Maps directions to the names of the neighbors.
+        :rtype: dict.
+
+        :raises: RoomDoesNotExist.
+        """
+        the_room = self._rooms.get(name)
+        if the_room is not None:
+            return the_room._exits
+        spec = self._generate_room(name)
+        if spec is None:
+            raise RoomDoesNotExist("Room {} does not exist.".format(name))
+        return spec.exits
+
+    def _get_view_class(self, room_class):
+        """Returns the LazyRoom class to use for a room class.
+
+        :param type room_class: The room class (None for Room).
+        :rtype: type.
+        """
+        room_class = room_class or Room
+        view_class = self._view_classes.get(room_class)
+        if view_class is None:
+            view_class = type(room_class.__name__, (LazyRoom, room_class), {})
+            self._view_classes[room_class] = view_class
+        return view_class
+
+    @property
+    def router(self):
+        """Returns the router finding the shortest paths between rooms.
+
+        :rtype: LocalRouter.
+        """
+        return self._router
+
+    def add_graph_listener(self, listener):
+        """The graph of a lazy world does not change; listeners are never
+        called.
+
+        :param listener: The listener.
+        """
+
+
+def grid_rooms(topology, placer=None):
+    """Adapts a Grid topology of impl.generator to a LazyWorld.
+
+    :param Grid topology: The topology.
+    :param callable placer: Called with the index of a room to get its Room
+    class (or None for the plain Room).
+
+    :return: The function generating the rooms.
+    :rtype: callable.
+    """
+    width, height = topology.width, topology.height
+
+    def generate_room(name):
+        match = _GRID_NAME.match(name)
+        if match is None:
+            return None
+        x, y = int(match.group(1)), int(match.group(2))
+        if not (0 <= x < width and 0 <= y < height):
+            return None
+        index = y * width + x
+        return RoomSpec(
+            name, None if placer is None else placer(index),
+            {direction: topology.room_name(neighbor)
+             for direction, neighbor in topology.get_adjacent(index)}
+        )
+
+    def get_id(name):
+        x, y = _parse_grid_name(name)
+        return y * width + x
+
+    generate_room.room_ids = RoomIds(get_id, topology.room_name)
+    return generate_room
+
+
+def infinite_grid(placer=None):
+    """Generates the rooms of a grid without bounds.
+
+    The rooms are named "r<x>_<y>" for any integers x and y (like r-3_7).
+
+    :param callable placer: Called with a distinct integer per room (see
+    generator.weighted_placer) to get its Room class (or None for the plain
+    Room).
+
+    :return: The function generating the rooms.
+    :rtype: callable.
+    """
+    def generate_room(name):
+        match = _GRID_NAME.match(name)
+        if match is None:
+            return None
+        x, y = int(match.group(1)), int(match.group(2))
+        return RoomSpec(
+            name, None if placer is None else placer(_pair(x, y)),
+            {direction: grid_room_name(x + dx, y + dy)
+             for direction, (dx, dy) in _OFFSETS.items()}
+        )
+
+    generate_room.room_ids = RoomIds(
+        lambda name: _pair(*_parse_grid_name(name)),
+        lambda room_id: grid_room_name(*_unpair(room_id))
+    )
+    return generate_room
+
+
+def _parse_grid_name(name):
+    """Returns the coordinates of a room of a grid.
+
+    :param str name: The name of the room.
+    :rtype: tuple.
+    """
+    match = _GRID_NAME.match(name)
+    return int(match.group(1)), int(match.group(2))
+
+
+def _pair(x, y):
+    """Maps a pair of integers to a distinct non negative integer.
+
+    :param int x: The first integer.
+    :param int y: The second integer.
+    :rtype: int.
+    """
+    x = 2 * x if x >= 0 else -2 * x - 1
+    y = 2 * y if y >= 0 else -2 * y - 1
+    return (x + y) * (x + y + 1) // 2 + y
+
+
+def _unpair(value):
+    """Maps the integers returned by _pair back to the pairs.
+
+    :param int value: The value of _pair.
+    :rtype: tuple.
+    """
+    diagonal = (math.isqrt(8 * value + 1) - 1) // 2
+    y = value - diagonal * (diagonal + 1) // 2
+    x = diagonal - y
+    return ((x // 2 if x % 2 == 0 else -(x + 1) // 2),
+            (y // 2 if y % 2 == 0 else -(y + 1) // 2))
+
+
+def _numbered_room_ids():
+    """Numbers the rooms in the order they are reached.
+
+    The names of all the rooms reached are kept, so the generating
+    functions of unbounded worlds should provide RoomIds.
+
+    :rtype: RoomIds.
+    """
+    room_ids = {}
+    names = []
+
+    def get_id(name):
+        room_id = room_ids.get(name)
+        if room_id is None:
+            room_id = room_ids[name] = len(names)
+            names.append(name)
+        return room_id
+
+    return RoomIds(get_id, names.__getitem__)
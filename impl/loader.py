@@ -0,0 +1,261 @@
+"""Loads worlds from declarative files.
+
+A world file is either a JSON Lines file (one JSON object per line) or a
+CSV file with a header row.  Every record has a "kind" which is one of:
+
+* room_class: Gives an alias ("name") to a Room derived class found under
+  a dotted import "path", for example "mentoring.RestaurantRoom".
+
+* room: Adds a room with the passed "name" and "description". The optional
+  "room_class" refers to a room class alias.
+
+* connect: Connects the room "from" to the room "to" in a "direction"
+  which can be either the name of a Direction (NORTH) or its human friendly
+  representation (up).  The direction must belong to the DirectionTable of
+  the world (see impl.directions).
+
+* start: Sets the "name" of the starting room.
+
+Example:
+
+    {"kind": "room", "name": "theater", "description": "lecture theater"}
+    {"kind": "room", "name": "pub", "description": "pub"}
+    {"kind": "connect", "from": "theater", "to": "pub", "direction": "up"}
+    {"kind": "start", "name": "theater"}
+
+The file is streamed twice: the first pass validates the whole file and
+the second adds the rooms to the world in batches, so a file with errors
+leaves the world unchanged.
+"""
+
+import csv
+import importlib
+import json
+
+import impl.exceptions as exceptions
+import impl.room as room
+import impl.world as world
+
+# Aliases.
+Direction = room.Direction
+InvalidWorldDefinition = exceptions.InvalidWorldDefinition
+Room = room.Room
+World = world.World
+
+# The number of rooms to add to the world at once.
+BATCH_SIZE = 10000
+
+# The maximum number of problems reported when a definition is invalid.
+MAX_REPORTED_ERRORS = 20
+
+# Maps the accepted direction names to directions.
+_DIRECTIONS = {
+    **{direction.name.lower(): direction for direction in Direction},
+    **{str(direction): direction for direction in Direction},
+}
+
+
+def iter_records(path, file_format=None):
+    """Streams the records of a world file.
+
+    :param str path: The path of the file.
+
+    :param str file_format: Either "jsonl" or "csv". When omitted it is
+    deduced by the file extension.
+
+    :return: A generator of line number and record dict tuples.
+    :rtype: generator.
+
+    :raises: InvalidWorldDefinition.
+    """
+    file_format = file_format or _guess_format(path)
+    with open(path, newline='', encoding='utf-8') as stream:
+        if file_format == 'csv':
+            reader = csv.DictReader(stream)
+            for record in reader:
+                yield reader.line_num, {
+                    key: value for key, value in record.items() if value
+                }
+        elif file_format == 'jsonl':
+            for line_number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except ValueError as ex:
+                    raise InvalidWorldDefinition(
+                        "Line {}: {}".format(line_number, ex)
+                    )
+        else:
+            raise InvalidWorldDefinition(
+                "Unsupported format: {}".format(file_format)
+            )
+
+
+def load_world(path, the_world=None, room_classes=None,
+               file_format=None, batch_size=BATCH_SIZE):
+    """Loads a world from a file.
+
+    :param str path: The path of the file.
+
+    :param the_world: The world to add the rooms to. A new World is
+    created when omitted.
+
+    :param dict room_classes: Maps room class aliases to Room derived
+    classes, in addition to the room_class records of the file.
+
+    :param str file_format: Either "jsonl" or "csv". When omitted it is
+    deduced by the file extension.
+
+    :param int batch_size: The number of rooms to add at once.
+
+    :return: A tuple consisting of the world and the starting room name
+    (which is None if the file does not define one).
+    :rtype: tuple.
+
+    :raises: InvalidWorldDefinition.
+    """
+    the_world = World() if the_world is None else the_world
+    known_classes = dict(room_classes or {})
+    room_classes = dict(known_classes)
+    names = set()
+    connections = []
+    start_room = None
+    errors = []
+
+    # The file is validated before the world changes and then read again to
+    # add the rooms, so a failed load leaves the world untouched.
+    for line_number, record in iter_records(path, file_format):
+        try:
+            kind = record.get('kind')
+            if kind == 'room':
+                name = record['name']
+                if name in names or name in the_world:
+                    raise ValueError("Room {} already exists.".format(name))
+                names.add(name)
+                _get_room_class(room_classes, record.get('room_class'))
+            elif kind == 'connect':
+                connections.append((
+                    line_number,
+                    record['from'],
+                    record['to'],
+                    _get_direction(record['direction'])
+                ))
+            elif kind == 'room_class':
+                room_classes[record['name']] = \
+                    import_room_class(record['path'])
+            elif kind == 'start':
+                start_room = record['name']
+            else:
+                raise ValueError("Unknown kind: {}".format(kind))
+        except (KeyError, ValueError, ImportError, AttributeError) as ex:
+            errors.append("Line {}: {!r}".format(line_number, ex))
+
+    supported = the_world.directions.slots
+    for line_number, room_name_1, room_name_2, direction in connections:
+        for room_name in (room_name_1, room_name_2):
+            if room_name not in names and room_name not in the_world:
+                errors.append("Line {}: Room {} does not exist.".format(
+                    line_number, room_name
+                ))
+        if direction not in supported:
+            errors.append("Line {}: The world does not support {}.".format(
+                line_number, direction.name
+            ))
+    if start_room is not None and start_room not in names and \
+            start_room not in the_world:
+        errors.append("Room {} does not exist.".format(start_room))
+
+    if errors:
+        raise InvalidWorldDefinition(
+            '\n'.join(errors[:MAX_REPORTED_ERRORS])
+        )
+
+    room_classes = known_classes
+    batch = []
+    for _, record in iter_records(path, file_format):
+        kind = record.get('kind')
+        if kind == 'room':
+            batch.append((
+                record['name'],
+                record.get('description', record['name']),
+                _get_room_class(room_classes, record.get('room_class'))
+            ))
+            if len(batch) >= batch_size:
+                the_world.add_rooms(batch)
+                batch = []
+        elif kind == 'room_class':
+            room_classes[record['name']] = import_room_class(record['path'])
+    if batch:
+        the_world.add_rooms(batch)
+
+    the_world.connect_many(
+        connection[1:] for connection in connections
+    )
+    return the_world, start_room
+
+
+def _guess_format(path):
+    """Deduces the format of a world file by its extension.
+
+    :param str path: The path of the file.
+    :rtype: str.
+    """
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def _get_room_class(room_classes, alias):
+    """Returns the room class for an alias.
+
+    :param dict room_classes: The known room classes.
+    :param str alias: The alias of the room class (can be None).
+
+    :return: The room class or None for the default.
+
+    :raises: ValueError.
+    """
+    if alias is None:
+        return None
+    try:
+        return room_classes[alias]
+    except KeyError:
+        raise ValueError("Unknown room class: {}".format(alias))
+
+
+def _get_direction(direction_name):
+    """Returns the direction for a name.
+
+    :param str direction_name: The name of the direction.
+    :rtype: Direction.
+
+    :raises: ValueError.
+    """
+    try:
+        return _DIRECTIONS[direction_name.lower()]
+    except KeyError:
+        raise ValueError("Unknown direction: {}".format(direction_name))
+
+
+def import_class(path):
+    """Imports a class (or any module attribute) by its dotted path.
+
+    :param str path: The path, like "mentoring.RestaurantRoom".
+
+    :raises: ImportError, AttributeError.
+    """
+    module_name, _, class_name = path.rpartition('.')
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def import_room_class(path):
+    """Imports a Room derived class by its dotted path.
+
+    :param str path: The path, like "mentoring.RestaurantRoom".
+    :rtype: type.
+
+    :raises: ImportError, AttributeError, ValueError.
+    """
+    room_class = import_class(path)
+    if not (isinstance(room_class, type) and issubclass(room_class, Room)):
+        raise ValueError("{} is not a Room derived class.".format(path))
+    return room_class
@@ -0,0 +1,354 @@
+"""Instruments the execution of user commands and room updates.
+
+Assigning a Metrics instance to a Player class (with instrument) records:
+
+* The calls of every user command, its errors by exception type and a
+  latency histogram.
+
+* A latency histogram of the entry handlers (update_player, on_enter and
+  the subscribers of impl.events) for every Room class.
+
+* The room entry hooks, called with the player and the room it entered.
+
+A Game created with metrics also records the latency of every round
+(executing the command and writing its output) and the finished games.
+
+Histograms have fixed power of two buckets so recording costs a
+bit_length and an array increment.  Player classes without metrics pay a
+single attribute check per command and per room entry.
+
+The recorded values can be dumped as JSON or rendered in the Prometheus
+text format:
+
+    metrics = Metrics()
+    metrics.instrument(MentoringPlayer)
+    ...
+    metrics.dump('metrics.json')
+    print(metrics.render_text())
+"""
+
+import array
+import json
+import time
+
+import impl.exceptions as exceptions
+
+# Aliases.
+ZuulException = exceptions.ZuulException
+
+# The upper bound of the first bucket is 2 ** FIRST_BUCKET_BITS ns.
+FIRST_BUCKET_BITS = 8
+
+# The number of buckets; the last one has no upper bound.
+BUCKETS = 24
+
+# The command name used for the input that could not be parsed.
+UNPARSED = '<unparsed>'
+
+
+class Histogram:
+    """A histogram of durations in nanoseconds with power of two buckets.
+
+    Bucket i counts the durations below 2 ** (i + FIRST_BUCKET_BITS) ns
+    that do not fit the previous bucket; the last bucket counts the rest.
+
+    :ivar array counts: The count of each bucket.
+    :ivar int count: The number of recorded durations.
+    :ivar int total: The sum of the recorded durations.
+    """
+
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self):
+        """Initializer."""
+        self.counts = array.array('Q', bytes(8 * BUCKETS))
+        self.count = 0
+        self.total = 0
+
+    def record(self, duration):
+        """Records a duration.
+
+        :param int duration: The duration in nanoseconds.
+        """
+        index = duration.bit_length() - FIRST_BUCKET_BITS
+        if index < 0:
+            index = 0
+        elif index >= BUCKETS:
+            index = BUCKETS - 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total += duration
+
+    @staticmethod
+    def upper_bound(index):
+        """Returns the upper bound of a bucket.
+
+        :param int index: The index of the bucket.
+
+        :return: The bound in nanoseconds or None for the last bucket.
+        :rtype: int.
+        """
+        if index >= BUCKETS - 1:
+            return None
+        return 1 << (index + FIRST_BUCKET_BITS)
+
+    def percentile(self, percent):
+        """Estimates a percentile by the upper bound of its bucket.
+
+        :param float percent: The percentile (0 to 100).
+
+        :return: The estimate in nanoseconds (None when nothing was recorded
+        or the percentile falls in the last bucket).
+        :rtype: int.
+        """
+        if not self.count:
+            return None
+        rank = self.count * percent / 100
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                return self.upper_bound(index)
+        return None
+
+    def to_dict(self):
+        """Returns the histogram as a JSON serializable dict.
+
+        :rtype: dict.
+        """
+        return {
+            'count': self.count,
+            'sum_ns': self.total,
+            'buckets': [[self.upper_bound(index), bucket_count]
+                        for index, bucket_count in enumerate(self.counts)
+                        if bucket_count],
+        }
+
+
+class CommandStats:
+    """The statistics of a user command.
+
+    :ivar int calls: The number of calls.
+    :ivar dict errors: Maps exception type names to their counts.
+    :ivar Histogram latency: The latency of the calls.
+    """
+
+    __slots__ = ('calls', 'errors', 'latency')
+
+    def __init__(self):
+        """Initializer."""
+        self.calls = 0
+        self.errors = {}
+        self.latency = Histogram()
+
+    def to_dict(self):
+        """Returns the statistics as a JSON serializable dict.
+
+        :rtype: dict.
+        """
+        return {'calls': self.calls, 'errors': dict(self.errors),
+                'latency': self.latency.to_dict()}
+
+
+class Metrics:
+    """Records the statistics of commands, room updates and games.
+
+    :ivar dict commands: Maps command names to their CommandStats.
+    :ivar dict room_updates: Maps Room class names to the Histogram of
+    their entry handlers.
+
+    :ivar Histogram rounds: The latency of the rounds of instrumented games.
+    :ivar int games: The number of finished instrumented games.
+    :ivar list room_entry_hooks: Called with the player and the room after
+    a player enters a room.
+
+    :ivar callable _timer: Returns the current time in nanoseconds.
+    """
+
+    def __init__(self, timer=time.perf_counter_ns):
+        """Initializer.
+
+        :param callable timer: Returns the current time in nanoseconds.
+        """
+        self.commands = {}
+        self.room_updates = {}
+        self.rounds = Histogram()
+        self.games = 0
+        self.room_entry_hooks = []
+        self._timer = timer
+
+    def instrument(self, player_class):
+        """Records the commands of a Player class and its derived classes.
+
+        :param type player_class: The Player class.
+        """
+        player_class._metrics = self
+
+    @staticmethod
+    def uninstrument(player_class):
+        """Stops recording the commands of a Player class.
+
+        :param type player_class: The Player class.
+        """
+        player_class._metrics = None
+
+    def add_room_entry_hook(self, hook):
+        """Adds a callable called when an instrumented player enters a room.
+
+        :param callable hook: Called with the player and the room.
+        """
+        assert callable(hook)
+        self.room_entry_hooks.append(hook)
+
+    def get_command_stats(self, command_name):
+        """Returns the statistics of a command creating them if needed.
+
+        :param str command_name: The name of the command.
+        :rtype: CommandStats.
+        """
+        stats = self.commands.get(command_name)
+        if stats is None:
+            stats = self.commands[command_name] = CommandStats()
+        return stats
+
+    def call_command(self, the_player, parsed, user_input):
+        """Calls a parsed command recording its statistics.
+
+        :param Player the_player: The player executing the command.
+        :param ParsedCommand parsed: The command and its arguments.
+        :param user_input: The user input.
+        :rtype: CommandResult.
+        """
+        stats = self.get_command_stats(parsed.name)
+        stats.calls += 1
+        timer = self._timer
+        start = timer()
+        try:
+            command_result = parsed.command.call(the_player, parsed.args,
+                                                 user_input)
+        except Exception as ex:
+            stats.latency.record(timer() - start)
+            self._count_error(stats, type(ex).__name__)
+            raise
+        stats.latency.record(timer() - start)
+        if not command_result.ok and not command_result.game_over:
+            self._count_error(stats, command_result.error_type.__name__)
+        return command_result
+
+    def record_unparsed(self, error):
+        """Records user input that could not be parsed.
+
+        :param ZuulException error: The parsing error.
+        """
+        stats = self.get_command_stats(UNPARSED)
+        stats.calls += 1
+        self._count_error(stats, type(error).__name__)
+
+    @staticmethod
+    def _count_error(stats, error_name):
+        """Counts an error of a command.
+
+        :param CommandStats stats: The statistics of the command.
+        :param str error_name: The name of the exception type.
+        """
+        stats.errors[error_name] = stats.errors.get(error_name, 0) + 1
+
+    def run_room_handlers(self, the_room, the_player, handlers):
+        """Runs the entry handlers of a room timing them and calls the hooks.
+
+        :param Room the_room: The room the player entered.
+        :param Player the_player: The player.
+        :param tuple handlers: The entry handlers of the room (see
+        impl.events).
+        """
+        timer = self._timer
+        start = timer()
+        for handler in handlers:
+            handler(the_room, the_player)
+        elapsed = timer() - start
+        name = type(the_room).__name__
+        histogram = self.room_updates.get(name)
+        if histogram is None:
+            histogram = self.room_updates[name] = Histogram()
+        histogram.record(elapsed)
+        for hook in self.room_entry_hooks:
+            hook(the_player, the_room)
+
+    def record_round(self, duration):
+        """Records the latency of a round of a game.
+
+        :param int duration: The duration in nanoseconds.
+        """
+        self.rounds.record(duration)
+
+    def snapshot(self):
+        """Returns the recorded statistics.
+
+        :rtype: dict.
+        """
+        return {
+            'commands': {name: stats.to_dict()
+                         for name, stats in self.commands.items()},
+            'room_updates': {name: histogram.to_dict()
+                             for name, histogram
+                             in self.room_updates.items()},
+            'rounds': self.rounds.to_dict(),
+            'games': self.games,
+        }
+
+    def dump(self, path):
+        """Writes the recorded statistics as JSON.
+
+        :param str path: The path of the file to write.
+        """
+        with open(path, 'w') as metrics_file:
+            json.dump(self.snapshot(), metrics_file, indent=2)
+
+    def render_text(self):
+        """Renders the recorded statistics in the Prometheus text format.
+
+        :rtype: str.
+        """
+        lines = []
+        for name, stats in sorted(self.commands.items()):
+            labels = 'command="{}"'.format(name)
+            lines.append('zuul_command_calls_total{{{}}} {}'.format(
+                labels, stats.calls
+            ))
+            for error_name, count in sorted(stats.errors.items()):
+                lines.append(
+                    'zuul_command_errors_total{{{},error="{}"}} {}'.format(
+                        labels, error_name, count
+                    )
+                )
+            _render_histogram(lines, 'zuul_command_latency_seconds', labels,
+                              stats.latency)
+        for name, histogram in sorted(self.room_updates.items()):
+            _render_histogram(lines, 'zuul_room_update_seconds',
+                              'room_class="{}"'.format(name), histogram)
+        _render_histogram(lines, 'zuul_round_seconds', '', self.rounds)
+        lines.append('zuul_games_total {}'.format(self.games))
+        return '\n'.join(lines) + '\n'
+
+
+def _render_histogram(lines, metric, labels, histogram):
+    """Renders a histogram in the Prometheus text format.
+
+    :param list lines: The rendered lines to extend.
+    :param str metric: The name of the metric.
+    :param str labels: The labels of the metric.
+    :param Histogram histogram: The histogram.
+    """
+    separator = ',' if labels else ''
+    cumulative = 0
+    for index, bucket_count in enumerate(histogram.counts):
+        cumulative += bucket_count
+        bound = Histogram.upper_bound(index)
+        lines.append('{}_bucket{{{}{}le="{}"}} {}'.format(
+            metric, labels, separator,
+            '+Inf' if bound is None else bound / 1e9, cumulative
+        ))
+    label_block = '{{{}}}'.format(labels) if labels else ''
+    lines.append('{}_sum{} {}'.format(metric, label_block,
+                                      histogram.total / 1e9))
+    lines.append('{}_count{} {}'.format(metric, label_block, histogram.count))
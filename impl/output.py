@@ -0,0 +1,260 @@
+"""Implements buffered output writers for Game.
+
+Writing every message with its own print costs a system call (and a flush)
+per command.  A BufferedWriter is a callable output writer which keeps the
+messages in memory and hands them to its sink in a single write when:
+
+* The pending messages reach max_bytes.
+
+* The number of pending messages reaches max_messages.
+
+* The oldest pending message is older than max_delay seconds (checked when
+  a message is written; Game also flushes before reading user input).
+
+* flush or close is called.
+
+A BytesWriter encodes the messages once into a bytearray and passes a
+memoryview of it to sinks writing bytes, like fd_sink and socket_sink, so
+the batch reaches the file descriptor or socket without further copies.
+
+Example:
+
+    the_game = Game(
+        input_reader=read_from_stdio,
+        output_writer=make_stdio_writer(),
+        the_player=the_player
+    )
+"""
+
+import os
+import sys
+import time
+
+# The default maximum size of the pending messages.
+MAX_BYTES = 64 * 1024
+
+# The default maximum number of pending messages.
+MAX_MESSAGES = 256
+
+# The default maximum age in seconds of the oldest pending message.
+MAX_DELAY = 0.05
+
+
+def stream_sink(stream):
+    """Returns a sink writing text to a stream.
+
+    :param stream: The stream (like sys.stdout).
+    :rtype: callable.
+    """
+    def write(text):
+        stream.write(text)
+        stream.flush()
+    return write
+
+
+def fd_sink(fd):
+    """Returns a sink writing bytes to a file descriptor.
+
+    :param int fd: The file descriptor.
+    :rtype: callable.
+    """
+    def write(data):
+        with memoryview(data) as view:
+            offset = 0
+            while offset < len(view):
+                offset += os.write(fd, view[offset:])
+    return write
+
+
+def socket_sink(sock):
+    """Returns a sink writing bytes to a socket.
+
+    :param socket.socket sock: The connected socket.
+    :rtype: callable.
+    """
+    return sock.sendall
+
+
+class BufferedWriter:
+    """An output writer batching messages into text writes.
+
+    :ivar callable _sink: Receives the batches of text.
+    :ivar str terminator: Appended to every message.
+
+    :ivar int max_bytes: Flushes when the pending messages reach this size
+    (None for no limit).
+
+    :ivar int max_messages: Flushes when this number of messages is pending
+    (None for no limit).
+
+    :ivar float max_delay: Flushes when the oldest pending message is older
+    than this number of seconds (None for no limit).
+
+    :ivar callable _clock: Returns the current time in seconds.
+    :ivar list _batch: The pending messages.
+    :ivar int _pending_count: The number of pending messages.
+    :ivar int _pending_size: The size of the pending messages.
+    :ivar float _oldest: The time the oldest pending message was written.
+    :ivar int writes: The number of batches passed to the sink.
+    """
+
+    def __init__(self, sink, terminator='\n', max_bytes=MAX_BYTES,
+                 max_messages=MAX_MESSAGES, max_delay=MAX_DELAY,
+                 clock=time.monotonic):
+        """Initializer.
+
+        :param callable sink: Receives the batches.
+        :param str terminator: Appended to every message.
+        :param int max_bytes: The maximum size of the pending messages.
+        :param int max_messages: The maximum number of pending messages.
+
+        :param float max_delay: The maximum age in seconds of the oldest
+        pending message.
+
+        :param callable clock: Returns the current time in seconds.
+        """
+        assert callable(sink)
+        self._sink = sink
+        self.terminator = terminator
+        self.max_bytes = max_bytes
+        self.max_messages = max_messages
+        self.max_delay = max_delay
+        self._clock = clock
+        self._batch = []
+        self._pending_count = 0
+        self._pending_size = 0
+        self._oldest = None
+        self.writes = 0
+
+    def __call__(self, msg):
+        """Writes a message.
+
+        :param str msg: The message to write.
+        """
+        self.write(msg)
+
+    def __len__(self):
+        """Returns the number of pending messages."""
+        return self._pending_count
+
+    def write(self, msg):
+        """Writes a message, flushing if the flush policy says so.
+
+        :param str msg: The message to write.
+        """
+        if not self._pending_count and self.max_delay is not None:
+            self._oldest = self._clock()
+        self._pending_size += self._append(msg)
+        self._pending_count += 1
+        if self.is_due():
+            self.flush()
+
+    def is_due(self):
+        """Checks if the pending messages must be flushed.
+
+        :rtype: bool.
+        """
+        if not self._pending_count:
+            return False
+        if self.max_bytes is not None and \
+                self._pending_size >= self.max_bytes:
+            return True
+        if self.max_messages is not None and \
+                self._pending_count >= self.max_messages:
+            return True
+        return self.max_delay is not None and \
+            self._clock() - self._oldest >= self.max_delay
+
+    def flush(self):
+        """Writes the pending messages to the sink in a single batch."""
+        if not self._pending_count:
+            return
+        self._write_pending()
+        self._pending_count = 0
+        self._pending_size = 0
+        self._oldest = None
+        self.writes += 1
+
+    def close(self):
+        """Flushes the pending messages."""
+        self.flush()
+
+    def _append(self, msg):
+        """Adds a message to the pending batch.
+
+        :param str msg: The message.
+
+        :return: The size added to the batch.
+        :rtype: int.
+        """
+        text = msg + self.terminator
+        self._batch.append(text)
+        return len(text)
+
+    def _write_pending(self):
+        """Passes the pending batch to the sink."""
+        self._sink(''.join(self._batch))
+        self._batch.clear()
+
+
+class BytesWriter(BufferedWriter):
+    """An output writer batching messages into a single bytes buffer.
+
+    :ivar str encoding: The encoding of the messages.
+    :ivar bytearray _batch: The encoded pending messages.
+    """
+
+    def __init__(self, sink, encoding='utf-8', **kwargs):
+        """Initializer.
+
+        :param callable sink: Receives memoryviews of the batches; it must
+        not keep them after returning.
+
+        :param str encoding: The encoding of the messages.
+        :param kwargs: The flush policy of BufferedWriter.
+        """
+        super().__init__(sink, **kwargs)
+        self.encoding = encoding
+        self._batch = bytearray()
+
+    def _append(self, msg):
+        """Encodes a message into the pending buffer.
+
+        :param str msg: The message.
+
+        :return: The size added to the buffer.
+        :rtype: int.
+        """
+        batch = self._batch
+        size = len(batch)
+        batch += msg.encode(self.encoding)
+        batch += self.terminator.encode(self.encoding)
+        return len(batch) - size
+
+    def write_bytes(self, data):
+        """Writes an already encoded message as it is.
+
+        :param bytes data: The message.
+        """
+        if not self._pending_count and self.max_delay is not None:
+            self._oldest = self._clock()
+        self._batch += data
+        self._pending_size += len(data)
+        self._pending_count += 1
+        if self.is_due():
+            self.flush()
+
+    def _write_pending(self):
+        """Passes a view of the pending buffer to the sink."""
+        with memoryview(self._batch) as view:
+            self._sink(view)
+        self._batch.clear()
+
+
+def make_stdio_writer(**kwargs):
+    """Creates a buffered writer of the standard output.
+
+    :param kwargs: The flush policy of BufferedWriter.
+    :rtype: BufferedWriter.
+    """
+    return BufferedWriter(stream_sink(sys.stdout), **kwargs)
@@ -1,31 +1,153 @@
 """Implements the Player class."""
 
-import sys
+import collections
 
+import impl.directions as directions
+import impl.dispatch as dispatch
 import impl.exceptions as exceptions
+import impl.inventory as inventory
+import impl.result as result
 import impl.room as room
+import impl.visited as visited
 
 # Aliases.
+CANNOT_BE_EXECUTED = result.CANNOT_BE_EXECUTED
 CommandCannotBeExecuted = exceptions.CommandCannotBeExecuted
+CommandResult = result.CommandResult
+ThePlayerQuitTheGame = exceptions.ThePlayerQuitTheGame
 ThePlayerWonTheGame = exceptions.ThePlayerWonTheGame
 Direction = room.Direction
+FAILED = result.FAILED
+GAME_QUIT = result.GAME_QUIT
+GAME_WON = result.GAME_WON
+Dispatcher = dispatch.Dispatcher
 FailedToExecuteAction = exceptions.FailedToExecuteAction
+format_user_input = dispatch.format_user_input
+FOUR_WAY = directions.FOUR_WAY
+Inventory = inventory.Inventory
+InventoryFull = exceptions.InventoryFull
+OK = result.OK
+QUIT = result.QUIT
+RoomDoesNotExist = exceptions.RoomDoesNotExist
 UnsupportedCommand = exceptions.UnsupportedCommand
+VisitedRooms = visited.VisitedRooms
+ZuulException = exceptions.ZuulException
+
+
+# The state of a player that can be saved and restored: the id of the
+# current room, the ids of the visited rooms in the order of visit and the
+# (item, count) pairs of the bag.
+PlayerState = collections.namedtuple(
+    'PlayerState', ['room_id', 'visited', 'items']
+)
+
+
+def _render_cannot_be_executed(user_input):
+    """Renders the message of a command that cannot be executed.
+
+    :param user_input: The user input.
+    :rtype: str.
+    """
+    return "Command <{}> cannot be executed.".format(
+        format_user_input(user_input)
+    )
+
+
+def _render_entered_room(the_room):
+    """Renders the message of a command moving the player.
+
+    :param Room the_room: The room the player entered.
+    :rtype: str.
+    """
+    return "You are now in: {} ".format(str(the_room))
+
+
+class CommandRecord:
+    """Holds the outcome of a command executed in a batch.
+
+    :ivar command: The command as it was passed.
+    :ivar CommandResult result: The result of the command.
+    """
+
+    __slots__ = ('command', 'result')
+
+    def __init__(self, command, command_result):
+        """Initializer.
+
+        :param command: The command as it was passed.
+        :param CommandResult command_result: The result of the command.
+        """
+        self.command = command
+        self.result = command_result
+
+    @property
+    def output(self):
+        """Returns the output of a successful command (None otherwise).
+
+        :rtype: str.
+        """
+        return self.result.message if self.result.ok else None
+
+    @property
+    def error(self):
+        """Returns the exception describing a failed command.
+
+        :return: The exception or None if the command succeeded or won.
+        :rtype: ZuulException.
+        """
+        return None if self.result.won else self.result.error
+
+    @property
+    def won(self):
+        """Returns True if the command won the game.
+
+        :rtype: bool.
+        """
+        return self.result.won
 
 
 class UserCommand:
     """Decorates a member method converting it to a user-command.
 
     :ivar callable _function: The callable to decorate.
+
+    :ivar dict converters: Maps parameter names to the callables converting
+    the arguments while parsing, or to the names of class attributes of the
+    Player class holding them.
+
+    :ivar int minimum: The minimum number of arguments.
+    :ivar int maximum: The maximum number of arguments (None for no limit).
+    :ivar tuple parameter_names: The names of the positional parameters.
     """
 
-    def __init__(self, function):
+    def __init__(self, function, converters=None):
         """Initializer.
 
         :param callable function: The member method to decorate.
+        :param dict converters: The converters of the arguments.
         """
         self._function = function
         self.__doc__ = function.__doc__.split('\n')[0]
+        self.converters = converters or {}
+        self.minimum, self.maximum, self.parameter_names = \
+            dispatch.get_arity(function)
+
+    @classmethod
+    def with_converters(cls, **converters):
+        """Decorates a member method converting some of its arguments.
+
+        A converter receives the argument as a string and returns its value
+        or raises CommandCannotBeExecuted:
+
+            @UserCommand.with_converters(direction='parse_direction')
+            def move(self, direction):
+
+        :param converters: Maps parameter names to the converters or to the
+        names of class attributes of the Player class holding them.
+
+        :rtype: callable.
+        """
+        return lambda function: cls(function, converters)
 
     def __call__(self, the_instance, *args, **kwargs):
         """Allows for callable like behaviour.
@@ -38,12 +160,54 @@ class UserCommand:
 
         :return: Returns the return value of the wrapped function.
         :rtype: str.
+
+        :raises: FailedToExecuteAction, ThePlayerWonTheGame,
+        ThePlayerQuitTheGame.
         """
-        return str(self._function(the_instance, *args, **kwargs))
+        value = self._function(the_instance, *args, **kwargs)
+        if isinstance(value, CommandResult):
+            if value is CANNOT_BE_EXECUTED:
+                raise CommandCannotBeExecuted
+            return value.raise_for_status()
+        return str(value)
+
+    def call(self, the_instance, args, user_input):
+        """Calls the command returning its result.
+
+        The exceptions of the commands signaling their outcome and any other
+        ZuulException are converted to results; any other exception
+        propagates.
+
+        :param Player the_instance: The player executing the command.
+        :param tuple args: The converted arguments.
+        :param user_input: The user input used in the messages.
+        :rtype: CommandResult.
+        """
+        try:
+            value = self._function(the_instance, *args)
+        except CommandCannotBeExecuted:
+            return CommandResult(FAILED, user_input,
+                                 _render_cannot_be_executed)
+        except ThePlayerWonTheGame:
+            return GAME_WON
+        except ThePlayerQuitTheGame:
+            return GAME_QUIT
+        except ZuulException as ex:
+            return CommandResult.from_error(ex)
+        if isinstance(value, CommandResult):
+            if value is CANNOT_BE_EXECUTED:
+                return CommandResult(FAILED, user_input,
+                                     _render_cannot_be_executed)
+            return value
+        return CommandResult(OK, value)
 
 
 class PlayerMeta(type):
-    """Used to add the user commands to a Player class. """
+    """Used to add the user commands to a Player class.
+
+    Also compiles the Dispatcher parsing the user input of the class and
+    the directions of its "move" command.
+    """
 
     def __init__(cls, name, bases, attrs):
         """Initializes the class.
@@ -62,37 +226,68 @@ class PlayerMeta(type):
             if isinstance(attr_value, UserCommand):
                 cls._commands[attr_name] = attr_value
 
+        if 'directions' in attrs and '_DIRECTIONS' not in attrs:
+            cls._DIRECTIONS = dict(cls.directions.parse)
+
+        cls._dispatcher = Dispatcher(
+            cls, cls._commands,
+            allow_abbreviations=getattr(cls, 'allow_abbreviations', True)
+        )
+
 
 class Player(metaclass=PlayerMeta):
     """The base class for a player. 
     
     Allows the definition of commands as you specialize its functionality.
 
-    :cvar dict _DIRECTIONS: Used in the "move" command.
+    :cvar DirectionTable directions: The directions of the "move" command.
+    :cvar dict _DIRECTIONS: Maps the arguments of the "move" command to
+    directions (computed from directions).
     
     :ivar World _word: The world where the player plays.
 
     :ivar Room _room: The current room where the player stands.
 
-    :ivar set _rooms_already_visited: Holds a list of the room names that
-    were already visited.
+    :ivar VisitedRooms _rooms_already_visited: Holds the ids of the rooms
+    that were already visited.
 
-    :ivar list _bag: Holds collected items from rooms.
+    :ivar Inventory _bag: Holds collected items from rooms.
 
     :cvar dict _commands: Holds a list of all the available commands.
+
+    :cvar Dispatcher _dispatcher: Parses the user input into commands.
+
+    :cvar bool allow_abbreviations: Accepts unique prefixes of the command
+    names.
+
+    :cvar int bag_capacity: The maximum number of items in the bag (None
+    for no limit).
+
+    :cvar Goal goal: The goal of the game. When set, have_won returns True
+    once the goal is satisfied.
+
+    :ivar GoalTracker _goal_tracker: Tracks the goal of the player.
+
+    :ivar callable _state_listener: Called with the player when it enters a
+    room or its bag changes.
+
+    :cvar Metrics _metrics: Records the statistics of the commands and the
+    room updates (None when the class is not instrumented).
     """
-    _DIRECTIONS = {
-        'up': Direction.NORTH,
-        'down': Direction.SOUTH,
-        'left': Direction.WEST,
-        'right': Direction.EAST,
-    }
+    directions = FOUR_WAY
 
     _world = None
     _room = None
     _commands = None
+    _dispatcher = None
+    allow_abbreviations = True
     _rooms_already_visited = None
     _bag = None
+    bag_capacity = None
+    goal = None
+    _goal_tracker = None
+    _state_listener = None
+    _metrics = None
 
     def __init__(self, world=None, start_room=None):
         """Initializer.
@@ -101,17 +296,70 @@ class Player(metaclass=PlayerMeta):
         :param str start_room: The starting room name.
         """
         self.bind_world(world, start_room)
-        self._rooms_already_visited = {
-            str(self._room)
-        }
-        self._bag = []
+        self._rooms_already_visited = VisitedRooms(self._world)
+        self._rooms_already_visited.add(self._room)
+        self._bag = Inventory(self.bag_capacity)
+        if self.goal is not None:
+            self._goal_tracker = self.goal.track()
+            self._goal_tracker.on_visit(self._room.name)
+
+    @property
+    def bag(self):
+        """Returns the bag of the player.
 
-    def add_to_bag(self, item):
+        :rtype: Inventory.
+        """
+        return self._bag
+
+    def add_to_bag(self, item, count=1):
         """Adds a collected item to the bag.
 
         :param str item: The item to add in the bag.
+        :param int count: The number of copies to add.
+
+        :return: False if the bag is full.
+        :rtype: bool.
+        """
+        try:
+            self._bag.add(item, count)
+        except InventoryFull:
+            return False
+        if self._goal_tracker is not None:
+            self._goal_tracker.on_item_changed(item, count)
+        if self._state_listener is not None:
+            self._state_listener(self)
+        return True
+
+    def remove_from_bag(self, item, count=1):
+        """Removes an item from the bag.
+
+        :param str item: The item to remove.
+        :param int count: The number of copies to remove.
+
+        :raises: ItemNotInInventory.
         """
-        self._bag.append(item)
+        self._bag.remove(item, count)
+        if self._goal_tracker is not None:
+            self._goal_tracker.on_item_changed(item, -count)
+        if self._state_listener is not None:
+            self._state_listener(self)
+
+    def consume(self, item, count=1):
+        """Removes an item from the bag if there are enough copies of it.
+
+        :param str item: The item to remove.
+        :param int count: The number of copies to remove.
+
+        :return: True if the copies were removed.
+        :rtype: bool.
+        """
+        if not self._bag.consume(item, count):
+            return False
+        if self._goal_tracker is not None:
+            self._goal_tracker.on_item_changed(item, -count)
+        if self._state_listener is not None:
+            self._state_listener(self)
+        return True
 
     def is_in_bag(self, item):
         """Checks if an item is in the bag.
@@ -132,10 +380,29 @@ class Player(metaclass=PlayerMeta):
         :returns: True if the user has already visited all the rooms.
         :rtype: bool.
         """
-        for room_name in room_names:
-            if room_name not in self._rooms_already_visited:
-                return False
-        return True
+        get_room_id = self._world.get_room_id
+        try:
+            return self._rooms_already_visited.contains_all(
+                get_room_id(room_name) for room_name in room_names
+            )
+        except RoomDoesNotExist:
+            return False
+
+    @property
+    def visited_rooms(self):
+        """Returns the rooms that were already visited.
+
+        :rtype: VisitedRooms.
+        """
+        return self._rooms_already_visited
+
+    def unvisited_neighbors(self):
+        """Returns the neighbors of the current room not visited yet.
+
+        :return: The unvisited neighbors by direction.
+        :rtype: dict.
+        """
+        return self._rooms_already_visited.unvisited_neighbors(self._room)
 
     def bind_world(self, world, room):
         """Binds a world.
@@ -149,12 +416,59 @@ class Player(metaclass=PlayerMeta):
     def have_won(self):
         """Checks if the player has won the game.
 
-        To be re-implemented in derived Player classes.
+        To be re-implemented in derived Player classes unless they define
+        a goal.
 
         :return: True if the player has won the game.
         :rtype: bool.
         """
-        raise NotImplemented
+        if self._goal_tracker is None:
+            raise NotImplementedError
+        return self._goal_tracker.satisfied
+
+    def set_state_listener(self, listener):
+        """Sets the callable notified when the state of the player changes.
+
+        The listener is called with the player after it enters a room and
+        after its bag changes.
+
+        :param callable listener: The listener (None to remove it).
+        """
+        self._state_listener = listener
+
+    def get_state(self):
+        """Returns the state of the player.
+
+        Only the current room, the visited rooms and the bag are included;
+        derived classes keeping more state must extend it.
+
+        :rtype: PlayerState.
+        """
+        return PlayerState(self._room.room_id,
+                           list(self._rooms_already_visited),
+                           list(self._bag.items()))
+
+    def restore_state(self, state):
+        """Restores a state returned by get_state.
+
+        :param PlayerState state: The state to restore.
+        """
+        get_room_by_id = self._world.get_room_by_id
+        self._room = get_room_by_id(state.room_id)
+        self._rooms_already_visited = VisitedRooms(self._world)
+        self._bag = Inventory(self.bag_capacity)
+        goal_tracker = None
+        if self.goal is not None:
+            goal_tracker = self._goal_tracker = self.goal.track()
+        for room_id in state.visited:
+            the_room = get_room_by_id(room_id)
+            self._rooms_already_visited.add(the_room)
+            if goal_tracker is not None:
+                goal_tracker.on_visit(the_room.name)
+        for item, count in state.items:
+            self._bag.add(item, count)
+            if goal_tracker is not None:
+                goal_tracker.on_item_changed(item, count)
 
     @property
     def current_room(self):
@@ -165,6 +479,28 @@ class Player(metaclass=PlayerMeta):
         """
         return self._room
 
+    def execute(self, user_input):
+        """Executes a command returning its result instead of raising.
+
+        :param user_input: Either the space delimited command and arguments
+        or a tuple of the command name and the list of its arguments.
+
+        :rtype: CommandResult.
+        """
+        try:
+            if isinstance(user_input, str):
+                parsed = self._dispatcher.parse(user_input)
+            else:
+                parsed = self._dispatcher.bind(user_input[0], user_input[1],
+                                               user_input)
+        except ZuulException as ex:
+            if self._metrics is not None:
+                self._metrics.record_unparsed(ex)
+            return CommandResult.from_error(ex)
+        if self._metrics is not None:
+            return self._metrics.call_command(self, parsed, user_input)
+        return parsed.command.call(self, parsed.args, user_input)
+
     def execute_user_command(self, user_input):
         """Executes a command as it is provided from the user.
 
@@ -174,41 +510,56 @@ class Player(metaclass=PlayerMeta):
         The first token is the command name and the rest consists of the
         arguments to be passed to the action.
 
-        :return: The return value of the action. This must be a boolean; if
-        True this will signify the end of a game.
+        :return: The output of the command.
+        :rtype: str.
 
-        :rtype: bool.
+        :raises: UnsupportedCommand, FailedToExecuteAction,
+        ThePlayerWonTheGame, ThePlayerQuitTheGame.
+        """
+        return self.execute(user_input).raise_for_status()
+
+    def execute_batch(self, commands, stop_on_win=True, stop_on_error=False):
+        """Executes many commands in a single pass.
+
+        Quitting always stops the batch.
+
+        :param iterable commands: The commands to execute; each one is
+        either the user input as a string or a tuple of the command name
+        and the list of its arguments.
+
+        :param bool stop_on_win: Stops at the first command winning the game.
+        :param bool stop_on_error: Stops at the first command that fails.
 
-        :raises: UnsupportedCommand, FailedToExecuteAction.
+        :return: A CommandRecord for each executed command.
+        :rtype: list.
         """
-        command_name, args = self.unwrap_user_input(user_input)
-        command = self._get_command(command_name)
-        try:
-            return str(command(self, *args))
-        except CommandCannotBeExecuted:
-            msg = "Command <{}> cannot be executed.".format(user_input)
-            raise FailedToExecuteAction(msg)
-        except TypeError:
-            raise FailedToExecuteAction(
-                "Failed to execute: {} ".format(user_input)
-            )
+        execute = self.execute
+        records = []
+        append = records.append
+        for command in commands:
+            command_result = execute(command)
+            append(CommandRecord(command, command_result))
+            status = command_result.status
+            if status == OK:
+                continue
+            if status == QUIT:
+                break
+            if stop_on_win if command_result.won else stop_on_error:
+                break
+        return records
 
     def _get_command(self, command_name):
         """Returns the callable for the specified command.
 
-        :param str command_name: The name of the command to look-up.
+        :param str command_name: The name (or a unique prefix of the name)
+        of the command to look-up.
 
         :return: The callable for the passed-in command name.
         :rtype: callable.
 
         :raises: UnsupportedCommand.
         """
-        try:
-            return self._commands[command_name]
-        except KeyError:
-            raise UnsupportedCommand(
-                "Command: {} not supported".format(command_name)
-            )
+        return self._dispatcher.get_command(command_name)[1]
 
     @classmethod
     def unwrap_user_input(cls, user_input):
@@ -223,33 +574,99 @@ class Player(metaclass=PlayerMeta):
         tokens = [token for token in user_input.split(' ') if token]
         return tokens[0], tokens[1:]
 
-    @UserCommand
-    def move(self, direction):
-        """Moves to a direction.
+    @classmethod
+    def parse_direction(cls, direction):
+        """Converts the argument of the "move" command.
+
+        :param str direction: The direction (one of the labels of the
+        directions of the class, like up-down-left-right).
+        :rtype: Direction.
 
-        :param str direction: The direction to move (can be up-down-left-right).
-        
         :raises CommandCannotBeExecuted.
         """
         try:
-            direction = self._DIRECTIONS[direction]
+            return cls._DIRECTIONS[direction]
         except KeyError:
             raise CommandCannotBeExecuted
+
+    @UserCommand.with_converters(direction='parse_direction')
+    def move(self, direction):
+        """Moves to a direction.
+
+        :param Direction direction: The direction to move (parsed from
+        up-down-left-right).
+
+        :return: The entered room or CANNOT_BE_EXECUTED if there is no room
+        in the direction.
+        :rtype: CommandResult.
+        """
         new_room = self._room.get_neighbor(direction)
-        if new_room:
-            self._room = new_room
-            self._rooms_already_visited.add(str(self._room))
-            self._room.update_player(self)
-            if self.have_won():
-                raise ThePlayerWonTheGame
-            return "You are now in: {} ".format(str(self._room))
+        if not new_room:
+            return CANNOT_BE_EXECUTED
+        if self._enter(new_room):
+            return GAME_WON
+        return CommandResult(OK, new_room, _render_entered_room)
+
+    @UserCommand
+    def goto(self, room_name):
+        """Goes to a room following the shortest path.
+
+        Every room on the way is visited as if the player moved to it.
+
+        :param str room_name: The name of the room to go to.
+
+        :return: The entered room or CANNOT_BE_EXECUTED if there is no path
+        to the room.
+        :rtype: CommandResult.
+        """
+        try:
+            target = self._world.get_room(room_name)
+        except RoomDoesNotExist:
+            return CANNOT_BE_EXECUTED
+        path = self._world.router.find_path(self._room, target)
+        if path is None:
+            return CANNOT_BE_EXECUTED
+        for direction in path:
+            if self._enter(self._room.get_neighbor(direction)):
+                return GAME_WON
+        return CommandResult(OK, self._room, _render_entered_room)
+
+    def _enter(self, new_room):
+        """Enters a room updating the player.
+
+        :param Room new_room: The room to enter.
+
+        :return: True if entering the room won the game.
+        :rtype: bool.
+        """
+        events = self._world.events
+        previous_room = self._room
+        for handler in events.on_exit[previous_room._events_key]:
+            handler(previous_room, self)
+        self._room = new_room
+        self._rooms_already_visited.add(new_room)
+        if self._goal_tracker is not None:
+            self._goal_tracker.on_visit(new_room.name)
+        # Only the rooms with effects have handlers (see impl.events).
+        handlers = events.on_enter[new_room._events_key]
+        if events.by_name:
+            handlers += events.by_name.get(new_room.name, ())
+        if self._metrics is not None:
+            self._metrics.run_room_handlers(new_room, self, handlers)
         else:
-            raise CommandCannotBeExecuted
+            for handler in handlers:
+                handler(new_room, self)
+        if self._state_listener is not None:
+            self._state_listener(self)
+        return bool(self.have_won())
 
     @UserCommand
     def quit(self):
-        """Quits the game exiting the application."""
-        sys.exit(0)
+        """Quits the game.
+
+        :rtype: CommandResult.
+        """
+        return GAME_QUIT
 
     @UserCommand
     def ls(self):
@@ -271,7 +688,6 @@ class Player(metaclass=PlayerMeta):
               "You have already visited: {}".format(
             str(self._room),
             ' '.join(self._room.neighoring_directions),
-            ' '.join(['<{}>'.format(room_name) for room_name in
-                      self._rooms_already_visited])
+            self._rooms_already_visited.render()
         )
         return msg
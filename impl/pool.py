@@ -0,0 +1,409 @@
+"""Implements a pool of players keeping their state in contiguous arrays.
+
+Every Player holds its own current room, visited set and bag which costs a
+few hundred bytes per player.  A PlayerPool keeps the same state for all its
+agents in a struct of arrays:
+
+* The id of the current room of each agent.
+
+* A bitset row per agent holding the visited rooms.
+
+* A column per item holding the count of the item for each agent.
+
+The pool hands out lightweight handles that are instances of the player
+class, so the user commands and have_won overrides keep working.  Note
+that the handles keep no state of their own: player classes used in a pool
+should keep their state in the standard player attributes.
+"""
+
+import array
+
+import impl.inventory as inventory
+import impl.visited as visited
+
+# Aliases.
+Inventory = inventory.Inventory
+InventoryFull = inventory.InventoryFull
+VisitedRooms = visited.VisitedRooms
+
+
+class PooledVisitedRooms(VisitedRooms):
+    """The visited rooms of an agent stored in the pool's bitset rows.
+
+    :ivar PlayerPool _pool: The pool holding the state.
+    :ivar int _agent: The index of the agent.
+    """
+
+    __slots__ = ('_pool', '_agent')
+
+    def __init__(self, pool, agent):
+        """Initializer.
+
+        :param PlayerPool pool: The pool holding the state.
+        :param int agent: The index of the agent.
+        """
+        self._pool = pool
+        self._agent = agent
+
+    def __len__(self):
+        """Returns the number of visited rooms."""
+        return self._pool.visited_counts[self._agent]
+
+    def __contains__(self, room_id):
+        """Checks if a room was visited.
+
+        :param int room_id: The id of the room.
+        :rtype: bool.
+        """
+        return self._pool.has_visited(self._agent, room_id)
+
+    def __iter__(self):
+        """Iterates over the ids of the visited rooms in ascending order."""
+        pool = self._pool
+        start = self._agent * pool.stride
+        row = pool.visited_bits[start:start + pool.stride]
+        for index, byte in enumerate(row):
+            while byte:
+                lowest = byte & -byte
+                yield (index << 3) + lowest.bit_length() - 1
+                byte ^= lowest
+
+    def add(self, the_room):
+        """Marks a room as visited.
+
+        :param Room the_room: The visited room.
+
+        :return: True if the room was not visited before.
+        :rtype: bool.
+        """
+        return self._pool.mark_visited(self._agent, the_room.room_id)
+
+    def render(self):
+        """Renders the descriptions of the visited rooms.
+
+        :return: The descriptions of the visited rooms in the order of
+        their ids.
+        :rtype: str.
+        """
+        get_room_by_id = self._pool.world.get_room_by_id
+        return ' '.join(
+            '<{}>'.format(str(get_room_by_id(room_id))) for room_id in self
+        )
+
+
+class PooledInventory(Inventory):
+    """The bag of an agent stored in the pool's item columns.
+
+    :ivar PlayerPool _pool: The pool holding the state.
+    :ivar int _agent: The index of the agent.
+    """
+
+    __slots__ = ('_pool', '_agent')
+
+    def __init__(self, pool, agent):
+        """Initializer.
+
+        :param PlayerPool pool: The pool holding the state.
+        :param int agent: The index of the agent.
+        """
+        self._pool = pool
+        self._agent = agent
+
+    @property
+    def capacity(self):
+        """Returns the maximum total number of items.
+
+        :rtype: int.
+        """
+        return self._pool.player_class.bag_capacity
+
+    def __contains__(self, item):
+        """Checks if the inventory holds an item.
+
+        :param str item: The item to check.
+        :rtype: bool.
+        """
+        return self.count(item) > 0
+
+    def __len__(self):
+        """Returns the total number of items."""
+        return self._pool.bag_sizes[self._agent]
+
+    def __iter__(self):
+        """Iterates over the distinct items."""
+        return (item for item, _ in self.items())
+
+    def items(self):
+        """Returns the distinct items with their counts.
+
+        :return: Pairs of items and counts.
+        :rtype: iterable.
+        """
+        agent = self._agent
+        return [
+            (item, column[agent])
+            for item, column in self._pool.item_columns.items()
+            if column[agent]
+        ]
+
+    def count(self, item):
+        """Returns the number of copies of an item.
+
+        :param str item: The item.
+        :rtype: int.
+        """
+        column = self._pool.item_columns.get(item)
+        return 0 if column is None else column[self._agent]
+
+    def add(self, item, count=1):
+        """Adds copies of an item.
+
+        :param str item: The item to add.
+        :param int count: The number of copies to add.
+
+        :raises: InventoryFull.
+        """
+        capacity = self.capacity
+        if capacity is not None and len(self) + count > capacity:
+            raise InventoryFull("Cannot hold more than {} items.".format(
+                capacity
+            ))
+        self._pool.get_item_column(item)[self._agent] += count
+        self._pool.bag_sizes[self._agent] += count
+
+    def consume(self, item, count=1):
+        """Removes copies of an item if there are enough of them.
+
+        :param str item: The item to remove.
+        :param int count: The number of copies to remove.
+
+        :return: True if the copies were removed.
+        :rtype: bool.
+        """
+        if self.count(item) < count:
+            return False
+        self._pool.item_columns[item][self._agent] -= count
+        self._pool.bag_sizes[self._agent] -= count
+        return True
+
+
+class PooledPlayer:
+    """Mixed with a player class to read the player state from a pool.
+
+    :ivar PlayerPool _pool: The pool holding the state.
+    :ivar int _agent: The index of the agent.
+    """
+
+    __slots__ = ('_pool', '_agent')
+
+    @property
+    def agent(self):
+        """Returns the index of the agent in the pool.
+
+        :rtype: int.
+        """
+        return self._agent
+
+    @property
+    def _world(self):
+        """Returns the world of the pool."""
+        return self._pool.world
+
+    @property
+    def _room(self):
+        """Returns the current room of the agent."""
+        return self._pool.world.get_room_by_id(
+            self._pool.positions[self._agent]
+        )
+
+    @_room.setter
+    def _room(self, the_room):
+        """Sets the current room of the agent."""
+        self._pool.positions[self._agent] = the_room.room_id
+
+    @property
+    def _rooms_already_visited(self):
+        """Returns the visited rooms of the agent."""
+        return PooledVisitedRooms(self._pool, self._agent)
+
+    @property
+    def _bag(self):
+        """Returns the bag of the agent."""
+        return PooledInventory(self._pool, self._agent)
+
+    @property
+    def _goal_tracker(self):
+        """Returns the goal tracker of the agent."""
+        return self._pool.goal_trackers[self._agent]
+
+    def __eq__(self, other):
+        """Two handles are equal when they refer to the same agent."""
+        if not isinstance(other, PooledPlayer):
+            return NotImplemented
+        return self._pool is other._pool and self._agent == other._agent
+
+    def __hash__(self):
+        """Returns the hash of the handle."""
+        return hash((id(self._pool), self._agent))
+
+
+class PlayerPool:
+    """Keeps the state of many agents of a player class in arrays.
+
+    :ivar World world: The world shared by the agents.
+    :ivar type player_class: The Player derived class of the agents.
+    :ivar type _handle_class: The class of the handles.
+
+    :ivar array positions: The id of the current room of each agent.
+
+    :ivar int stride: The number of bytes of each agent's row in
+    visited_bits.
+
+    :ivar bytearray visited_bits: A row of bits per agent, one per room id.
+    :ivar array visited_counts: The number of visited rooms of each agent.
+
+    :ivar dict item_columns: Maps every item to an array holding its count
+    for each agent.
+
+    :ivar array bag_sizes: The total number of items of each agent.
+
+    :ivar list goal_trackers: The GoalTracker of each agent (None when the
+    player class has no goal).
+    """
+
+    def __init__(self, world, player_class):
+        """Initializer.
+
+        :param World world: The world shared by the agents.
+        :param type player_class: The Player derived class of the agents.
+        """
+        self.world = world
+        self.player_class = player_class
+        self._handle_class = type(player_class)(
+            player_class.__name__, (PooledPlayer, player_class),
+            {'__slots__': ()}
+        )
+        self.positions = array.array('i')
+        self.stride = max(1, (len(world) + 7) // 8)
+        self.visited_bits = bytearray()
+        self.visited_counts = array.array('i')
+        self.item_columns = {}
+        self.bag_sizes = array.array('i')
+        self.goal_trackers = []
+
+    def __len__(self):
+        """Returns the number of agents."""
+        return len(self.positions)
+
+    def __iter__(self):
+        """Iterates over the handles of the agents."""
+        return (self.get_player(agent) for agent in range(len(self)))
+
+    def spawn(self, start_room):
+        """Adds an agent.
+
+        :param str start_room: The name of the starting room.
+
+        :return: The handle of the new agent.
+        :rtype: Player.
+        """
+        the_room = self.world.get_room(start_room)
+        agent = len(self.positions)
+        self.positions.append(the_room.room_id)
+        self.visited_bits.extend(bytes(self.stride))
+        self.visited_counts.append(0)
+        self.bag_sizes.append(0)
+        for column in self.item_columns.values():
+            column.append(0)
+        goal = self.player_class.goal
+        self.goal_trackers.append(None if goal is None else goal.track())
+
+        self.mark_visited(agent, the_room.room_id)
+        if goal is not None:
+            self.goal_trackers[agent].on_visit(the_room.name)
+        return self.get_player(agent)
+
+    def spawn_many(self, start_room, count):
+        """Adds many agents starting from the same room.
+
+        :param str start_room: The name of the starting room.
+        :param int count: The number of agents to add.
+
+        :return: The index of the first new agent.
+        :rtype: int.
+        """
+        first = len(self.positions)
+        for _ in range(count):
+            self.spawn(start_room)
+        return first
+
+    def get_player(self, agent):
+        """Returns the handle of an agent.
+
+        :param int agent: The index of the agent.
+
+        :return: A Player instance reading its state from the pool.
+        :rtype: Player.
+        """
+        handle = object.__new__(self._handle_class)
+        handle._pool = self
+        handle._agent = agent
+        return handle
+
+    def has_visited(self, agent, room_id):
+        """Checks if an agent visited a room.
+
+        :param int agent: The index of the agent.
+        :param int room_id: The id of the room.
+        :rtype: bool.
+        """
+        if room_id >= self.stride * 8:
+            return False
+        byte = self.visited_bits[agent * self.stride + (room_id >> 3)]
+        return bool(byte & (1 << (room_id & 7)))
+
+    def mark_visited(self, agent, room_id):
+        """Marks a room as visited by an agent.
+
+        :param int agent: The index of the agent.
+        :param int room_id: The id of the room.
+
+        :return: True if the room was not visited before.
+        :rtype: bool.
+        """
+        if room_id >= self.stride * 8:
+            self._grow_stride((room_id >> 3) + 1)
+        index = agent * self.stride + (room_id >> 3)
+        mask = 1 << (room_id & 7)
+        if self.visited_bits[index] & mask:
+            return False
+        self.visited_bits[index] |= mask
+        self.visited_counts[agent] += 1
+        return True
+
+    def get_item_column(self, item):
+        """Returns the counts of an item for all the agents.
+
+        :param str item: The item.
+        :rtype: array.
+        """
+        try:
+            return self.item_columns[item]
+        except KeyError:
+            column = array.array('i', [0]) * len(self.positions)
+            self.item_columns[item] = column
+            return column
+
+    def _grow_stride(self, stride):
+        """Widens the bitset rows when rooms are added to the world.
+
+        :param int stride: The new number of bytes per row.
+        """
+        padding = bytes(stride - self.stride)
+        rows = bytearray()
+        for agent in range(len(self.positions)):
+            start = agent * self.stride
+            rows += self.visited_bits[start:start + self.stride]
+            rows += padding
+        self.visited_bits = rows
+        self.stride = stride
@@ -0,0 +1,187 @@
+"""Implements the CommandResult class returned by the user commands.
+
+Raising and catching an exception for every rejected move and formatting
+every output eagerly is expensive for bots issuing millions of commands.
+A command can instead return a CommandResult holding:
+
+* The status of the command (OK, FAILED, UNSUPPORTED, WON or QUIT).
+
+* The payload of the command (like the room the player entered).
+
+* The renderer of the message which runs only when the message is read.
+
+Commands returning plain values and raising the exceptions of
+impl.exceptions keep working; Player.execute converts them to results.
+"""
+
+import impl.exceptions as exceptions
+
+# Aliases.
+FailedToExecuteAction = exceptions.FailedToExecuteAction
+ThePlayerQuitTheGame = exceptions.ThePlayerQuitTheGame
+ThePlayerWonTheGame = exceptions.ThePlayerWonTheGame
+UnsupportedCommand = exceptions.UnsupportedCommand
+ZuulException = exceptions.ZuulException
+
+# The statuses of a command.
+OK = 0
+FAILED = 1
+UNSUPPORTED = 2
+WON = 3
+QUIT = 4
+
+# The message shown to a player winning the game.
+WINNING_MSG = 'You won!'
+
+# Maps the statuses of the failed commands to the exceptions raised for
+# them by Player.execute_user_command.
+_ERRORS = {
+    FAILED: FailedToExecuteAction,
+    UNSUPPORTED: UnsupportedCommand,
+    WON: ThePlayerWonTheGame,
+    QUIT: ThePlayerQuitTheGame,
+}
+
+
+class CommandResult:
+    """The outcome of a user command.
+
+    :ivar int status: The status of the command.
+    :ivar payload: The value the command produced.
+
+    :ivar callable _render: Called with the payload to render the message
+    (None to render the payload with str).
+
+    :ivar str _message: The rendered message.
+    """
+
+    __slots__ = ('status', 'payload', '_render', '_message')
+
+    def __init__(self, status, payload=None, render=None):
+        """Initializer.
+
+        :param int status: The status of the command.
+        :param payload: The value the command produced.
+
+        :param callable render: Called with the payload to render the
+        message.
+        """
+        self.status = status
+        self.payload = payload
+        self._render = render
+        self._message = None
+
+    @classmethod
+    def from_error(cls, error):
+        """Creates the result of a command that raised an exception.
+
+        :param ZuulException error: The exception.
+        :rtype: CommandResult.
+        """
+        if isinstance(error, ThePlayerWonTheGame):
+            status = WON
+        elif isinstance(error, ThePlayerQuitTheGame):
+            status = QUIT
+        elif isinstance(error, UnsupportedCommand):
+            status = UNSUPPORTED
+        else:
+            status = FAILED
+        return cls(status, error)
+
+    @property
+    def ok(self):
+        """Returns True if the command succeeded.
+
+        :rtype: bool.
+        """
+        return self.status == OK
+
+    @property
+    def won(self):
+        """Returns True if the command won the game.
+
+        :rtype: bool.
+        """
+        return self.status == WON
+
+    @property
+    def game_over(self):
+        """Returns True if the game ended.
+
+        :rtype: bool.
+        """
+        return self.status == WON or self.status == QUIT
+
+    @property
+    def message(self):
+        """Renders the message of the command.
+
+        :return: The message or None if there is nothing to show.
+        :rtype: str.
+        """
+        if self._message is None:
+            if self.status == WON:
+                self._message = WINNING_MSG
+            elif self._render is not None:
+                self._message = self._render(self.payload)
+            elif self.payload is not None and self.status != QUIT:
+                self._message = str(self.payload)
+        return self._message
+
+    @property
+    def error_type(self):
+        """Returns the type of the exception describing a failed command.
+
+        Unlike error it does not create the exception.
+
+        :return: The exception type or None for the successful commands.
+        :rtype: type.
+        """
+        if self.status == OK:
+            return None
+        if isinstance(self.payload, ZuulException):
+            return type(self.payload)
+        return _ERRORS[self.status]
+
+    @property
+    def error(self):
+        """Returns the exception describing a failed command.
+
+        :return: The exception or None for the successful commands.
+        :rtype: ZuulException.
+        """
+        if self.status == OK:
+            return None
+        if isinstance(self.payload, ZuulException):
+            return self.payload
+        if self.status == WON or self.status == QUIT:
+            return _ERRORS[self.status]()
+        return _ERRORS[self.status](self.message)
+
+    def raise_for_status(self):
+        """Returns the message of a successful command.
+
+        :rtype: str.
+
+        :raises: UnsupportedCommand, FailedToExecuteAction,
+        ThePlayerWonTheGame, ThePlayerQuitTheGame.
+        """
+        if self.status != OK:
+            raise self.error
+        return self.message
+
+    def __str__(self):
+        """Returns the message of the command."""
+        message = self.message
+        return '' if message is None else message
+
+
+# Returned by the commands that cannot be executed; the player replaces it
+# with a result mentioning the user input.
+CANNOT_BE_EXECUTED = CommandResult(FAILED)
+
+# Returned by the commands winning the game.
+GAME_WON = CommandResult(WON)
+
+# Returned by the "quit" command.
+GAME_QUIT = CommandResult(QUIT)
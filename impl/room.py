@@ -6,16 +6,34 @@ import enum
 class Direction(enum.Enum):
     """Represents the available directions.
 
+    The direction tables of impl.directions choose which of them a world
+    uses (the 4-way table by default).
+
     :cvar int NORTH: Go north.
     :cvar int SOUTH: Go south.
     :cvar int WEST: Go west.
     :cvar int EAST: Go east.
+    :cvar int NORTHWEST: Go north-west.
+    :cvar int NORTHEAST: Go north-east.
+    :cvar int SOUTHWEST: Go south-west.
+    :cvar int SOUTHEAST: Go south-east.
+    :cvar int UP: Go one floor up.
+    :cvar int DOWN: Go one floor down.
+
+    :ivar Direction opposite: The opposite direction.
+    :ivar str label: The human friendly representation.
     """
 
     NORTH = 1
     SOUTH = 2
     WEST = 3
     EAST = 4
+    NORTHWEST = 5
+    NORTHEAST = 6
+    SOUTHWEST = 7
+    SOUTHEAST = 8
+    UP = 9
+    DOWN = 10
 
     def get_opposite_direction(self):
         """Returns the opposite direction.
@@ -23,28 +41,157 @@ class Direction(enum.Enum):
         :return: The opposite direction.
         :rtype: Direction.
         """
-        if self == Direction.NORTH:
-            return Direction.SOUTH
-        elif self == Direction.SOUTH:
-            return Direction.NORTH
-        elif self == Direction.WEST:
-            return Direction.EAST
-        elif self == Direction.EAST:
-            return Direction.WEST
+        return self.opposite
 
     def __str__(self):
         """Converts a direction to human friendly representation."""
-        if self == Direction.NORTH:
-            return 'up'
-        elif self == Direction.SOUTH:
-            return 'down'
-        elif self == Direction.EAST:
-            return 'right'
-        elif self == Direction.WEST:
-            return 'left'
+        return self.label
+
+
+# The value of the opposite of every direction indexed by direction value.
+_OPPOSITES = (None, 2, 1, 4, 3, 8, 7, 6, 5, 10, 9)
+
+# The human friendly representation of every direction indexed by
+# direction value.
+_LABELS = (None, 'up', 'down', 'left', 'right', 'up-left', 'up-right',
+           'down-left', 'down-right', 'upstairs', 'downstairs')
+
+for _direction in Direction:
+    _direction.opposite = Direction(_OPPOSITES[_direction.value])
+    _direction.label = _LABELS[_direction.value]
+del _direction
+
+# The hooks a player calls when entering or leaving a room (see impl.events).
+HOOKS = ('update_player', 'on_enter', 'on_exit')
+
+# Called with the room class and the name of the hook whenever a hook of a
+# room class is replaced.
+_hook_listeners = []
+
+
+def add_hook_listener(listener):
+    """Adds a listener to the replacements of the hooks of the room classes.
+
+    :param callable listener: Called with the room class and the name of
+    the hook.
+    """
+    _hook_listeners.append(listener)
+
+
+def _notify_hook_listeners(room_class, hook):
+    """Notifies the listeners that a hook of a room class was replaced.
+
+    :param type room_class: The room class.
+    :param str hook: The name of the hook.
+    """
+    for listener in _hook_listeners:
+        listener(room_class, hook)
+
+
+class RoomMeta(type):
+    """Notifies the hook listeners when a hook of a room class is replaced
+    (like mock.patch.object does).
+
+    Every room class gets an _events_key, the key of its rooms in the
+    handler indexes of impl.events, which is the class itself.
+    """
+
+    def __init__(cls, name, bases, namespace):
+        """Initializer.
+
+        :param str name: The name of the class.
+        :param tuple bases: The base classes.
+        :param dict namespace: The attributes of the class.
+        """
+        super().__init__(name, bases, namespace)
+        type.__setattr__(cls, '_events_key', cls)
+
+    def __setattr__(cls, name, value):
+        """Sets a class attribute.
+
+        :param str name: The name of the attribute.
+        :param value: The value.
+        """
+        super().__setattr__(name, value)
+        if name in HOOKS:
+            _notify_hook_listeners(cls, name)
+
+    def __delattr__(cls, name):
+        """Deletes a class attribute.
+
+        :param str name: The name of the attribute.
+        """
+        super().__delattr__(name)
+        if name in HOOKS:
+            _notify_hook_listeners(cls, name)
+
+
+class _Hook:
+    """A hook of Room that a single room can replace.
+
+    Being a data descriptor it sees the assignments to the rooms and keys
+    a room replacing hooks by its class and the replaced hooks, so the
+    handler indexes of its world (see impl.events) give it handlers of its
+    own; the rooms of the classes overriding the hook never reach it.
+
+    :ivar function _function: The default implementation.
+    :ivar str _name: The name of the hook.
+    """
+
+    def __init__(self, function):
+        """Initializer.
+
+        :param function function: The default implementation.
+        """
+        self._function = function
+        self._name = function.__name__
+        self.__doc__ = function.__doc__
+
+    def __get__(self, the_room, owner=None):
+        """Returns the hook of a room or the default implementation.
+
+        :param Room the_room: The room (None for the class).
+        :param type owner: The room class.
+        :rtype: callable.
+        """
+        if the_room is None:
+            return self._function
+        replacement = the_room.__dict__.get(self._name)
+        if replacement is not None:
+            return replacement
+        return self._function.__get__(the_room, owner)
+
+    def __set__(self, the_room, value):
+        """Replaces the hook of a room.
+
+        :param Room the_room: The room.
+        :param callable value: The replacement.
+        """
+        the_room.__dict__[self._name] = value
+        _update_events_key(the_room)
+
+    def __delete__(self, the_room):
+        """Restores the hook of a room.
+
+        :param Room the_room: The room.
+        """
+        del the_room.__dict__[self._name]
+        _update_events_key(the_room)
+
+
+def _update_events_key(the_room):
+    """Keys a room by its class and the hooks replaced on it.
+
+    :param Room the_room: The room.
+    """
+    replaced = frozenset(hook for hook in HOOKS if hook in the_room.__dict__)
+    if replaced:
+        the_room.__dict__['_events_key'] = (type(the_room), replaced)
+    else:
+        the_room.__dict__.pop('_events_key', None)
 
 
-class Room:
+class Room(metaclass=RoomMeta):
     """ A "Room" represents one location in the scenery of the game.
 
     It is connected to other rooms via exits.  For each existing exit, the room
@@ -52,8 +199,21 @@ class Room:
 
     :ivar str _description: The description of the room.
     :ivar dict _adjacent_rooms: The adjacent rooms
+
+    :ivar World _world: The world holding the room which is notified when
+    the exits of the room change.
+
+    :ivar str _name: The name of the room in its world.
+    :ivar int _room_id: The id of the room in its world.
+
+    :ivar _events_key: The key of the room in the handler indexes of
+    impl.events: its class, or its class and the hooks replaced on it.
     """
 
+    _world = None
+    _name = None
+    _room_id = None
+
     def __init__(self, description):
         """ Create a room described "description".
         
@@ -68,7 +228,13 @@ class Room:
         :param Direction direction: The direction of the adjacent_room.
         :param Room adjacent_room: The adjacent_room.
         """
+        previous_room = self._adjacent_rooms.get(direction)
         self._adjacent_rooms[direction] = adjacent_room
+        if self._world is not None:
+            if previous_room is not None:
+                self._world.on_neighbor_removed(self, direction,
+                                                previous_room)
+            self._world.on_neighbor_added(self, direction, adjacent_room)
 
     def remove_neighbor(self, direction):
         """Removes an adjacent_room.
@@ -77,8 +243,40 @@ class Room:
 
         :raises: KeyError.
         """
-        del self._adjacent_rooms[direction]
+        previous_room = self._adjacent_rooms.pop(direction)
+        if self._world is not None:
+            self._world.on_neighbor_removed(self, direction, previous_room)
+
+    def bind_world(self, world, name, room_id):
+        """Binds the world holding the room.
+
+        :param World world: The world to bind.
+        :param str name: The name of the room in the world.
+        :param int room_id: The id of the room in the world.
+        """
+        self._world = world
+        self._name = name
+        self._room_id = room_id
+
+    @property
+    def room_id(self):
+        """Returns the id of the room.
 
+        :return: The id of the room or None if it is not in a world.
+        :rtype: int.
+        """
+        return self._room_id
+
+    @property
+    def name(self):
+        """Returns the name of the room.
+
+        :return: The name of the room or None if it is not in a world.
+        :rtype: str.
+        """
+        return self._name
+
+    @_Hook
     def update_player(self, the_player):
         """Updates the status of the player based on room specifics.
 
@@ -89,10 +287,37 @@ class Room:
         :return:
         """
 
+    @_Hook
+    def on_enter(self, the_player):
+        """Called after a player entered the room (after update_player).
+
+        Does nothing; derived classes can override it.
+
+        :param Player the_player: The player that entered the room.
+        """
+
+    @_Hook
+    def on_exit(self, the_player):
+        """Called before a player leaves the room.
+
+        Does nothing; derived classes can override it.
+
+        :param Player the_player: The player that leaves the room.
+        """
+
     def __str__(self):
         """ Returns The short description of the room."""
         return self._description
 
+    @property
+    def neighbors(self):
+        """Returns the adjacent rooms.
+
+        :returns: The adjacent rooms by direction.
+        :rtype: dict.
+        """
+        return dict(self._adjacent_rooms)
+
     @property
     def neighoring_directions(self):
         """ Return a string describing all the neighoring_directions.
@@ -103,7 +328,7 @@ class Room:
         :returns: Details of the room's exits.
         :rtype: str.
         """
-        return [str(direction) for direction in self._adjacent_rooms.keys()]
+        return [direction.label for direction in self._adjacent_rooms]
         
     def get_neighbor(self, direction):
         """Gets neighbor room by directiion. 
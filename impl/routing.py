@@ -0,0 +1,171 @@
+"""Implements shortest path routing over the rooms of a world.
+
+The Router computes breadth first search trees over the room adjacency and
+caches them per source room.  It listens to the changes of the world's
+graph and drops exactly the trees that a change can affect:
+
+* Adding an exit from a room drops the trees that reach the room and would
+  reach the new neighbor faster through it.
+
+* Removing an exit drops the trees that use it.
+
+The cache is bounded both by the number of trees and by the total number
+of rooms they hold, so a large world keeps only a few trees instead of
+max_trees copies of its rooms.
+"""
+
+import collections
+
+# The default number of cached trees.
+MAX_TREES = 1024
+
+# The default maximum number of rooms in all the cached trees together.
+MAX_ENTRIES = 1 << 20
+
+# The entry of a room in a tree: its distance from the source, the room
+# before it on the shortest path and the direction from that room.
+TreeEntry = collections.namedtuple(
+    'TreeEntry', ['distance', 'parent', 'direction']
+)
+
+
+class Router:
+    """Finds shortest paths between the rooms of a world.
+
+    :ivar int _max_trees: The maximum number of cached trees.
+
+    :ivar int _max_entries: The maximum number of rooms in all the cached
+    trees together.
+
+    :ivar OrderedDict _trees: Maps the source rooms to their trees in least
+    recently used order; a tree maps each reachable room to its TreeEntry.
+
+    :ivar int _entries: The number of rooms in all the cached trees.
+    """
+
+    def __init__(self, max_trees=MAX_TREES, max_entries=MAX_ENTRIES):
+        """Initializer.
+
+        :param int max_trees: The maximum number of cached trees.
+
+        :param int max_entries: The maximum number of rooms in all the
+        cached trees together; the most recent tree is always kept.
+        """
+        self._max_trees = max_trees
+        self._max_entries = max_entries
+        self._trees = collections.OrderedDict()
+        self._entries = 0
+
+    def find_path(self, source, target):
+        """Finds the shortest path between two rooms.
+
+        :param Room source: The room to start from.
+        :param Room target: The room to reach.
+
+        :return: The list of directions to follow or None if the target is
+        not reachable.
+        :rtype: list.
+        """
+        tree = self.get_tree(source)
+        if target not in tree:
+            return None
+        path = []
+        entry = tree[target]
+        while entry.parent is not None:
+            path.append(entry.direction)
+            entry = tree[entry.parent]
+        path.reverse()
+        return path
+
+    def get_distance(self, source, target):
+        """Returns the length of the shortest path between two rooms.
+
+        :param Room source: The room to start from.
+        :param Room target: The room to reach.
+
+        :return: The number of moves or None if the target is not reachable.
+        :rtype: int.
+        """
+        entry = self.get_tree(source).get(target)
+        return None if entry is None else entry.distance
+
+    def get_tree(self, source):
+        """Returns the breadth first search tree of a room.
+
+        :param Room source: The root of the tree.
+
+        :return: Maps every reachable room to its TreeEntry.
+        :rtype: dict.
+        """
+        try:
+            self._trees.move_to_end(source)
+            return self._trees[source]
+        except KeyError:
+            pass
+        tree = {source: TreeEntry(0, None, None)}
+        frontier = [source]
+        distance = 0
+        while frontier:
+            distance += 1
+            next_frontier = []
+            for the_room in frontier:
+                for direction, neighbor in the_room.neighbors.items():
+                    if neighbor not in tree:
+                        tree[neighbor] = TreeEntry(distance, the_room,
+                                                   direction)
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        self._trees[source] = tree
+        self._entries += len(tree)
+        while len(self._trees) > 1 and (
+                len(self._trees) > self._max_trees or
+                self._entries > self._max_entries):
+            _, evicted = self._trees.popitem(last=False)
+            self._entries -= len(evicted)
+        return tree
+
+    def clear(self):
+        """Drops all the cached trees."""
+        self._trees.clear()
+        self._entries = 0
+
+    def _drop(self, sources):
+        """Drops the trees of some rooms.
+
+        :param list sources: The roots of the trees.
+        """
+        for source in sources:
+            self._entries -= len(self._trees.pop(source))
+
+    def on_neighbor_added(self, the_room, direction, neighbor):
+        """Drops the trees that a new exit can shorten.
+
+        :param Room the_room: The room that got a new exit.
+        :param Direction direction: The direction of the exit.
+        :param Room neighbor: The room the exit leads to.
+        """
+        stale = []
+        for source, tree in self._trees.items():
+            entry = tree.get(the_room)
+            if entry is None:
+                continue
+            neighbor_entry = tree.get(neighbor)
+            if neighbor_entry is None or \
+                    neighbor_entry.distance > entry.distance + 1:
+                stale.append(source)
+        self._drop(stale)
+
+    def on_neighbor_removed(self, the_room, direction, neighbor):
+        """Drops the trees using a removed exit.
+
+        :param Room the_room: The room that lost an exit.
+        :param Direction direction: The direction of the exit.
+        :param Room neighbor: The room the exit used to lead to.
+        """
+        stale = []
+        for source, tree in self._trees.items():
+            entry = tree.get(neighbor)
+            if entry is not None and entry.parent == the_room and \
+                    entry.direction == direction:
+                stale.append(source)
+        self._drop(stale)
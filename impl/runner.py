@@ -0,0 +1,263 @@
+"""Plays scripted sessions headlessly across a pool of processes.
+
+A script is a text file holding one command per line; blank lines and lines
+starting with "#" are skipped.  Every script is played by a new player from
+the starting room of the world until the script ends or the game is over.
+Unlike Game.play nothing is printed and the process does not exit.
+
+The scripts are split in chunks handed to a pool of worker processes.
+Every worker imports the world factory and the player class by their
+dotted paths and builds the world once, then plays all the scripts of the
+chunks it receives:
+
+    python -m impl.runner mentoring.make_the_world \\
+        mentoring.MentoringPlayer scripts/ --output report.json
+
+The report holds the outcome of every script (won, quit, the number of
+steps and of rejected commands and the final room) and their totals.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import glob
+import json
+import os
+import sys
+
+import impl.loader as loader
+
+# The default pattern of the script file names.
+PATTERN = '*.txt'
+
+# The number of chunks per process when the chunk size is not given; more
+# chunks balance the load better at the cost of more messages.
+CHUNKS_PER_PROCESS = 4
+
+# The outcome of a script: its path, whether the player won or quit, the
+# number of executed commands, the number of rejected commands, the name of
+# the final room and the description of an unexpected error (None if the
+# script ran).
+ScriptResult = collections.namedtuple(
+    'ScriptResult',
+    ['script', 'won', 'quit', 'steps', 'errors', 'final_room', 'crash']
+)
+
+# The world, starting room and player class of the current worker.
+_worker_state = None
+
+
+def read_script(path):
+    """Reads the commands of a script.
+
+    :param str path: The path of the script.
+    :rtype: list.
+    """
+    with open(path, encoding='utf-8') as script_file:
+        return [line.strip() for line in script_file
+                if line.strip() and not line.lstrip().startswith('#')]
+
+
+def play_script(the_world, start_room, player_class, path):
+    """Plays a script.
+
+    :param World the_world: The world.
+    :param str start_room: The starting room.
+    :param type player_class: The Player derived class.
+    :param str path: The path of the script.
+    :rtype: ScriptResult.
+    """
+    the_player = None
+    steps = errors = 0
+    won = quit_game = False
+    try:
+        the_player = player_class(the_world, start_room)
+        for command in read_script(path):
+            command_result = the_player.execute(command)
+            steps += 1
+            if command_result.won:
+                won = True
+                break
+            if command_result.game_over:
+                quit_game = True
+                break
+            if not command_result.ok:
+                errors += 1
+    except Exception as ex:
+        crash = '{}: {}'.format(type(ex).__name__, ex)
+    else:
+        crash = None
+    final_room = None
+    if the_player is not None:
+        final_room = the_player.current_room.name
+    return ScriptResult(path, won, quit_game, steps, errors, final_room,
+                        crash)
+
+
+def _init_worker(world_factory, player_class):
+    """Builds the world of a worker process.
+
+    :param str world_factory: The dotted path of a function returning the
+    world and its starting room.
+
+    :param str player_class: The dotted path of the Player derived class.
+    """
+    global _worker_state
+    the_world, start_room = loader.import_class(world_factory)()
+    _worker_state = (the_world, start_room,
+                     loader.import_class(player_class))
+
+
+def _play_chunk(paths):
+    """Plays a chunk of scripts in a worker process.
+
+    :param list paths: The paths of the scripts.
+    :rtype: list.
+    """
+    the_world, start_room, player_class = _worker_state
+    return [play_script(the_world, start_room, player_class, path)
+            for path in paths]
+
+
+class RunReport:
+    """The outcome of a run of scripts.
+
+    :ivar list results: The ScriptResult of every script in the order of
+    the scripts.
+    """
+
+    def __init__(self, results):
+        """Initializer.
+
+        :param list results: The ScriptResult of every script.
+        """
+        self.results = results
+
+    def __len__(self):
+        """Returns the number of scripts."""
+        return len(self.results)
+
+    @property
+    def wins(self):
+        """Returns the number of scripts winning the game.
+
+        :rtype: int.
+        """
+        return sum(1 for script_result in self.results if script_result.won)
+
+    @property
+    def crashes(self):
+        """Returns the results of the scripts that raised an exception.
+
+        :rtype: list.
+        """
+        return [script_result for script_result in self.results
+                if script_result.crash is not None]
+
+    @property
+    def steps(self):
+        """Returns the total number of executed commands.
+
+        :rtype: int.
+        """
+        return sum(script_result.steps for script_result in self.results)
+
+    def to_dict(self):
+        """Returns the report as a JSON serializable dict.
+
+        :rtype: dict.
+        """
+        return {
+            'scripts': len(self.results),
+            'wins': self.wins,
+            'losses': len(self.results) - self.wins,
+            'crashes': len(self.crashes),
+            'steps': self.steps,
+            'results': [script_result._asdict()
+                        for script_result in self.results],
+        }
+
+
+def run_scripts(world_factory, player_class, paths, processes=None,
+                chunk_size=None):
+    """Plays scripts across a pool of processes.
+
+    :param str world_factory: The dotted path of a function returning the
+    world and its starting room, like "mentoring.make_the_world".
+
+    :param str player_class: The dotted path of the Player derived class.
+    :param list paths: The paths of the scripts.
+
+    :param int processes: The number of worker processes (defaults to the
+    number of CPUs); with 1 the scripts are played in this process.
+
+    :param int chunk_size: The number of scripts sent to a worker at once.
+    :rtype: RunReport.
+    """
+    paths = list(paths)
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(paths) <= 1:
+        the_world, start_room = loader.import_class(world_factory)()
+        player_class = loader.import_class(player_class)
+        return RunReport([
+            play_script(the_world, start_room, player_class, path)
+            for path in paths
+        ])
+
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(paths) // (processes *
+                                              CHUNKS_PER_PROCESS)))
+    chunks = [paths[start:start + chunk_size]
+              for start in range(0, len(paths), chunk_size)]
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(processes, len(chunks)),
+            initializer=_init_worker,
+            initargs=(world_factory, player_class)) as executor:
+        results = []
+        for chunk_results in executor.map(_play_chunk, chunks):
+            results.extend(chunk_results)
+    return RunReport(results)
+
+
+def find_scripts(directory, pattern=PATTERN):
+    """Lists the scripts of a directory.
+
+    :param str directory: The directory.
+    :param str pattern: The glob pattern of the script file names.
+
+    :return: The sorted paths of the scripts.
+    :rtype: list.
+    """
+    return sorted(glob.glob(os.path.join(glob.escape(directory), pattern)))
+
+
+def main():
+    """Plays the scripts of a directory and writes the report."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('world_factory',
+                        help='Dotted path of a make_the_world function.')
+    parser.add_argument('player_class',
+                        help='Dotted path of the Player derived class.')
+    parser.add_argument('directory', help='The directory of the scripts.')
+    parser.add_argument('--pattern', default=PATTERN)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--output', default='-',
+                        help='The JSON file to write (- for stdout).')
+    args = parser.parse_args()
+
+    report = run_scripts(args.world_factory, args.player_class,
+                         find_scripts(args.directory, args.pattern),
+                         args.processes, args.chunk_size)
+    if args.output == '-':
+        json.dump(report.to_dict(), sys.stdout, indent=2)
+    else:
+        with open(args.output, 'w') as output_file:
+            json.dump(report.to_dict(), output_file, indent=2)
+    print('{} scripts, {} won, {} crashed, {} steps'.format(
+        len(report), report.wins, len(report.crashes), report.steps
+    ), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
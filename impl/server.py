@@ -0,0 +1,232 @@
+"""Implements an asyncio game server hosting many players in one process.
+
+Every TCP connection is a game session with its own Player while all the
+sessions share the same World.  The protocol is line based:
+
+* The client sends one command per line.
+
+* The server answers each command with the lines of its response followed
+  by a line holding a single dot.  Response lines starting with a dot are
+  escaped with an additional dot.
+
+* When the game is over (the player won or quit) the server writes the
+  final response and closes the connection; the process keeps serving the
+  rest of the sessions.
+
+Example:
+
+    python -m impl.server mentoring.make_the_world mentoring.MentoringPlayer
+"""
+
+import argparse
+import asyncio
+import logging
+
+import impl.game as game
+import impl.loader as loader
+
+# The line terminating a response.
+END_OF_RESPONSE = '.'
+
+# The maximum length of a command line.
+MAX_LINE_LENGTH = 4096
+
+# The response sent when a session fails unexpectedly.
+INTERNAL_ERROR_MSG = 'Internal error.'
+
+_logger = logging.getLogger(__name__)
+
+
+def encode_response(msg):
+    """Encodes a response message for the wire.
+
+    :param str msg: The message to encode.
+
+    :return: The encoded, dot terminated response.
+    :rtype: bytes.
+    """
+    lines = [
+        '.' + line if line.startswith('.') else line
+        for line in msg.split('\n')
+    ]
+    lines.append(END_OF_RESPONSE)
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+class GameServer:
+    """Hosts concurrent game sessions sharing a World.
+
+    :ivar World _world: The world shared by all the sessions.
+    :ivar type _player_class: The Player derived class to create.
+    :ivar str _start_room: The name of the starting room.
+    :ivar str _host: The host to listen to.
+    :ivar int _port: The port to listen to (0 picks a free port).
+    :ivar asyncio.AbstractServer _server: The underlying server.
+    :ivar int active_sessions: The number of currently active sessions.
+    """
+
+    def __init__(self, world, player_class, start_room,
+                 host='127.0.0.1', port=0):
+        """Initializer.
+
+        :param World world: The world shared by all the sessions.
+        :param type player_class: The Player derived class to create.
+        :param str start_room: The name of the starting room.
+        :param str host: The host to listen to.
+        :param int port: The port to listen to (0 picks a free port).
+        """
+        self._world = world
+        self._player_class = player_class
+        self._start_room = start_room
+        self._host = host
+        self._port = port
+        self._server = None
+        self.active_sessions = 0
+
+    @property
+    def port(self):
+        """Returns the port the server listens to.
+
+        :rtype: int.
+        """
+        return self._server.sockets[0].getsockname()[1]
+
+    async def start(self):
+        """Starts listening for connections.
+
+        :return: The server itself.
+        :rtype: GameServer.
+        """
+        self._server = await asyncio.start_server(
+            self._run_session, self._host, self._port,
+            limit=MAX_LINE_LENGTH
+        )
+        return self
+
+    async def serve_forever(self):
+        """Serves the sessions until cancelled."""
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def stop(self):
+        """Stops accepting connections."""
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _run_session(self, reader, writer):
+        """Runs a game session for a connection.
+
+        :param asyncio.StreamReader reader: Reads from the connection.
+        :param asyncio.StreamWriter writer: Writes to the connection.
+        """
+        self.active_sessions += 1
+        try:
+            the_player = self._player_class(world=self._world,
+                                            start_room=self._start_room)
+            game_over = False
+            while not game_over:
+                try:
+                    line = await reader.readline()
+                except (asyncio.LimitOverrunError, ValueError):
+                    # The line is longer than MAX_LINE_LENGTH.
+                    break
+                if not line:
+                    break
+                user_input = line.decode('utf-8', 'replace').strip()
+                if not user_input:
+                    continue
+                output, game_over = game.run_command(the_player, user_input)
+                writer.write(encode_response(output or ''))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        except Exception:
+            _logger.exception("The session failed.")
+            writer.write(encode_response(INTERNAL_ERROR_MSG))
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+class GameClient:
+    """A client of the GameServer, mostly useful for tests.
+
+    :ivar asyncio.StreamReader _reader: Reads from the connection.
+    :ivar asyncio.StreamWriter _writer: Writes to the connection.
+    """
+
+    def __init__(self, reader, writer):
+        """Initializer.
+
+        :param asyncio.StreamReader reader: Reads from the connection.
+        :param asyncio.StreamWriter writer: Writes to the connection.
+        """
+        self._reader = reader
+        self._writer = writer
+
+    @classmethod
+    async def connect(cls, host, port):
+        """Connects to a server.
+
+        :param str host: The host of the server.
+        :param int port: The port of the server.
+
+        :return: The connected client.
+        :rtype: GameClient.
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def send(self, user_input):
+        """Sends a command and waits for the response.
+
+        :param str user_input: The command to send.
+
+        :return: The response or None if the server closed the session.
+        :rtype: str.
+        """
+        self._writer.write((user_input + '\n').encode('utf-8'))
+        await self._writer.drain()
+        lines = []
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                return None
+            line = line.decode('utf-8').rstrip('\n')
+            if line == END_OF_RESPONSE:
+                return '\n'.join(lines)
+            lines.append(line[1:] if line.startswith('.') else line)
+
+    async def close(self):
+        """Closes the connection."""
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+def main():
+    """Runs a game server."""
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('world_factory',
+                        help='Dotted path of a make_the_world function.')
+    parser.add_argument('player_class',
+                        help='Dotted path of the Player derived class.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8023)
+    args = parser.parse_args()
+
+    the_world, the_room = loader.import_class(args.world_factory)()
+    server = GameServer(the_world, loader.import_class(args.player_class),
+                        the_room, host=args.host, port=args.port)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == '__main__':
+    main()
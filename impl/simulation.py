@@ -0,0 +1,484 @@
+"""Implements a vectorized Monte Carlo simulator of random walks.
+
+The simulator estimates how many moves a random or greedy player needs to
+win the game.  It exports the adjacency of a World to a NumPy array and
+advances all the agents at once on every step:
+
+* The rooms whose class overrides update_player or on_enter are probed
+  once with a recording player to find the items they add to the bag, so
+  the bags of all the agents are updated with a single array operation per
+  step.
+
+* When the player class declares a goal, the compiled goal is evaluated
+  for all the agents at once.  Otherwise have_won is called for every
+  agent, which works for any player class but is much slower.
+
+NumPy is required only by this module:
+
+    report = simulate(the_world, 'theater', MentoringPlayer, agents=10000)
+    print(report.win_rate, report.percentile(50))
+"""
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+import impl.compact_world as compact_world
+import impl.events as events
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+ENTER_HOOKS = events.ENTER_HOOKS
+get_room_capabilities = events.get_room_capabilities
+NO_EXIT = compact_world.NO_EXIT
+
+# The available policies.
+RANDOM = 'random'
+GREEDY = 'greedy'
+
+# Signifies that an agent did not win.
+NOT_WON = -1
+
+
+def export_adjacency(the_world):
+    """Exports the adjacency of a world to an array.
+
+    :param the_world: The World or CompactWorld to export.
+
+    :return: An array of shape (rooms, directions) holding the id of the
+    neighbor in each direction of the DirectionTable of the world or
+    NO_EXIT.
+    :rtype: numpy.ndarray.
+    """
+    _require_numpy()
+    width = the_world.directions.width
+    if isinstance(the_world, CompactWorld):
+        return numpy.array(the_world.adjacency, dtype=numpy.int32) \
+            .reshape(len(the_world), width)
+    slots = the_world.directions.slots
+    adjacency = numpy.full((len(the_world), width), NO_EXIT,
+                           dtype=numpy.int32)
+    for room_id in range(len(the_world)):
+        the_room = the_world.get_room_by_id(room_id)
+        for direction, neighbor in the_room.neighbors.items():
+            adjacency[room_id, slots[direction]] = neighbor.room_id
+    return adjacency
+
+
+class _ItemRecorder:
+    """Records the items a room adds to the bag of a player.
+
+    :ivar dict items: Maps the added items to their counts.
+    """
+
+    def __init__(self):
+        """Initializer."""
+        self.items = {}
+
+    def add_to_bag(self, item, count=1):
+        """Records an added item.
+
+        :param str item: The added item.
+        :param int count: The number of copies.
+
+        :return: Always True, the recorder has no capacity.
+        :rtype: bool.
+        """
+        self.items[item] = self.items.get(item, 0) + count
+        return True
+
+
+def probe_effects(the_world):
+    """Finds the items each room with effects adds to the bag.
+
+    :param the_world: The world to probe.
+
+    :return: A tuple of the list of items and an array of shape
+    (rooms, items) holding the copies of each item added by a visit.
+    :rtype: tuple.
+
+    :raises: ValueError.
+    """
+    _require_numpy()
+    recorded = {}
+    for room_id in range(len(the_world)):
+        the_room = the_world.get_room_by_id(room_id)
+        capabilities = get_room_capabilities(the_room)
+        if not capabilities:
+            continue
+        recorder = _ItemRecorder()
+        try:
+            for hook in ENTER_HOOKS:
+                if hook in capabilities:
+                    getattr(the_room, hook)(recorder)
+        except AttributeError as ex:
+            raise ValueError(
+                "Room {} has effects that cannot be simulated: {}".format(
+                    the_room.name, ex
+                )
+            )
+        if recorder.items:
+            recorded[room_id] = recorder.items
+
+    items = sorted({item for added in recorded.values() for item in added})
+    item_index = {item: index for index, item in enumerate(items)}
+    effects = numpy.zeros((len(the_world), len(items)), dtype=numpy.int32)
+    for room_id, added in recorded.items():
+        for item, count in added.items():
+            effects[room_id, item_index[item]] = count
+    return items, effects
+
+
+class SimulationReport:
+    """Holds the outcome of a simulation.
+
+    :ivar numpy.ndarray steps_to_win: The moves each agent needed to win
+    or NOT_WON.
+
+    :ivar numpy.ndarray visit_counts: The number of times each room (by
+    id) was entered.
+
+    :ivar float dead_end_rate: The fraction of the moves that ended in a
+    room with a single exit.
+
+    :ivar int stuck_agents: The number of agents that reached a room
+    without exits.
+
+    :ivar int steps: The number of simulated steps.
+    """
+
+    def __init__(self, steps_to_win, visit_counts, dead_end_rate,
+                 stuck_agents, steps):
+        """Initializer.
+
+        :param numpy.ndarray steps_to_win: The moves each agent needed.
+        :param numpy.ndarray visit_counts: The entries of each room.
+        :param float dead_end_rate: The fraction of moves into dead ends.
+        :param int stuck_agents: The agents without any exit.
+        :param int steps: The number of simulated steps.
+        """
+        self.steps_to_win = steps_to_win
+        self.visit_counts = visit_counts
+        self.dead_end_rate = dead_end_rate
+        self.stuck_agents = stuck_agents
+        self.steps = steps
+
+    @property
+    def win_rate(self):
+        """Returns the fraction of the agents that won.
+
+        :rtype: float.
+        """
+        return float(numpy.mean(self.steps_to_win != NOT_WON))
+
+    def percentile(self, q):
+        """Returns a percentile of the moves needed by the winning agents.
+
+        :param float q: The percentile, between 0 and 100.
+
+        :return: The percentile or None if no agent won.
+        :rtype: float.
+        """
+        won = self.steps_to_win[self.steps_to_win != NOT_WON]
+        if not len(won):
+            return None
+        return float(numpy.percentile(won, q))
+
+    def histogram(self, bins=10):
+        """Returns the distribution of the moves needed to win.
+
+        :param int bins: The number of bins.
+
+        :return: The counts and the bin edges.
+        :rtype: tuple.
+        """
+        won = self.steps_to_win[self.steps_to_win != NOT_WON]
+        return numpy.histogram(won, bins=bins)
+
+    def visit_frequencies(self, the_world):
+        """Returns the fraction of the moves that entered each room.
+
+        :param the_world: The simulated world.
+
+        :return: Maps the room names to their frequencies.
+        :rtype: dict.
+        """
+        total = max(1, int(self.visit_counts.sum()))
+        return {
+            the_world.get_room_by_id(room_id).name: int(count) / total
+            for room_id, count in enumerate(self.visit_counts)
+        }
+
+
+class Simulator:
+    """Advances many agents of a player class at once.
+
+    :ivar the_world: The simulated world.
+    :ivar type player_class: The Player derived class of the agents.
+    :ivar numpy.ndarray adjacency: The exported adjacency.
+    :ivar list items: The items the rooms can add.
+    :ivar numpy.ndarray effects: The items added by a visit to each room.
+    :ivar numpy.ndarray exit_counts: The number of exits of each room.
+    """
+
+    def __init__(self, the_world, player_class):
+        """Initializer.
+
+        :param the_world: The world to simulate.
+        :param type player_class: The Player derived class of the agents.
+
+        :raises: ValueError.
+        """
+        _require_numpy()
+        self.the_world = the_world
+        self.player_class = player_class
+        self.adjacency = export_adjacency(the_world)
+        self.items, self.effects = probe_effects(the_world)
+        self.exit_counts = (self.adjacency != NO_EXIT).sum(axis=1)
+        goal = player_class.goal
+        self._goal = None if goal is None else goal.compile()
+
+    def run(self, start_room, agents=1000, max_steps=1000, policy=RANDOM,
+            seed=None):
+        """Runs a simulation.
+
+        :param str start_room: The name of the starting room.
+        :param int agents: The number of agents.
+        :param int max_steps: The maximum number of moves per agent.
+        :param str policy: Either RANDOM or GREEDY (prefers unvisited rooms).
+        :param int seed: The seed of the random generator.
+
+        :return: The report of the simulation.
+        :rtype: SimulationReport.
+        """
+        rng = numpy.random.default_rng(seed)
+        room_count = len(self.the_world)
+        start_id = self.the_world.get_room_id(start_room)
+
+        positions = numpy.full(agents, start_id, dtype=numpy.int32)
+        bags = numpy.zeros((agents, len(self.items)), dtype=numpy.int32)
+        tracked_rooms = self._get_tracked_rooms(policy, room_count)
+        visited = numpy.zeros((agents, len(tracked_rooms)), dtype=bool)
+        columns = numpy.full(room_count, -1, dtype=numpy.int64)
+        columns[tracked_rooms] = numpy.arange(len(tracked_rooms))
+
+        steps_to_win = numpy.full(agents, NOT_WON, dtype=numpy.int32)
+        visit_counts = numpy.zeros(room_count, dtype=numpy.int64)
+        active = numpy.arange(agents)
+        # Like Player, the start room is visited without running its hooks.
+        start_column = columns[start_id]
+        if start_column >= 0:
+            visited[:, start_column] = True
+        dead_ends = moves = 0
+        stuck = numpy.zeros(agents, dtype=bool)
+
+        step = 0
+        for step in range(1, max_steps + 1):
+            won = self._have_won(active, positions, bags, visited, columns)
+            steps_to_win[active[won]] = step - 1
+            active = active[~won]
+            stuck[active] = self.exit_counts[positions[active]] == 0
+            active = active[~stuck[active]]
+            if not len(active):
+                break
+
+            exits = self.adjacency[positions[active]]
+            candidates = exits != NO_EXIT
+            if policy == GREEDY:
+                unvisited = candidates & ~visited[
+                    active[:, None], columns[numpy.maximum(exits, 0)]
+                ]
+                has_unvisited = unvisited.any(axis=1)
+                candidates[has_unvisited] = unvisited[has_unvisited]
+            choice = _choose(rng, candidates)
+            new_positions = exits[numpy.arange(len(active)), choice]
+            positions[active] = new_positions
+
+            visit_counts += numpy.bincount(new_positions,
+                                           minlength=room_count)
+            dead_ends += int(numpy.count_nonzero(
+                self.exit_counts[new_positions] == 1
+            ))
+            moves += len(active)
+            self._visit(active, positions, bags, visited, columns)
+        else:
+            won = self._have_won(active, positions, bags, visited, columns)
+            steps_to_win[active[won]] = max_steps
+
+        return SimulationReport(
+            steps_to_win, visit_counts,
+            dead_ends / moves if moves else 0.0,
+            int(numpy.count_nonzero(stuck)), step
+        )
+
+    def _get_tracked_rooms(self, policy, room_count):
+        """Returns the ids of the rooms whose visits must be tracked.
+
+        Only the rooms of the goal are tracked unless the policy or
+        have_won need all of them.
+
+        :param str policy: The policy of the agents.
+        :param int room_count: The number of rooms.
+        :rtype: numpy.ndarray.
+        """
+        if policy == GREEDY or self._goal is None:
+            return numpy.arange(room_count)
+        get_room_id = self.the_world.get_room_id
+        return numpy.array(
+            sorted({get_room_id(name) for name in self._goal.rooms}),
+            dtype=numpy.int64
+        )
+
+    def _visit(self, active, positions, bags, visited, columns):
+        """Applies the visit of the current rooms of the active agents.
+
+        :param numpy.ndarray active: The indices of the active agents.
+        :param numpy.ndarray positions: The current rooms of the agents.
+        :param numpy.ndarray bags: The item counts of the agents.
+        :param numpy.ndarray visited: The tracked visits of the agents.
+        :param numpy.ndarray columns: Maps room ids to visited columns.
+        """
+        current = positions[active]
+        if self.items:
+            bags[active] += self.effects[current]
+        column = columns[current]
+        tracked = column >= 0
+        visited[active[tracked], column[tracked]] = True
+
+    def _have_won(self, active, positions, bags, visited, columns):
+        """Checks which of the active agents won.
+
+        :param numpy.ndarray active: The indices of the active agents.
+        :param numpy.ndarray positions: The current rooms of the agents.
+        :param numpy.ndarray bags: The item counts of the agents.
+        :param numpy.ndarray visited: The tracked visits of the agents.
+        :param numpy.ndarray columns: Maps room ids to visited columns.
+
+        :return: A boolean for each active agent.
+        :rtype: numpy.ndarray.
+        """
+        if self._goal is None:
+            return numpy.array([
+                _ArrayPlayer(self, agent, positions, bags, visited)
+                .have_won() for agent in active
+            ], dtype=bool)
+
+        goal = self._goal
+        item_index = {item: index for index, item in enumerate(self.items)}
+        values = [None] * len(goal.parents)
+        for room_name, nodes in goal.rooms.items():
+            column = columns[self.the_world.get_room_id(room_name)]
+            for node in nodes:
+                values[node] = visited[active, column]
+        for item, nodes in goal.items.items():
+            for node, count in nodes:
+                if item in item_index:
+                    values[node] = bags[active, item_index[item]] >= count
+                else:
+                    values[node] = numpy.zeros(len(active), dtype=bool)
+
+        counts = [numpy.zeros(len(active), dtype=numpy.int32)
+                  for _ in goal.parents]
+        for node in reversed(range(len(goal.parents))):
+            if values[node] is None:
+                values[node] = counts[node] >= goal.thresholds[node]
+            if goal.negated[node]:
+                values[node] = ~values[node]
+            parent = goal.parents[node]
+            if parent >= 0:
+                counts[parent] += values[node]
+        return values[0]
+
+
+class _ArrayPlayer:
+    """Answers the queries of have_won from the arrays of a simulation.
+
+    Used for player classes without a goal; have_won is called with this
+    object standing in for the player.
+
+    :ivar Simulator _simulator: The simulator.
+    :ivar int _agent: The index of the agent.
+    """
+
+    def __init__(self, simulator, agent, positions, bags, visited):
+        """Initializer.
+
+        :param Simulator simulator: The simulator.
+        :param int agent: The index of the agent.
+        :param numpy.ndarray positions: The current rooms of the agents.
+        :param numpy.ndarray bags: The item counts of the agents.
+        :param numpy.ndarray visited: The visits of the agents.
+        """
+        self._simulator = simulator
+        self._agent = agent
+        self._positions = positions
+        self._bags = bags
+        self._visited = visited
+
+    @property
+    def current_room(self):
+        """Returns the current room of the agent."""
+        return self._simulator.the_world.get_room_by_id(
+            int(self._positions[self._agent])
+        )
+
+    def has_already_visited(self, *room_names):
+        """Returns true if the agent has already visited all the rooms."""
+        get_room_id = self._simulator.the_world.get_room_id
+        return all(self._visited[self._agent, get_room_id(room_name)]
+                   for room_name in room_names)
+
+    def is_in_bag(self, item):
+        """Checks if an item is in the bag of the agent."""
+        items = self._simulator.items
+        return item in items and \
+            bool(self._bags[self._agent, items.index(item)])
+
+    def have_won(self):
+        """Runs the have_won of the player class for the agent."""
+        return self._simulator.player_class.have_won(self)
+
+
+def _choose(rng, candidates):
+    """Chooses one of the candidate exits of every agent uniformly.
+
+    :param numpy.random.Generator rng: The random generator.
+    :param numpy.ndarray candidates: A boolean per agent and direction.
+
+    :return: The chosen direction slot of every agent.
+    :rtype: numpy.ndarray.
+    """
+    counts = candidates.sum(axis=1)
+    picks = (rng.random(len(counts)) * counts).astype(numpy.int64)
+    return (numpy.cumsum(candidates, axis=1) > picks[:, None]).argmax(axis=1)
+
+
+def simulate(the_world, start_room, player_class, agents=1000,
+             max_steps=1000, policy=RANDOM, seed=None):
+    """Runs a simulation of random walks.
+
+    :param the_world: The world to simulate.
+    :param str start_room: The name of the starting room.
+    :param type player_class: The Player derived class of the agents.
+    :param int agents: The number of agents.
+    :param int max_steps: The maximum number of moves per agent.
+    :param str policy: Either RANDOM or GREEDY.
+    :param int seed: The seed of the random generator.
+
+    :return: The report of the simulation.
+    :rtype: SimulationReport.
+    """
+    return Simulator(the_world, player_class).run(
+        start_room, agents=agents, max_steps=max_steps, policy=policy,
+        seed=seed
+    )
+
+
+def _require_numpy():
+    """Makes sure NumPy is available.
+
+    :raises: ImportError.
+    """
+    if numpy is None:
+        raise ImportError("The simulation requires NumPy.")
@@ -0,0 +1,370 @@
+"""Saves and opens binary world snapshots.
+
+A snapshot holds everything needed to play a world in a versioned, little
+endian binary layout:
+
+* A header with the magic bytes, the layout version, the number of
+  directions, the counts of the tables, the code of the DirectionTable
+  and the offsets of the sections.
+
+* The adjacency table: one int32 per room and direction of the table
+  holding the id of the neighbor or -1 (NO_EXIT).
+
+* The room table: three int32 per room, the string index of its name, the
+  string index of its description and the index of its room class.
+
+* The name index: the room ids sorted by name, used for binary search.
+
+* The string table: int64 offsets followed by the UTF-8 encoded strings.
+
+* The room class table: the string index of the dotted path of each class.
+
+Opening a snapshot memory maps the file so all the processes that open the
+same snapshot share its pages; rooms are decoded lazily on first access so
+opening does not depend on the size of the world.
+"""
+
+import array
+import mmap
+import os
+import struct
+import sys
+import weakref
+
+import impl.compact_world as compact_world
+import impl.directions as directions
+import impl.events as events
+import impl.exceptions as exceptions
+import impl.loader as loader
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+get_table = directions.get_table
+InvalidSnapshot = exceptions.InvalidSnapshot
+NO_EXIT = compact_world.NO_EXIT
+RoomDoesNotExist = exceptions.RoomDoesNotExist
+RoomEvents = events.RoomEvents
+RoomView = compact_world.RoomView
+WorldIsReadOnly = exceptions.WorldIsReadOnly
+
+# Identifies a snapshot file.
+MAGIC = b'ZUUW'
+
+# The version of the binary layout.
+VERSION = 1
+
+# magic, version, width, room count, string count, class count, the code of
+# the direction table (0 for the four directions of the first snapshots) and
+# the offsets of the adjacency, rooms, name index, string offsets,
+# string data and room class sections.
+_HEADER = struct.Struct('<4sHHIIII6Q')
+
+# The number of int32 fields per room in the room table.
+_ROOM_FIELDS = 3
+
+# The sections are aligned to this number of bytes.
+_ALIGNMENT = 8
+
+
+def save_snapshot(the_world, path):
+    """Saves a world in a snapshot file.
+
+    :param the_world: The World or CompactWorld to save.
+    :param str path: The path of the snapshot file.
+
+    :raises: InvalidSnapshot.
+    """
+    if sys.byteorder != 'little':
+        raise InvalidSnapshot("Snapshots require a little endian host.")
+
+    strings = {}
+    classes = {}
+
+    def intern_string(value):
+        """Returns the index of a string adding it if needed."""
+        return strings.setdefault(value, len(strings))
+
+    def intern_class(room_class):
+        """Returns the index of a room class adding it if needed."""
+        return classes.setdefault(room_class, len(classes))
+
+    table = the_world.directions
+    width = table.width
+    names = list(the_world)
+    rooms = array.array('i')
+    if isinstance(the_world, CompactWorld):
+        adjacency = array.array('i', the_world.adjacency)
+        for room_id, name in enumerate(names):
+            rooms.extend((
+                intern_string(name),
+                intern_string(the_world.get_room_description(room_id)),
+                intern_class(the_world.get_room_class(room_id)),
+            ))
+    else:
+        all_rooms = [the_world.get_room(name) for name in names]
+        room_ids = {id(the_room): room_id
+                    for room_id, the_room in enumerate(all_rooms)}
+        adjacency = array.array('i', [NO_EXIT]) * (len(names) * width)
+        for room_id, (name, the_room) in enumerate(zip(names, all_rooms)):
+            rooms.extend((
+                intern_string(name),
+                intern_string(str(the_room)),
+                intern_class(type(the_room)),
+            ))
+            for direction, neighbor in the_room.neighbors.items():
+                slot = room_id * width + table.slots[direction]
+                adjacency[slot] = room_ids[id(neighbor)]
+
+    class_table = array.array('i', [
+        intern_string('{}.{}'.format(room_class.__module__,
+                                     room_class.__qualname__))
+        for room_class in classes
+    ])
+
+    encoded = [value.encode('utf-8') for value in strings]
+    name_index = array.array('i', sorted(
+        range(len(names)),
+        key=lambda room_id: encoded[rooms[room_id * _ROOM_FIELDS]]
+    ))
+    string_offsets = array.array('q', [0])
+    position = 0
+    for value in encoded:
+        position += len(value)
+        string_offsets.append(position)
+
+    sections = [
+        adjacency.tobytes(),
+        rooms.tobytes(),
+        name_index.tobytes(),
+        string_offsets.tobytes(),
+        b''.join(encoded),
+        class_table.tobytes(),
+    ]
+    offsets = []
+    position = _align(_HEADER.size)
+    for section in sections:
+        offsets.append(position)
+        position = _align(position + len(section))
+
+    with open(path, 'wb') as stream:
+        stream.write(_HEADER.pack(
+            MAGIC, VERSION, width, len(names), len(encoded), len(class_table),
+            table.code, *offsets
+        ))
+        for offset, section in zip(offsets, sections):
+            stream.write(b'\0' * (offset - stream.tell()))
+            stream.write(section)
+
+
+def _align(position):
+    """Returns the next aligned position.
+
+    :param int position: The position to align.
+    :rtype: int.
+    """
+    return (position + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+class SnapshotWorld(CompactWorld):
+    """A CompactWorld backed by a memory mapped snapshot file.
+
+    The file is mapped copy-on-write: connecting rooms only changes the
+    pages of the current process while rooms cannot be added.
+
+    :ivar mmap _map: The memory mapped file.
+    :ivar memoryview _rooms: The room table.
+    :ivar memoryview _name_index: The room ids sorted by name.
+    :ivar memoryview _string_offsets: The offsets of the strings.
+    :ivar int _string_data: The offset of the string data.
+    :ivar memoryview _class_table: The string index of each class path.
+
+    :ivar dict _room_ids: Caches the ids of the rooms looked up by name.
+    """
+
+    def __init__(self, path):
+        """Initializer.
+
+        :param str path: The path of the snapshot file.
+
+        :raises: InvalidSnapshot.
+        """
+        with open(path, 'rb') as stream:
+            if os.fstat(stream.fileno()).st_size < _HEADER.size:
+                raise InvalidSnapshot("{} is not a snapshot.".format(path))
+            self._map = mmap.mmap(stream.fileno(), 0,
+                                  access=mmap.ACCESS_COPY)
+        try:
+            (magic, version, width, room_count, string_count, class_count,
+             table_code, *offsets) = _HEADER.unpack_from(self._map)
+        except struct.error:
+            raise InvalidSnapshot("{} is not a snapshot.".format(path))
+        if magic != MAGIC:
+            raise InvalidSnapshot("{} is not a snapshot.".format(path))
+        if version != VERSION:
+            raise InvalidSnapshot(
+                "Unsupported snapshot version {}.".format(version)
+            )
+        try:
+            table = get_table(table_code)
+        except ValueError as ex:
+            raise InvalidSnapshot(str(ex))
+        if width != table.width:
+            raise InvalidSnapshot(
+                "{} does not have {} directions.".format(table.name, width)
+            )
+        self._set_directions(table)
+
+        (adjacency_offset, rooms_offset, name_index_offset,
+         string_offsets_offset, self._string_data, classes_offset) = offsets
+        memory = memoryview(self._map)
+
+        def section(offset, count, item_format, item_size):
+            """Returns a typed view of a section."""
+            return memory[offset:offset + count * item_size].cast(item_format)
+
+        self._room_count = room_count
+        self.adjacency = section(adjacency_offset, room_count * width, 'i', 4)
+        self._rooms = section(rooms_offset, room_count * _ROOM_FIELDS, 'i', 4)
+        self._name_index = section(name_index_offset, room_count, 'i', 4)
+        self._string_offsets = section(
+            string_offsets_offset, string_count + 1, 'q', 8
+        )
+        self._class_table = section(classes_offset, class_count, 'i', 4)
+        self._room_classes = [None] * class_count
+        self._view_classes = [None] * class_count
+        self._room_ids = {}
+        self._views = weakref.WeakValueDictionary()
+        self._graph_listeners = []
+        self._router = None
+        self.events = RoomEvents()
+        self._analysis = None
+
+    def __len__(self):
+        """Returns the number of rooms."""
+        return self._room_count
+
+    def __contains__(self, name):
+        """Checks if a room exists.
+
+        :param str name: The name of the room.
+        """
+        try:
+            self.get_room_id(name)
+        except RoomDoesNotExist:
+            return False
+        return True
+
+    def __iter__(self):
+        """Iterates over the room names in the order of their ids."""
+        return (self.get_room_name(room_id)
+                for room_id in range(self._room_count))
+
+    def add_room(self, name, description, room_class=None):
+        """Rooms cannot be added to a snapshot.
+
+        :raises: WorldIsReadOnly.
+        """
+        raise WorldIsReadOnly("Cannot add rooms to a snapshot.")
+
+    def add_rooms(self, rooms):
+        """Rooms cannot be added to a snapshot.
+
+        :raises: WorldIsReadOnly.
+        """
+        raise WorldIsReadOnly("Cannot add rooms to a snapshot.")
+
+    def get_room_id(self, name):
+        """Gets the id of a room by its name using binary search.
+
+        :param str name: The name of the room.
+
+        :returns: The id of the room.
+        :rtype: int.
+
+        :raises: RoomDoesNotExist.
+        """
+        try:
+            return self._room_ids[name]
+        except KeyError:
+            pass
+        key = name.encode('utf-8')
+        low, high = 0, self._room_count
+        while low < high:
+            middle = (low + high) // 2
+            room_id = self._name_index[middle]
+            candidate = self._get_bytes(self._rooms[room_id * _ROOM_FIELDS])
+            if candidate < key:
+                low = middle + 1
+            elif candidate > key:
+                high = middle
+            else:
+                self._room_ids[name] = room_id
+                return room_id
+        raise RoomDoesNotExist("Room {} does not exist.".format(name))
+
+    def _get_view_class(self, room_id):
+        """Returns the view class to use for a room.
+
+        :param int room_id: The id of the room.
+        :rtype: type.
+        """
+        class_index = self._rooms[room_id * _ROOM_FIELDS + 2]
+        view_class = self._view_classes[class_index]
+        if view_class is None:
+            room_class = self.get_room_class(room_id)
+            view_class = type(room_class.__name__,
+                              (RoomView, room_class), {})
+            self._view_classes[class_index] = view_class
+        return view_class
+
+    def get_room_name(self, room_id):
+        """Returns the name of a room.
+
+        :param int room_id: The id of the room.
+        :rtype: str.
+        """
+        return self._get_string(self._rooms[room_id * _ROOM_FIELDS])
+
+    def get_room_description(self, room_id):
+        """Returns the description of a room.
+
+        :param int room_id: The id of the room.
+        :rtype: str.
+        """
+        return self._get_string(self._rooms[room_id * _ROOM_FIELDS + 1])
+
+    def get_room_class(self, room_id):
+        """Returns the room class of a room.
+
+        :param int room_id: The id of the room.
+        :rtype: type.
+        """
+        class_index = self._rooms[room_id * _ROOM_FIELDS + 2]
+        room_class = self._room_classes[class_index]
+        if room_class is None:
+            try:
+                room_class = loader.import_room_class(
+                    self._get_string(self._class_table[class_index])
+                )
+            except ValueError as ex:
+                raise InvalidSnapshot(str(ex))
+            self._room_classes[class_index] = room_class
+        return room_class
+
+    def _get_bytes(self, index):
+        """Returns the encoded string of the string table.
+
+        :param int index: The index of the string.
+        :rtype: bytes.
+        """
+        start = self._string_data + self._string_offsets[index]
+        end = self._string_data + self._string_offsets[index + 1]
+        return self._map[start:end]
+
+    def _get_string(self, index):
+        """Returns a string of the string table.
+
+        :param int index: The index of the string.
+        :rtype: str.
+        """
+        return self._get_bytes(index).decode('utf-8')
@@ -0,0 +1,358 @@
+"""Implements a solver finding the shortest winning sequence of moves.
+
+The solver searches the states of a player, made of its current room, the
+rooms it visited and the contents of its bag, for the fewest moves that
+make have_won return True.  States are hashed compactly (the visited rooms
+are an integer bitset and the bag a sorted tuple) and expanded once.
+
+* Rooms whose class overrides update_player or on_enter are run against a
+  sandbox player holding the state being expanded.
+
+* When the player class declares a goal only the rooms of the goal are
+  tracked and the goal is evaluated directly on the state.  It also
+  provides a consistent A* heuristic: the distance to the farthest room
+  the goal requires that was not visited yet.
+
+* Otherwise all the rooms are tracked and have_won runs against a sandbox
+  player.
+
+Item counts are capped to the largest count the goal refers to (item_cap
+for the other items) so the number of states stays finite.  Room classes
+whose effects depend on rooms the solver does not track are not solved
+exactly.
+
+Example:
+
+    solver = Solver(the_world, MentoringPlayer)
+    solution = solver.solve('theater')
+    print(solution.length, solver.get_commands(solution))
+"""
+
+import collections
+import heapq
+import itertools
+
+import impl.events as events
+import impl.exceptions as exceptions
+import impl.goals as goals
+import impl.inventory as inventory
+import impl.visited as visited
+
+# Aliases.
+All = goals.All
+ENTER_HOOKS = events.ENTER_HOOKS
+get_room_capabilities = events.get_room_capabilities
+GoalTracker = goals.GoalTracker
+Inventory = inventory.Inventory
+SolverLimitReached = exceptions.SolverLimitReached
+Visited = goals.Visited
+VisitedRooms = visited.VisitedRooms
+
+# The default maximum number of explored states.
+MAX_STATES = 1000000
+
+# The default cap of the counts of the items the goal does not refer to.
+ITEM_CAP = 1
+
+# The shortest winning sequence: the directions to follow, the number of
+# moves and the number of states the search explored.
+Solution = collections.namedtuple(
+    'Solution', ['moves', 'length', 'explored']
+)
+
+
+class Solver:
+    """Finds the shortest winning sequence of moves.
+
+    :ivar the_world: The world to solve.
+    :ivar type player_class: The Player derived class.
+    :ivar CompiledGoal _goal: The compiled goal of the player class.
+    :ivar list _neighbors: The (direction, room id) exits of each room.
+    :ivar list _hooks: The names of the entry hooks each room overrides.
+    :ivar dict _bits: Maps the tracked room ids to their bit.
+    :ivar dict _item_caps: Maps items to the largest count worth tracking.
+    :ivar int _default_cap: The cap of the items without a specific cap.
+    :ivar list _goal_rooms: The (bit, room name) of the rooms of the goal.
+
+    :ivar dict _distances: Maps the bit of each room every solution must
+    visit to the distances to it.
+    """
+
+    def __init__(self, the_world, player_class, item_cap=ITEM_CAP):
+        """Initializer.
+
+        :param the_world: The world to solve.
+        :param type player_class: The Player derived class.
+
+        :param int item_cap: The largest count tracked for the items the
+        goal does not refer to.
+        """
+        self.the_world = the_world
+        self.player_class = player_class
+        goal = player_class.goal
+        self._goal = None if goal is None else goal.compile()
+
+        room_count = len(the_world)
+        self._neighbors = []
+        self._hooks = []
+        for room_id in range(room_count):
+            the_room = the_world.get_room_by_id(room_id)
+            self._neighbors.append([
+                (direction, neighbor.room_id)
+                for direction, neighbor in the_room.neighbors.items()
+            ])
+            capabilities = get_room_capabilities(the_room)
+            self._hooks.append(tuple(hook for hook in ENTER_HOOKS
+                                     if hook in capabilities))
+
+        self._default_cap = item_cap
+        if self._goal is None:
+            tracked = range(room_count)
+            self._item_caps = {}
+        else:
+            tracked = sorted({the_world.get_room_id(name)
+                              for name in self._goal.rooms})
+            self._item_caps = {
+                item: max(count for _, count in nodes)
+                for item, nodes in self._goal.items.items()
+            }
+        self._bits = {room_id: 1 << index
+                      for index, room_id in enumerate(tracked)}
+        self._goal_rooms = [] if self._goal is None else [
+            (self._bits[the_world.get_room_id(room_name)], room_name)
+            for room_name in self._goal.rooms
+        ]
+        self._distances = self._get_required_distances()
+
+    def solve(self, start_room, use_heuristic=True, max_states=MAX_STATES):
+        """Searches the shortest winning sequence of moves.
+
+        :param str start_room: The name of the starting room.
+
+        :param bool use_heuristic: Uses A* instead of breadth first search
+        (only for player classes with a goal).
+
+        :param int max_states: The maximum number of states to explore.
+
+        :return: The solution or None if the game cannot be won.
+        :rtype: Solution.
+
+        :raises: SolverLimitReached.
+        """
+        start_id = self.the_world.get_room_id(start_room)
+        start = (start_id, self._bits.get(start_id, 0), ())
+        heuristic = self._heuristic if use_heuristic and self._distances \
+            else None
+        parents = {start: None}
+        best_moves = {start: 0}
+        counter = itertools.count()
+        frontier = [(0, 0, next(counter), start)]
+        explored = 0
+        while frontier:
+            _, moves, _, state = heapq.heappop(frontier)
+            if moves > best_moves[state]:
+                continue
+            if self._have_won(state):
+                return Solution(self._get_moves(parents, state), moves,
+                                explored)
+            explored += 1
+            if explored > max_states:
+                raise SolverLimitReached(
+                    "Explored more than {} states.".format(max_states)
+                )
+            for direction, neighbor_id in self._neighbors[state[0]]:
+                next_state = self._enter(state, neighbor_id)
+                if best_moves.get(next_state, moves + 2) <= moves + 1:
+                    continue
+                estimate = 0
+                if heuristic is not None:
+                    estimate = heuristic(next_state)
+                    if estimate is None:
+                        continue
+                best_moves[next_state] = moves + 1
+                parents[next_state] = (state, direction)
+                heapq.heappush(frontier, (moves + 1 + estimate, moves + 1,
+                                          next(counter), next_state))
+        return None
+
+    def _enter(self, state, room_id):
+        """Returns the state after entering a room.
+
+        :param tuple state: The current state.
+        :param int room_id: The id of the room to enter.
+        :rtype: tuple.
+        """
+        _, visited_bits, bag = state
+        visited_bits |= self._bits.get(room_id, 0)
+        hooks = self._hooks[room_id]
+        if hooks:
+            sandbox = self._make_sandbox((room_id, visited_bits, bag))
+            the_room = sandbox.current_room
+            for hook in hooks:
+                getattr(the_room, hook)(sandbox)
+            bag = self._cap(sandbox.bag.items())
+        return room_id, visited_bits, bag
+
+    def _cap(self, items):
+        """Returns the hashable, capped contents of a bag.
+
+        :param iterable items: Pairs of items and counts.
+        :rtype: tuple.
+        """
+        caps = self._item_caps
+        default_cap = self._default_cap
+        return tuple(sorted(
+            (item, min(count, caps.get(item, default_cap)))
+            for item, count in items
+            if count and caps.get(item, default_cap)
+        ))
+
+    def _make_sandbox(self, state):
+        """Creates a player holding a state.
+
+        :param tuple state: The state of the player.
+        :rtype: Player.
+        """
+        room_id, visited_bits, bag = state
+        get_room_by_id = self.the_world.get_room_by_id
+        sandbox = object.__new__(self.player_class)
+        sandbox._world = self.the_world
+        sandbox._room = get_room_by_id(room_id)
+        sandbox._rooms_already_visited = VisitedRooms(self.the_world)
+        for tracked_id, bit in self._bits.items():
+            if visited_bits & bit:
+                sandbox._rooms_already_visited.add(get_room_by_id(tracked_id))
+        sandbox._bag = Inventory(self.player_class.bag_capacity)
+        for item, count in bag:
+            sandbox._bag.add(item, count)
+        return sandbox
+
+    def _have_won(self, state):
+        """Checks if a state wins the game.
+
+        :param tuple state: The state to check.
+        :rtype: bool.
+        """
+        if self._goal is None:
+            return bool(self._make_sandbox(state).have_won())
+
+        _, visited_bits, bag = state
+        tracker = GoalTracker(self._goal)
+        for bit, room_name in self._goal_rooms:
+            if visited_bits & bit:
+                tracker.on_visit(room_name)
+        for item, count in bag:
+            tracker.on_item_changed(item, count)
+        return tracker.satisfied
+
+    def _get_required_distances(self):
+        """Computes the distances to the rooms every solution must visit.
+
+        The required rooms are the Visited conditions reachable from the
+        root of the goal through All nodes only.
+
+        :return: Maps the bit of each required room to the distance of
+        every room (by id) from which it can be reached.
+        :rtype: dict.
+        """
+        if self._goal is None:
+            return {}
+        goal = self.player_class.goal
+        required = []
+        pending = [goal]
+        while pending:
+            current = pending.pop()
+            if isinstance(current, Visited):
+                required.append(current.room_name)
+            elif isinstance(current, All):
+                pending.extend(current.goals)
+
+        incoming = [[] for _ in self._neighbors]
+        for room_id, exits in enumerate(self._neighbors):
+            for _, neighbor_id in exits:
+                incoming[neighbor_id].append(room_id)
+
+        distances = {}
+        for room_name in required:
+            target = self.the_world.get_room_id(room_name)
+            distance = {target: 0}
+            frontier = [target]
+            while frontier:
+                next_frontier = []
+                for room_id in frontier:
+                    for source in incoming[room_id]:
+                        if source not in distance:
+                            distance[source] = distance[room_id] + 1
+                            next_frontier.append(source)
+                frontier = next_frontier
+            distances[self._bits[target]] = distance
+        return distances
+
+    def _heuristic(self, state):
+        """Estimates the remaining moves of a state.
+
+        :param tuple state: The state to estimate.
+
+        :return: The distance to the farthest required room not visited yet
+        or None if one of them cannot be reached.
+        :rtype: int.
+        """
+        room_id, visited_bits, _ = state
+        estimate = 0
+        for bit, distance in self._distances.items():
+            if visited_bits & bit:
+                continue
+            try:
+                estimate = max(estimate, distance[room_id])
+            except KeyError:
+                return None
+        return estimate
+
+    def _get_moves(self, parents, state):
+        """Rebuilds the moves leading to a state.
+
+        :param dict parents: Maps states to their parent and direction.
+        :param tuple state: The final state.
+
+        :return: The directions to follow.
+        :rtype: list.
+        """
+        moves = []
+        while parents[state] is not None:
+            state, direction = parents[state]
+            moves.append(direction)
+        moves.reverse()
+        return moves
+
+    def get_commands(self, solution):
+        """Converts a solution to user commands.
+
+        :param Solution solution: The solution.
+
+        :return: The "move" commands of the solution.
+        :rtype: list.
+        """
+        names = {direction: name for name, direction
+                 in self.player_class._DIRECTIONS.items()}
+        return ['move {}'.format(names[direction])
+                for direction in solution.moves]
+
+
+def solve(the_world, start_room, player_class, use_heuristic=True,
+          max_states=MAX_STATES):
+    """Searches the shortest winning sequence of moves.
+
+    :param the_world: The world to solve.
+    :param str start_room: The name of the starting room.
+    :param type player_class: The Player derived class.
+    :param bool use_heuristic: Uses A* when the player class has a goal.
+    :param int max_states: The maximum number of states to explore.
+
+    :return: The solution or None if the game cannot be won.
+    :rtype: Solution.
+
+    :raises: SolverLimitReached.
+    """
+    return Solver(the_world, player_class).solve(
+        start_room, use_heuristic=use_heuristic, max_states=max_states
+    )
@@ -0,0 +1,283 @@
+"""Implements a write-behind SQLite store of player sessions.
+
+A SessionStore keeps the players of the active sessions in a least recently
+used cache and persists their state in a SQLite database:
+
+* Players are hydrated lazily, when their session is first requested.
+
+* A player marks its session dirty when it enters a room or its bag
+  changes (through Player.set_state_listener); nothing is written while
+  the command runs.
+
+* Dirty sessions are written in a single transaction once batch_size of
+  them accumulate, when flush or close is called and when a session ends.
+
+* When the cache is full the least recently used player is evicted; its
+  state is kept until the next batch is written.  Sessions bound to a game
+  (or pinned) are never evicted until they end, so a live player always
+  keeps writing its state; the cache grows past its capacity rather than
+  dropping one.
+
+Example:
+
+    store = SessionStore('sessions.db', the_world, MentoringPlayer,
+                         'theater')
+    the_player = store.get('alice')
+    the_game = Game(input_reader, output_writer, the_player)
+    store.bind_game(the_game, 'alice')
+
+A store must be used from a single thread.
+"""
+
+import array
+import collections
+import json
+import sqlite3
+
+import impl.player as player
+
+# Aliases.
+PlayerState = player.PlayerState
+
+# The default maximum number of cached players.
+CAPACITY = 1024
+
+# The default number of dirty sessions written in a single transaction.
+BATCH_SIZE = 256
+
+_CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    room_id INTEGER NOT NULL,
+    visited BLOB NOT NULL,
+    items TEXT NOT NULL
+)
+"""
+
+_SELECT = "SELECT room_id, visited, items FROM sessions WHERE session_id = ?"
+
+_UPSERT = "INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)"
+
+_DELETE = "DELETE FROM sessions WHERE session_id = ?"
+
+
+class SessionStore:
+    """Caches players in memory writing their state to SQLite behind them.
+
+    :ivar World world: The world of the sessions.
+    :ivar type player_class: The Player derived class.
+    :ivar str start_room: The starting room of new sessions.
+    :ivar int capacity: The maximum number of cached players.
+    :ivar int batch_size: The number of dirty sessions written at once.
+    :ivar sqlite3.Connection _connection: The database connection.
+    :ivar OrderedDict _players: Maps session ids to cached players in least
+    recently used order.
+
+    :ivar set _dirty: The ids of the cached sessions that changed since they
+    were written.
+
+    :ivar dict _evicted: Maps the ids of evicted dirty sessions to their
+    PlayerState until they are written.
+
+    :ivar set _pinned: The ids of the sessions that must not be evicted.
+
+    :ivar int writes: The number of transactions writing sessions.
+    """
+
+    def __init__(self, path, world, player_class, start_room,
+                 capacity=CAPACITY, batch_size=BATCH_SIZE):
+        """Initializer.
+
+        :param str path: The path of the database (':memory:' for a
+        temporary one).
+
+        :param World world: The world of the sessions.
+        :param type player_class: The Player derived class.
+        :param str start_room: The starting room of new sessions.
+        :param int capacity: The maximum number of cached players.
+        :param int batch_size: The number of dirty sessions written at once.
+        """
+        self.world = world
+        self.player_class = player_class
+        self.start_room = start_room
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self._connection = sqlite3.connect(path)
+        self._connection.execute(_CREATE_TABLE)
+        self._connection.commit()
+        self._players = collections.OrderedDict()
+        self._dirty = set()
+        self._evicted = {}
+        self._pinned = set()
+        self.writes = 0
+
+    def __len__(self):
+        """Returns the number of cached players."""
+        return len(self._players)
+
+    def __contains__(self, session_id):
+        """Checks if the player of a session is cached.
+
+        :param str session_id: The id of the session.
+        :rtype: bool.
+        """
+        return session_id in self._players
+
+    def get(self, session_id):
+        """Returns the player of a session hydrating or creating it.
+
+        :param str session_id: The id of the session.
+        :rtype: Player.
+        """
+        the_player = self._players.get(session_id)
+        if the_player is not None:
+            self._players.move_to_end(session_id)
+            return the_player
+
+        if len(self._players) >= self.capacity:
+            self._evict()
+        the_player = self.player_class(self.world, self.start_room)
+        state = self._evicted.pop(session_id, None)
+        if state is not None:
+            # Evicted before its state was written.
+            self._dirty.add(session_id)
+        else:
+            state = self._load(session_id)
+        if state is not None:
+            the_player.restore_state(state)
+        the_player.set_state_listener(
+            lambda _: self._mark_dirty(session_id)
+        )
+        self._players[session_id] = the_player
+        return the_player
+
+    def end_session(self, session_id):
+        """Ends a session writing its state and dropping its player.
+
+        :param str session_id: The id of the session.
+        """
+        self._pinned.discard(session_id)
+        the_player = self._players.pop(session_id, None)
+        if the_player is None:
+            return
+        the_player.set_state_listener(None)
+        if session_id in self._dirty:
+            self._dirty.discard(session_id)
+            self._evicted[session_id] = the_player.get_state()
+        self.flush()
+
+    def delete(self, session_id):
+        """Forgets a session.
+
+        :param str session_id: The id of the session.
+        """
+        self._pinned.discard(session_id)
+        the_player = self._players.pop(session_id, None)
+        if the_player is not None:
+            the_player.set_state_listener(None)
+        self._dirty.discard(session_id)
+        self._evicted.pop(session_id, None)
+        with self._connection:
+            self._connection.execute(_DELETE, (session_id,))
+
+    def pin(self, session_id):
+        """Keeps the player of a session cached until the session ends.
+
+        :param str session_id: The id of the session.
+        :rtype: Player.
+        """
+        the_player = self.get(session_id)
+        self._pinned.add(session_id)
+        return the_player
+
+    def bind_game(self, the_game, session_id):
+        """Pins a session while its game runs and ends it when the game
+        ends.
+
+        :param Game the_game: The game playing the session.
+        :param str session_id: The id of the session.
+        """
+        self.pin(session_id)
+        the_game.add_exit_hook(lambda _: self.end_session(session_id))
+
+    def flush(self):
+        """Writes all the dirty sessions in a single transaction."""
+        rows = [
+            self._to_row(session_id, self._players[session_id].get_state())
+            for session_id in self._dirty
+        ]
+        rows.extend(self._to_row(session_id, state)
+                    for session_id, state in self._evicted.items())
+        if not rows:
+            return
+        with self._connection:
+            self._connection.executemany(_UPSERT, rows)
+        self._dirty.clear()
+        self._evicted.clear()
+        self.writes += 1
+
+    def close(self):
+        """Writes the dirty sessions and closes the database."""
+        self.flush()
+        for the_player in self._players.values():
+            the_player.set_state_listener(None)
+        self._players.clear()
+        self._pinned.clear()
+        self._connection.close()
+
+    def _evict(self):
+        """Evicts the least recently used player that is not pinned."""
+        for _ in range(len(self._players)):
+            session_id = next(iter(self._players))
+            if session_id not in self._pinned:
+                break
+            # Skip the live session without scanning it again.
+            self._players.move_to_end(session_id)
+        else:
+            # Every cached session is live.
+            return
+        the_player = self._players.pop(session_id)
+        the_player.set_state_listener(None)
+        if session_id in self._dirty:
+            self._dirty.discard(session_id)
+            self._evicted[session_id] = the_player.get_state()
+            if len(self._dirty) + len(self._evicted) >= self.batch_size:
+                self.flush()
+
+    def _mark_dirty(self, session_id):
+        """Marks a session dirty writing a batch if one accumulated.
+
+        :param str session_id: The id of the session.
+        """
+        self._dirty.add(session_id)
+        if len(self._dirty) + len(self._evicted) >= self.batch_size:
+            self.flush()
+
+    def _load(self, session_id):
+        """Reads the state of a session from the database.
+
+        :param str session_id: The id of the session.
+
+        :return: The state or None if the session was never written.
+        :rtype: PlayerState.
+        """
+        row = self._connection.execute(_SELECT, (session_id,)).fetchone()
+        if row is None:
+            return None
+        room_id, visited_blob, items = row
+        visited = array.array('i')
+        visited.frombytes(visited_blob)
+        return PlayerState(room_id, visited.tolist(),
+                           [tuple(item) for item in json.loads(items)])
+
+    @staticmethod
+    def _to_row(session_id, state):
+        """Converts the state of a session to a database row.
+
+        :param str session_id: The id of the session.
+        :param PlayerState state: The state.
+        :rtype: tuple.
+        """
+        return (session_id, state.room_id,
+                array.array('i', state.visited).tobytes(),
+                json.dumps(state.items))
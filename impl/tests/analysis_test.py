@@ -0,0 +1,114 @@
+"""Tests the GraphAnalysis class."""
+
+import unittest
+
+import impl.analysis as analysis
+import impl.compact_world as compact_world
+import impl.generator as generator
+import impl.room as room
+import impl.world as world
+import mentoring
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+Direction = room.Direction
+REACHABLE_CACHE_SIZE = analysis.REACHABLE_CACHE_SIZE
+World = world.World
+
+
+class GraphAnalysisTest(unittest.TestCase):
+    """Tests the GraphAnalysis class."""
+
+    def test_mentoring_world(self):
+        """Tests analysing an existing world."""
+        the_world, start_room = mentoring.make_the_world()
+        analysis = the_world.analysis
+        self.assertIs(the_world.analysis, analysis)
+        self.assertEqual(analysis.component_count(), 1)
+        self.assertListEqual(analysis.unreachable_from(start_room), [])
+        self.assertListEqual(
+            sorted(analysis.dead_ends()),
+            ['class_room1', 'exam_room', 'mentoring-room', 'pub']
+        )
+        self.assertListEqual(analysis.orphans(), [])
+        self.assertListEqual(analysis.asymmetric_links(), [])
+        self.assertListEqual(
+            sorted(analysis.articulation_rooms()),
+            ['class_room2', 'engineering_reception', 'restaurant', 'theater']
+        )
+
+    def test_incremental_updates(self):
+        """Tests keeping the analysis up to date."""
+        for the_world in (World(), CompactWorld()):
+            for name in 'abcde':
+                the_world.add_room(name, name)
+            analysis = the_world.analysis
+            self.assertEqual(analysis.component_count(), 5)
+            self.assertEqual(len(analysis.orphans()), 5)
+
+            the_world.connect_rooms('a', 'b', Direction.EAST)
+            the_world.connect_rooms('b', 'c', Direction.EAST)
+            self.assertEqual(analysis.component_count(), 3)
+            self.assertTrue(analysis.same_component('a', 'c'))
+            self.assertListEqual(analysis.articulation_rooms(), ['b'])
+            self.assertListEqual(sorted(analysis.orphans()), ['d', 'e'])
+
+            # A one-way exit from d to a.
+            the_world.get_room('d').add_neighbor(Direction.SOUTH,
+                                                 the_world.get_room('a'))
+            self.assertListEqual(analysis.asymmetric_links(),
+                                 [('d', Direction.SOUTH, 'a')])
+            self.assertTrue(analysis.is_reachable('d', 'c'))
+            self.assertFalse(analysis.is_reachable('a', 'd'))
+            self.assertListEqual(sorted(analysis.unreachable_from('a')),
+                                 ['d', 'e'])
+
+            the_world.get_room('b').remove_neighbor(Direction.EAST)
+            self.assertListEqual(analysis.asymmetric_links(),
+                                 [('c', Direction.WEST, 'b'),
+                                  ('d', Direction.SOUTH, 'a')])
+            self.assertTrue(analysis.same_component('a', 'c'))
+            the_world.get_room('c').remove_neighbor(Direction.WEST)
+            self.assertFalse(analysis.same_component('a', 'c'))
+            self.assertEqual(analysis.component_count(), 3)
+            self.assertListEqual(sorted(analysis.components()[0]),
+                                 ['a', 'b', 'd'])
+
+            # Rooms added after the analysis was created.
+            the_world.add_room('f', 'f')
+            the_world.connect_rooms('e', 'f', Direction.NORTH)
+            self.assertTrue(analysis.same_component('e', 'f'))
+            self.assertEqual(
+                analysis.summary('a'),
+                {'rooms': 6, 'components': 3, 'dead_ends': 5, 'orphans': 1,
+                 'asymmetric_links': 1, 'articulation_rooms': 1,
+                 'unreachable': 4}
+            )
+
+    def test_generated_worlds(self):
+        """Tests analysing generated worlds."""
+        the_world, start_room = generator.generate(generator.Maze(30))
+        analysis = the_world.analysis
+        self.assertEqual(analysis.component_count(), 1)
+        self.assertEqual(len(analysis.reachable_from(start_room)), 900)
+
+        the_world, _ = generator.generate(generator.Grid(10))
+        self.assertListEqual(the_world.analysis.articulation_rooms(), [])
+        self.assertListEqual(the_world.analysis.dead_ends(), [])
+
+    def test_outside_rooms_and_reachable_cache(self):
+        """Tests exits to rooms outside the world and the bounded cache."""
+        the_world, start_room = mentoring.make_the_world()
+        the_analysis = the_world.analysis
+        the_world.get_room('pub').add_neighbor(Direction.NORTH,
+                                               room.Room('outside'))
+        self.assertEqual(the_analysis.component_count(), 1)
+        self.assertListEqual(the_analysis.asymmetric_links(), [])
+        for name in the_world:
+            self.assertListEqual(the_analysis.unreachable_from(name), [])
+        self.assertEqual(len(the_analysis._reachable), REACHABLE_CACHE_SIZE)
+        self.assertTrue(the_analysis.is_reachable(start_room, 'pub'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""Tests the benchmark suite."""
+
+import json
+import unittest
+
+import impl.benchmark as benchmark
+
+
+class BenchmarkTest(unittest.TestCase):
+    """Tests the benchmark suite."""
+
+    def setUp(self):
+        """Shortens the benchmarks."""
+        self.operations = benchmark.OPERATIONS
+        benchmark.OPERATIONS = 30
+
+    def tearDown(self):
+        """Restores the benchmarks."""
+        benchmark.OPERATIONS = self.operations
+
+    def test_grid_world(self):
+        """Tests generating a grid world."""
+        the_world, start_room = benchmark.make_grid_world(3)
+        self.assertEqual(len(the_world), 9)
+        self.assertEqual(
+            len(the_world.get_room(benchmark.room_name(1, 1)).neighbors), 4
+        )
+        self.assertEqual(len(the_world.get_room(start_room).neighbors), 2)
+
+    def test_players(self):
+        """Tests that the players win in the far corner of the grid."""
+        the_world, start_room = benchmark.make_grid_world(3)
+        for player_class in benchmark.make_players(3):
+            the_player = player_class(the_world, start_room)
+            self.assertFalse(the_player.have_won())
+            for command in ['move right', 'move right', 'move down',
+                            'move down']:
+                the_player.execute(command)
+            self.assertEqual(the_player.current_room.name,
+                             benchmark.room_name(2, 2))
+            self.assertTrue(the_player.have_won())
+
+    def test_run_and_compare(self):
+        """Tests running the benchmarks and comparing two runs."""
+        results = json.loads(json.dumps(benchmark.run(sizes=[16])))
+        names = {result['name'] for result in results['results']}
+        self.assertTrue({'build.add_room', 'build.connect_rooms',
+                         'move.throughput', 'dispatch.p50', 'have_won.goal',
+                         'memory.room', 'memory.player'} <= names)
+
+        slower = json.loads(json.dumps(results))
+        for result in slower['results']:
+            if result['better'] == 'higher':
+                result['value'] /= 2
+        rows = benchmark.compare(results, slower)
+        self.assertEqual(len(rows), len(results['results']))
+        regressed = {row[0] for row in rows if row[-1]}
+        self.assertIn('move.throughput', regressed)
+        self.assertNotIn('dispatch.p50', regressed)
+        self.assertFalse(any(row[-1]
+                             for row in benchmark.compare(results, results)))
+
+
+if __name__ == '__main__':
+    unittest.main()
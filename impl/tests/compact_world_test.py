@@ -0,0 +1,95 @@
+"""Tests the CompactWorld class."""
+
+import unittest
+
+import impl.compact_world as compact_world
+import impl.exceptions as exceptions
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+Direction = compact_world.Direction
+Room = compact_world.Room
+RoomAlreadyExists = exceptions.RoomAlreadyExists
+RoomDoesNotExist = exceptions.RoomDoesNotExist
+
+
+class MarkerRoom(Room):
+    """A specialized room used to verify that room classes are kept."""
+
+    def update_player(self, the_player):
+        """Marks the player.
+
+        :param the_player: The player to update.
+        """
+        the_player.append(self.name)
+
+
+class CompactWorldTest(unittest.TestCase):
+    """Tests the CompactWorld class."""
+
+    def setUp(self):
+        """Creates a world of three rooms."""
+        self.the_world = CompactWorld()
+        self.the_world.add_room('theater', "in a lecture theater")
+        self.the_world.add_room('pub', "in the campus pub")
+        self.the_world.add_room('restaurant', "in the campus pub",
+                                MarkerRoom)
+        self.the_world.connect_rooms('theater', 'pub', Direction.NORTH)
+
+    def test_add_room(self):
+        """Tests the add_room method."""
+        r = self.the_world.get_room('theater')
+        self.assertEqual(str(r), "in a lecture theater")
+        self.assertEqual(r.name, 'theater')
+        self.assertEqual(len(self.the_world), 3)
+        self.assertIn('pub', self.the_world)
+        self.assertIsInstance(r, Room)
+
+        with self.assertRaises(RoomAlreadyExists):
+            self.the_world.add_room('theater', "again")
+
+        with self.assertRaises(RoomDoesNotExist):
+            self.the_world.get_room('library')
+
+    def test_descriptions_are_interned(self):
+        """Tests that identical descriptions are stored once."""
+        self.assertEqual(len(self.the_world._description_table), 2)
+
+    def test_connect_rooms(self):
+        """Tests connecting two rooms."""
+        theater = self.the_world.get_room('theater')
+        pub = self.the_world.get_room('pub')
+
+        self.assertIs(theater, pub.get_neighbor(Direction.SOUTH))
+        self.assertIs(pub, theater.get_neighbor(Direction.NORTH))
+        self.assertIsNone(theater.get_neighbor(Direction.EAST))
+        self.assertListEqual(theater.neighoring_directions, ['up'])
+
+    def test_add_and_remove_neighbor(self):
+        """Tests changing the adjacency through the views."""
+        theater = self.the_world.get_room('theater')
+        restaurant = self.the_world.get_room('restaurant')
+        theater.add_neighbor(Direction.SOUTH, restaurant)
+        self.assertEqual(theater.get_neighbor(Direction.SOUTH), restaurant)
+        self.assertIsNone(restaurant.get_neighbor(Direction.NORTH))
+
+        theater.remove_neighbor(Direction.SOUTH)
+        self.assertIsNone(theater.get_neighbor(Direction.SOUTH))
+
+        with self.assertRaises(KeyError):
+            theater.remove_neighbor(Direction.SOUTH)
+
+        with self.assertRaises(ValueError):
+            theater.add_neighbor(Direction.SOUTH, Room('elsewhere'))
+
+    def test_room_class(self):
+        """Tests that the views keep the behaviour of the room class."""
+        restaurant = self.the_world.get_room('restaurant')
+        self.assertIsInstance(restaurant, MarkerRoom)
+        visits = []
+        restaurant.update_player(visits)
+        self.assertListEqual(visits, ['restaurant'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+"""Tests the direction tables."""
+
+import os
+import tempfile
+import unittest
+
+import impl.compact_world as compact_world
+import impl.directions as directions
+import impl.exceptions as exceptions
+import impl.generator as generator
+import impl.player as player
+import impl.room as room
+import impl.world as world
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+Direction = room.Direction
+EIGHT_WAY = directions.EIGHT_WAY
+FLOORS = directions.FLOORS
+FOUR_WAY = directions.FOUR_WAY
+HEX = directions.HEX
+Player = player.Player
+UnsupportedDirection = exceptions.UnsupportedDirection
+World = world.World
+
+
+class Climber(Player):
+    """A player moving between floors."""
+
+    directions = FLOORS
+
+    def have_won(self):
+        """Never wins.
+
+        :rtype: bool.
+        """
+        return False
+
+
+class DirectionsTest(unittest.TestCase):
+    """Tests the direction tables."""
+
+    def test_tables(self):
+        """Tests the opposites, labels and slots of the tables."""
+        for direction in Direction:
+            self.assertIs(direction.opposite.opposite, direction)
+            self.assertIs(direction.get_opposite_direction(),
+                          direction.opposite)
+            self.assertEqual(str(direction), direction.label)
+        for table in directions.TABLES:
+            self.assertIs(directions.get_table(table.code), table)
+            for slot, direction in enumerate(table):
+                self.assertIn(direction.opposite, table)
+                self.assertEqual(table.slots[direction], slot)
+                self.assertIs(table.parse[direction.label], direction)
+                self.assertIs(
+                    table.directions[table.opposite_slots[slot]],
+                    direction.opposite
+                )
+        self.assertListEqual([len(table) for table in directions.TABLES],
+                             [4, 8, 6, 6])
+        self.assertNotIn(Direction.NORTH, HEX)
+        with self.assertRaises(ValueError):
+            directions.DirectionTable('half', 4, {Direction.NORTH: 'up'})
+        with self.assertRaises(ValueError):
+            directions.get_table(len(directions.TABLES))
+
+    def test_world_checks_directions(self):
+        """Tests that worlds accept only the directions of their table."""
+        for world_class in (World, CompactWorld):
+            the_world = world_class()
+            the_world.add_room('hall', 'hall')
+            the_world.add_room('attic', 'attic')
+            with self.assertRaises(UnsupportedDirection):
+                the_world.connect_rooms('hall', 'attic', Direction.UP)
+            with self.assertRaises(UnsupportedDirection):
+                the_world.connect_many([('hall', 'attic', Direction.EAST),
+                                        ('hall', 'attic', Direction.UP)])
+            self.assertDictEqual(the_world.get_room('hall').neighbors, {})
+
+            the_world = world_class(directions=FLOORS)
+            the_world.add_room('hall', 'hall')
+            the_world.add_room('attic', 'attic')
+            the_world.connect_rooms('hall', 'attic', Direction.UP)
+            self.assertIs(
+                the_world.get_room('attic').get_neighbor(Direction.DOWN),
+                the_world.get_room('hall')
+            )
+            self.assertListEqual(
+                the_world.get_room('hall').neighoring_directions,
+                ['upstairs']
+            )
+            self.assertIsNone(
+                the_world.get_room('hall').get_neighbor(Direction.NORTHEAST)
+            )
+
+    def test_compact_world_width(self):
+        """Tests that the adjacency of a CompactWorld has a slot per
+        direction of its table."""
+        the_world = CompactWorld(directions=EIGHT_WAY)
+        the_world.add_rooms([('a', 'a', None), ('b', 'b', None)])
+        the_world.connect_rooms('a', 'b', Direction.SOUTHEAST)
+        self.assertEqual(len(the_world.adjacency), 2 * EIGHT_WAY.width)
+        self.assertDictEqual(the_world.get_room('b').neighbors,
+                             {Direction.NORTHWEST: the_world.get_room('a')})
+        self.assertListEqual(
+            the_world.analysis.articulation_rooms(), []
+        )
+        self.assertEqual(the_world.analysis.component_count(), 1)
+
+    def test_snapshot(self):
+        """Tests that snapshots keep the table of the world."""
+        handle, path = tempfile.mkstemp(suffix='.zuu')
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        the_world = World(directions=HEX)
+        the_world.add_room('a', 'a')
+        the_world.add_room('b', 'b')
+        the_world.connect_rooms('a', 'b', Direction.NORTHEAST)
+        the_world.save_snapshot(path)
+
+        snapshot_world = World.open_snapshot(path)
+        self.assertIs(snapshot_world.directions, HEX)
+        self.assertEqual(snapshot_world.get_room('b').get_neighbor(
+            Direction.SOUTHWEST).name, 'a')
+
+    def test_player_and_building(self):
+        """Tests a player climbing the floors of a generated building."""
+        self.assertDictEqual(Player._DIRECTIONS, FOUR_WAY.parse)
+        self.assertNotIn('upstairs', Player._DIRECTIONS)
+
+        topology = generator.Building(generator.Grid(2), floors=3,
+                                      stairs=(3,))
+        the_world, start_room = generator.generate(topology)
+        self.assertIs(the_world.directions, FLOORS)
+        self.assertEqual(len(the_world), 12)
+        self.assertEqual(start_room, 'r0_0_f0')
+
+        the_player = Climber(the_world, start_room)
+        self.assertFalse(the_player.execute('move upstairs').ok)
+        the_player.execute_user_command('move right')
+        the_player.execute_user_command('move down')
+        the_player.execute_user_command('move upstairs')
+        the_player.execute_user_command('move upstairs')
+        self.assertEqual(the_player.current_room.name, 'r1_1_f2')
+        self.assertFalse(the_player.execute('move upstairs').ok)
+        self.assertEqual(the_world.analysis.component_count(), 1)
+
+    def test_hex_tree(self):
+        """Tests a tree using the hexagonal directions."""
+        topology = generator.Tree(200, seed=3, directions=HEX)
+        the_world, _ = generator.generate(topology)
+        self.assertIs(the_world.directions, HEX)
+        self.assertEqual(the_world.analysis.component_count(), 1)
+        self.assertListEqual(the_world.analysis.asymmetric_links(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Tests the Dispatcher class."""
+
+import unittest
+
+import impl.dispatch as dispatch
+import impl.dummygame as dummygame
+import impl.exceptions as exceptions
+import impl.player as player
+import impl.room as room
+
+# Aliases.
+CommandTrie = dispatch.CommandTrie
+Direction = room.Direction
+Dispatcher = dispatch.Dispatcher
+DummyPlayer = dummygame.DummyPlayer
+FailedToExecuteAction = exceptions.FailedToExecuteAction
+UnsupportedCommand = exceptions.UnsupportedCommand
+UserCommand = player.UserCommand
+
+
+class StrictPlayer(DummyPlayer):
+    """A player without abbreviations and with an extra command."""
+
+    allow_abbreviations = False
+
+    @UserCommand
+    def say(self, *words):
+        """Says something."""
+        return ' '.join(words)
+
+
+class DispatcherTest(unittest.TestCase):
+    """Tests the Dispatcher class."""
+
+    def test_trie(self):
+        """Tests resolving unique prefixes."""
+        trie = CommandTrie(['move', 'mop', 'ls'])
+        self.assertEqual(trie.resolve('l'), 'ls')
+        self.assertEqual(trie.resolve('mov'), 'move')
+        self.assertEqual(trie.resolve('mop'), 'mop')
+        self.assertIsNone(trie.resolve('mo'))
+        self.assertIsNone(trie.resolve('x'))
+        self.assertSetEqual(trie.get_completions('m'), {'move', 'mop'})
+
+    def test_parse(self):
+        """Tests parsing, converting and caching lines."""
+        the_dispatcher = DummyPlayer._dispatcher
+        parsed = the_dispatcher.parse('mo  up')
+        self.assertEqual(parsed.name, 'move')
+        self.assertTupleEqual(parsed.args, (Direction.NORTH,))
+        self.assertIs(the_dispatcher.parse('mo  up'), parsed)
+
+        with self.assertRaises(FailedToExecuteAction):
+            the_dispatcher.parse('move')
+        with self.assertRaises(FailedToExecuteAction):
+            the_dispatcher.parse('move up down')
+        with self.assertRaises(FailedToExecuteAction) as context:
+            the_dispatcher.parse('move sideways')
+        self.assertIn('move sideways', str(context.exception))
+        with self.assertRaises(UnsupportedCommand):
+            the_dispatcher.parse('jump')
+        with self.assertRaises(UnsupportedCommand):
+            the_dispatcher.parse('  ')
+
+    def test_cache_eviction(self):
+        """Tests evicting the least recently used lines."""
+        the_dispatcher = Dispatcher(DummyPlayer, DummyPlayer._commands,
+                                    max_parsed_lines=2)
+        first = the_dispatcher.parse('move up')
+        the_dispatcher.parse('move down')
+        the_dispatcher.parse('move up')
+        the_dispatcher.parse('ls')
+        self.assertIs(the_dispatcher.parse('move up'), first)
+        self.assertIsNot(the_dispatcher.parse('move down'), first)
+
+    def test_player_class_options(self):
+        """Tests disabling abbreviations and variable arguments."""
+        the_world, the_room = dummygame.make_the_world()
+        the_player = StrictPlayer(world=the_world, start_room=the_room)
+        self.assertEqual(the_player.execute_user_command('say hello there'),
+                         'hello there')
+        self.assertEqual(the_player.execute_user_command('move up'),
+                         'You are now in: pub ')
+        with self.assertRaises(UnsupportedCommand):
+            the_player.execute_user_command('mo down')
+        self.assertIn('say', StrictPlayer._commands)
+        self.assertNotIn('say', DummyPlayer._commands)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""Tests the RoomEvents class."""
+
+import unittest
+from unittest import mock
+
+import impl.compact_world as compact_world
+import impl.events as events
+import impl.room as room
+import impl.world as world
+import mentoring
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+Direction = room.Direction
+MentoringPlayer = mentoring.MentoringPlayer
+RestaurantRoom = mentoring.RestaurantRoom
+Room = room.Room
+World = world.World
+
+
+class DoorRoom(Room):
+    """A room recording the players entering and leaving it."""
+
+    log = []
+
+    def on_enter(self, the_player):
+        """Records an entry.
+
+        :param Player the_player: The player.
+        """
+        self.log.append(('enter', self.name))
+
+    def on_exit(self, the_player):
+        """Records an exit.
+
+        :param Player the_player: The player.
+        """
+        self.log.append(('exit', self.name))
+
+
+class KitchenRoom(RestaurantRoom):
+    """A restaurant derived room."""
+
+
+class ShopRoom(Room):
+    """A room giving a coin."""
+
+    def update_player(self, the_player):
+        """Gives a coin.
+
+        :param Player the_player: The player.
+        """
+        the_player.add_to_bag('coin')
+
+
+class HallRoom(Room):
+    """A room class without hooks."""
+
+
+class RoomEventsTest(unittest.TestCase):
+    """Tests the RoomEvents class."""
+
+    def setUp(self):
+        """Clears the log of the door rooms."""
+        DoorRoom.log = []
+
+    def test_capabilities(self):
+        """Tests indexing the hooks of the room classes."""
+        self.assertEqual(events.get_capabilities(Room), frozenset())
+        self.assertEqual(events.get_capabilities(KitchenRoom),
+                         {'update_player'})
+        self.assertEqual(events.get_capabilities(DoorRoom),
+                         {'on_enter', 'on_exit'})
+        room_events = events.RoomEvents()
+        self.assertEqual(room_events.on_enter[Room], ())
+        self.assertFalse(room_events.has_effects(Room))
+        self.assertTrue(room_events.has_effects(DoorRoom))
+        self.assertEqual(len(room_events.on_exit[DoorRoom]), 1)
+
+    def test_hooks_and_subscribers(self):
+        """Tests calling the hooks and the subscribers of rooms."""
+        for the_world in (World(), CompactWorld()):
+            DoorRoom.log = []
+            the_world.add_room('hall', 'hall')
+            the_world.add_room('door', 'door', DoorRoom)
+            the_world.add_room('kitchen', 'kitchen', KitchenRoom)
+            the_world.connect_rooms('hall', 'door', Direction.EAST)
+            the_world.connect_rooms('door', 'kitchen', Direction.EAST)
+            entered = []
+
+            def on_room(the_room, the_player):
+                entered.append(the_room.name)
+
+            the_world.events.subscribe(on_room, room_class=RestaurantRoom)
+            the_world.events.subscribe(on_room, room_name='hall')
+            with self.assertRaises(ValueError):
+                the_world.events.subscribe(on_room, RestaurantRoom, 'hall')
+
+            the_player = MentoringPlayer(the_world, 'hall')
+            for command in ['move right', 'move right', 'move left',
+                            'move left']:
+                the_player.execute_user_command(command)
+            self.assertListEqual(DoorRoom.log, [
+                ('enter', 'door'), ('exit', 'door'), ('enter', 'door'),
+                ('exit', 'door')
+            ])
+            self.assertListEqual(entered, ['kitchen', 'hall'])
+            self.assertTrue(the_player.is_in_bag('textbook'))
+
+            the_world.events.unsubscribe(on_room)
+            the_player.execute_user_command('goto kitchen')
+            self.assertListEqual(entered, ['kitchen', 'hall'])
+            self.assertDictEqual(the_world.events.by_name, {})
+
+    def test_replaced_hooks(self):
+        """Tests replacing hooks after the rooms were entered."""
+        the_world = World()
+        the_world.add_room('hall', 'hall', HallRoom)
+        the_world.add_room('shop', 'shop', ShopRoom)
+        the_world.connect_rooms('hall', 'shop', Direction.EAST)
+        the_player = MentoringPlayer(the_world, 'hall')
+        the_player.execute_user_command('move right')
+        the_player.execute_user_command('move left')
+        self.assertTrue(the_player.is_in_bag('coin'))
+
+        def give_gem(the_room, a_player):
+            a_player.add_to_bag('gem')
+
+        with mock.patch.object(ShopRoom, 'update_player', give_gem):
+            the_player.execute_user_command('move right')
+        self.assertTrue(the_player.is_in_bag('gem'))
+
+        # Replacing the hook of a room keeps the index of its class and
+        # of the other worlds.
+        other_events = events.RoomEvents()
+        self.assertEqual(other_events.on_enter[ShopRoom],
+                         (events._HOOK_CALLERS['update_player'],))
+        calls = []
+        hall = the_world.get_room('hall')
+        hall.on_enter = calls.append
+        the_player.execute_user_command('move left')
+        self.assertListEqual(calls, [the_player])
+        self.assertEqual(events.get_capabilities(HallRoom), frozenset())
+        self.assertEqual(the_world.events.on_enter[HallRoom], ())
+        self.assertEqual(events.get_room_capabilities(hall), {'on_enter'})
+        self.assertIn(ShopRoom, other_events.on_enter)
+
+        # Replacing the hook of a class drops only the class.
+        HallRoom.on_exit = lambda the_room, a_player: calls.append('exit')
+        self.addCleanup(delattr, HallRoom, 'on_exit')
+        self.assertIn(ShopRoom, other_events.on_enter)
+        self.assertNotIn(HallRoom, the_world.events.on_enter)
+        the_player.execute_user_command('move right')
+        self.assertListEqual(calls, [the_player, 'exit'])
+        self.assertEqual(events.get_capabilities(Room), frozenset())
+
+        del hall.on_enter
+        self.assertIs(hall._events_key, HallRoom)
+        the_player.execute_user_command('move left')
+        self.assertListEqual(calls, [the_player, 'exit'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""Tests the procedural world generator."""
+
+import os
+import tempfile
+import unittest
+
+import impl.compact_world as compact_world
+import impl.generator as generator
+import impl.loader as loader
+import mentoring
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+Direction = generator.Direction
+RestaurantRoom = mentoring.RestaurantRoom
+
+
+def get_links(the_world):
+    """Returns the exits of all the rooms of a world.
+
+    :param World the_world: The world.
+    :rtype: set.
+    """
+    return {
+        (name, direction, neighbor.name)
+        for name in the_world
+        for direction, neighbor
+        in the_world.get_room(name).neighbors.items()
+    }
+
+
+class GeneratorTest(unittest.TestCase):
+    """Tests the procedural world generator."""
+
+    def assert_valid(self, topology):
+        """Generates a world checking that all its links are symmetric.
+
+        :param Topology topology: The topology.
+        :return: The exits of the generated world.
+        :rtype: set.
+        """
+        connections = list(topology.iter_connections())
+        the_world, start_room = generator.generate(topology, batch_size=7)
+        self.assertEqual(len(the_world), len(topology))
+        self.assertEqual(start_room, topology.room_name(0))
+        links = get_links(the_world)
+        # No direction of a room is used twice.
+        self.assertEqual(len(links), 2 * len(connections))
+        for name, direction, neighbor in links:
+            self.assertIn(
+                (neighbor, direction.get_opposite_direction(), name), links
+            )
+        return links
+
+    def assert_connected(self, the_world, start_room):
+        """Checks that every room can be reached from the start room.
+
+        :param World the_world: The world.
+        :param str start_room: The start room.
+        """
+        seen = {start_room}
+        stack = [start_room]
+        while stack:
+            for neighbor in the_world.get_room(stack.pop()).neighbors.values():
+                if neighbor.name not in seen:
+                    seen.add(neighbor.name)
+                    stack.append(neighbor.name)
+        self.assertEqual(len(seen), len(the_world))
+
+    def test_grid(self):
+        """Tests generating a grid."""
+        topology = generator.Grid(4, 3)
+        links = self.assert_valid(topology)
+        self.assertEqual(len(links), 2 * (3 * 3 + 4 * 2))
+        self.assertIn(('r0_0', Direction.EAST, 'r1_0'), links)
+        self.assertIn(('r1_1', Direction.NORTH, 'r1_0'), links)
+        self.assertListEqual(topology.get_adjacent(0),
+                         [(Direction.SOUTH, 4), (Direction.EAST, 1)])
+
+    def test_maze(self):
+        """Tests generating mazes."""
+        maze = generator.Maze(12, 9, seed=3)
+        self.assert_valid(maze)
+        # A perfect maze is a spanning tree.
+        self.assertEqual(len(list(maze.iter_connections())), 12 * 9 - 1)
+        self.assert_connected(*generator.generate(maze))
+        self.assertListEqual(
+            list(maze.iter_connections()),
+            list(generator.Maze(12, 9, seed=3).iter_connections())
+        )
+        self.assertNotEqual(
+            list(maze.iter_connections()),
+            list(generator.Maze(12, 9, seed=4).iter_connections())
+        )
+        with_loops = generator.Maze(12, 9, seed=3, loops=0.5)
+        self.assert_valid(with_loops)
+        self.assertGreater(len(list(with_loops.iter_connections())),
+                           12 * 9 - 1)
+
+    def test_tree_and_small_world(self):
+        """Tests generating trees and small worlds."""
+        tree = generator.Tree(500, seed=1)
+        self.assert_valid(tree)
+        self.assertEqual(len(list(tree.iter_connections())), 499)
+        self.assert_connected(*generator.generate(tree))
+
+        small_world = generator.SmallWorld(300, seed=2, shortcuts=0.3)
+        self.assert_valid(small_world)
+        shortcuts = [connection
+                     for connection in small_world.iter_connections()
+                     if connection[2] == Direction.NORTH]
+        self.assertGreater(len(shortcuts), 30)
+        self.assertEqual(len(generator.generate(generator.Tree(0))[0]), 0)
+        self.assert_valid(generator.SmallWorld(2))
+
+    def test_placer(self):
+        """Tests placing room classes."""
+        placer = generator.weighted_placer([(RestaurantRoom, 0.25)], seed=5)
+        the_world, _ = generator.generate(generator.Grid(20), placer,
+                                          the_world=CompactWorld())
+        restaurants = [name for name in the_world
+                       if isinstance(the_world.get_room(name),
+                                     RestaurantRoom)]
+        self.assertTrue(50 < len(restaurants) < 150)
+        # The choice depends only on the index of the room.
+        self.assertListEqual(
+            [placer(index) for index in reversed(range(400))][::-1],
+            [placer(index) for index in range(400)]
+        )
+        with self.assertRaises(ValueError):
+            generator.weighted_placer([(RestaurantRoom, 0.6),
+                                       (RestaurantRoom, 0.6)])
+
+    def test_write_world(self):
+        """Tests writing world files that the loader reads back."""
+        topology = generator.Maze(6, seed=9, loops=0.2)
+        placer = generator.weighted_placer([(RestaurantRoom, 0.3)], seed=1)
+        expected, _ = generator.generate(topology, placer)
+        with tempfile.TemporaryDirectory() as directory:
+            for file_name in ('world.jsonl', 'world.csv'):
+                path = os.path.join(directory, file_name)
+                generator.write_world(path, topology, placer)
+                the_world, start_room = loader.load_world(path)
+                self.assertEqual(start_room, 'r0_0')
+                self.assertSetEqual(get_links(the_world),
+                                    get_links(expected))
+                for name in the_world:
+                    self.assertIs(type(the_world.get_room(name)),
+                                  type(expected.get_room(name)))
+
+
+if __name__ == '__main__':
+    unittest.main()
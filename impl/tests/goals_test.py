@@ -0,0 +1,57 @@
+"""Tests the goals."""
+
+import unittest
+
+import impl.goals as goals
+
+# Aliases.
+has_item = goals.has_item
+visited = goals.visited
+
+
+class GoalsTest(unittest.TestCase):
+    """Tests the goals."""
+
+    def test_all(self):
+        """Tests a goal requiring rooms and items."""
+        tracker = (visited('a', 'b') & has_item('key', 2)).track()
+        self.assertFalse(tracker.satisfied)
+        tracker.on_visit('a')
+        tracker.on_visit('b')
+        tracker.on_visit('a')
+        tracker.on_item_changed('key', 1)
+        self.assertFalse(tracker.satisfied)
+        tracker.on_item_changed('key', 1)
+        self.assertTrue(tracker.satisfied)
+        tracker.on_item_changed('key', -1)
+        self.assertFalse(tracker.satisfied)
+        tracker.on_item_changed('coin', 1)
+        self.assertFalse(tracker.satisfied)
+
+    def test_any_and_not(self):
+        """Tests alternatives and negations."""
+        goal = (visited('a') | visited('b')) & ~has_item('curse')
+        tracker = goal.track()
+        self.assertFalse(tracker.satisfied)
+        tracker.on_visit('b')
+        self.assertTrue(tracker.satisfied)
+        tracker.on_item_changed('curse', 1)
+        self.assertFalse(tracker.satisfied)
+        tracker.on_item_changed('curse', -1)
+        self.assertTrue(tracker.satisfied)
+
+    def test_compiled_once(self):
+        """Tests that trackers share the compiled goal."""
+        goal = visited('a') & visited('b') & visited('c')
+        self.assertEqual(len(goal.goals), 3)
+        self.assertIs(goal.compile(), goal.compile())
+        self.assertFalse(goal.track().satisfied)
+
+    def test_invalid_goal(self):
+        """Tests compiling something that is not a goal."""
+        with self.assertRaises(TypeError):
+            (visited('a') & 'b').compile()
+
+
+if __name__ == '__main__':
+    unittest.main()
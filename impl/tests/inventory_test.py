@@ -0,0 +1,47 @@
+"""Tests the Inventory class."""
+
+import unittest
+
+import impl.inventory as inventory
+
+# Aliases.
+Inventory = inventory.Inventory
+InventoryFull = inventory.InventoryFull
+ItemNotInInventory = inventory.ItemNotInInventory
+
+
+class InventoryTest(unittest.TestCase):
+    """Tests the Inventory class."""
+
+    def test_counts(self):
+        """Tests adding and removing copies of items."""
+        bag = Inventory()
+        for _ in range(1000):
+            bag.add('textbook')
+        bag.add('pen', 2)
+        self.assertEqual(len(bag), 1002)
+        self.assertEqual(bag.count('textbook'), 1000)
+        self.assertIn('pen', bag)
+        self.assertListEqual(sorted(bag), ['pen', 'textbook'])
+
+        bag.remove('pen')
+        self.assertTrue(bag.consume('pen'))
+        self.assertNotIn('pen', bag)
+        self.assertFalse(bag.consume('pen'))
+        with self.assertRaises(ItemNotInInventory):
+            bag.remove('textbook', 1001)
+        self.assertEqual(bag.count('textbook'), 1000)
+
+    def test_capacity(self):
+        """Tests the capacity limit."""
+        bag = Inventory(capacity=2)
+        bag.add('pen', 2)
+        with self.assertRaises(InventoryFull):
+            bag.add('pen')
+        bag.remove('pen')
+        bag.add('key')
+        self.assertDictEqual(dict(bag.items()), {'pen': 1, 'key': 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+"""Tests the journaled sessions."""
+
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import impl.exceptions as exceptions
+import impl.journal as journal
+import mentoring
+
+# Aliases.
+InvalidJournal = exceptions.InvalidJournal
+JournaledSession = journal.JournaledSession
+MentoringPlayer = mentoring.MentoringPlayer
+
+
+class JournalTest(unittest.TestCase):
+    """Tests the journaled sessions."""
+
+    def setUp(self):
+        """Creates a directory for the journals."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'session.journal')
+        self.the_world, self.start_room = mentoring.make_the_world()
+
+    def tearDown(self):
+        """Removes the journals."""
+        self.directory.cleanup()
+
+    def start_session(self, snapshot_every):
+        """Starts a session and plays a few commands.
+
+        :param int snapshot_every: The number of commands between snapshots.
+        :rtype: JournaledSession.
+        """
+        the_player = MentoringPlayer(self.the_world, self.start_room)
+        session = JournaledSession.start(the_player, self.path,
+                                         snapshot_every=snapshot_every)
+        for command in ['move down', 'move up', 'move up', 'move down',
+                        'move left', 'move left', 'move right']:
+            session.execute(command)
+        return session
+
+    def check_restored(self, session):
+        """Checks that a restored session matches the played one.
+
+        :param JournaledSession session: The played session.
+        """
+        restored = JournaledSession.restore(self.path, self.the_world,
+                                            MentoringPlayer)
+        self.assertEqual(restored.player.get_state(),
+                         session.player.get_state())
+        self.assertEqual(restored.command_count, session.command_count)
+        for command in ['move left', 'move down', 'move left', 'move up']:
+            self.assertTrue(restored.execute(command).ok)
+        self.assertTrue(restored.execute('move right').won)
+        restored.close()
+
+    def test_replay_without_snapshot(self):
+        """Tests replaying a whole journal after a crash."""
+        session = self.start_session(snapshot_every=100)
+        session.journal.close()
+        self.assertFalse(os.path.exists(self.path + journal.SNAPSHOT_SUFFIX))
+        self.assertEqual(session.command_count, 5)
+        self.assertTrue(session.player.is_in_bag('textbook'))
+        self.check_restored(session)
+
+    def test_replay_tail_after_snapshot(self):
+        """Tests replaying the commands after the latest snapshot."""
+        session = self.start_session(snapshot_every=2)
+        session.journal.close()
+        start_room, commands, _ = journal.read_journal(self.path)
+        self.assertEqual(start_room, 'theater')
+        self.assertEqual(len(commands), 5)
+        with open(self.path + journal.SNAPSHOT_SUFFIX, 'rb') as snapshot:
+            _, offset, count = journal.decode_state(snapshot.read())
+        self.assertEqual(count, 4)
+        _, tail, _ = journal.read_journal(self.path, offset)
+        self.assertListEqual(tail, ['move right'])
+
+        # The records before the snapshot are not read again.
+        with open(self.path, 'r+b') as journal_file:
+            journal_file.seek(offset - 1)
+            journal_file.write(b'!')
+        _, tail, size = journal.read_journal(self.path, offset)
+        self.assertListEqual(tail, ['move right'])
+        self.assertEqual(size, os.path.getsize(self.path))
+        self.check_restored(session)
+
+    def test_start_removes_old_snapshot_first(self):
+        """Tests that a new session never leaves the snapshot of an older
+        one next to its journal."""
+        self.start_session(snapshot_every=2).close()
+        snapshot_path = self.path + journal.SNAPSHOT_SUFFIX
+        self.assertTrue(os.path.exists(snapshot_path))
+        the_player = MentoringPlayer(self.the_world, self.start_room)
+        with mock.patch.object(journal, 'Journal', side_effect=OSError):
+            with self.assertRaises(OSError):
+                JournaledSession.start(the_player, self.path)
+        self.assertFalse(os.path.exists(snapshot_path))
+
+    def test_torn_record(self):
+        """Tests dropping a record torn by a crash."""
+        session = self.start_session(snapshot_every=100)
+        session.journal.close()
+        size = os.path.getsize(self.path)
+        with open(self.path, 'ab') as journal_file:
+            journal_file.write(b'\x20\x00\x00\x00\x01\x02move')
+        self.check_restored(session)
+        _, commands, valid_size = journal.read_journal(self.path)
+        self.assertGreater(valid_size, size)
+        self.assertEqual(commands[5:], ['move left', 'move down', 'move left',
+                                        'move up', 'move right'])
+
+    def test_invalid_journal(self):
+        """Tests opening a file that is not a journal."""
+        with open(self.path, 'wb') as journal_file:
+            journal_file.write(b'not a journal')
+        with self.assertRaises(InvalidJournal):
+            JournaledSession.restore(self.path, self.the_world,
+                                     MentoringPlayer)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""Tests the LazyWorld class."""
+
+import unittest
+
+import impl.exceptions as exceptions
+import impl.generator as generator
+import impl.lazy_world as lazy_world
+import impl.player as player
+import impl.visited as visited
+import mentoring
+
+# Aliases.
+Direction = lazy_world.Direction
+LazyWorld = lazy_world.LazyWorld
+Player = player.Player
+RestaurantRoom = mentoring.RestaurantRoom
+RoomDoesNotExist = exceptions.RoomDoesNotExist
+WorldIsReadOnly = exceptions.WorldIsReadOnly
+
+
+class Explorer(Player):
+    """A player exploring without a goal."""
+
+    def have_won(self):
+        """Never wins.
+
+        :rtype: bool.
+        """
+        return False
+
+
+class LazyWorldTest(unittest.TestCase):
+    """Tests the LazyWorld class."""
+
+    def test_generates_on_demand(self):
+        """Tests generating only the rooms that are reached."""
+        the_world = LazyWorld(lazy_world.infinite_grid(), capacity=100)
+        the_player = Explorer(the_world, 'r0_0')
+        self.assertEqual(len(the_world), 1)
+        the_player.execute_user_command('move up')
+        self.assertEqual(the_player.current_room.name, 'r0_-1')
+        self.assertEqual(len(the_world), 2)
+        self.assertIn('r-5_9', the_world)
+        self.assertNotIn('pub', the_world)
+        with self.assertRaises(RoomDoesNotExist):
+            the_world.get_room('pub')
+        with self.assertRaises(WorldIsReadOnly):
+            the_world.connect_rooms('r0_0', 'r0_1', Direction.EAST)
+        with self.assertRaises(WorldIsReadOnly):
+            the_player.current_room.add_neighbor(Direction.EAST,
+                                                 the_player.current_room)
+
+    def test_eviction(self):
+        """Tests evicting rooms and generating them again identically."""
+        placer = generator.weighted_placer([(RestaurantRoom, 0.3)], seed=2)
+        the_world = LazyWorld(lazy_world.infinite_grid(placer), capacity=10)
+        the_player = Explorer(the_world, 'r0_0')
+        first = {}
+        for _ in range(50):
+            the_player.execute_user_command('move right')
+            the_room = the_player.current_room
+            first[the_room.name] = (type(the_room), the_room.room_id)
+        self.assertLessEqual(len(the_world._rooms), 10)
+        self.assertGreater(the_world.evicted, 0)
+        self.assertTrue(any(room_class.__name__ == 'RestaurantRoom'
+                            for room_class, _ in first.values()))
+
+        for _ in range(50):
+            the_player.execute_user_command('move left')
+        generated = the_world.generated
+        for name, (room_class, room_id) in first.items():
+            the_room = the_world.get_room(name)
+            self.assertIs(type(the_room), room_class)
+            self.assertEqual(the_room.room_id, room_id)
+        self.assertGreater(the_world.generated, generated)
+        self.assertTrue(the_player.has_already_visited('r0_0', 'r50_0'))
+        self.assertEqual(the_world.get_room('r3_0'),
+                         the_world.get_room_by_id(first['r3_0'][1]))
+
+    def test_bounded_grid_and_goto(self):
+        """Tests adapting a Grid topology and routing between rooms."""
+        the_world = LazyWorld(lazy_world.grid_rooms(generator.Grid(5, 4)),
+                              capacity=6)
+        the_player = Explorer(the_world, 'r0_0')
+        self.assertSetEqual(set(the_player.current_room.neighbors),
+                            {Direction.SOUTH, Direction.EAST})
+        self.assertNotIn('r5_0', the_world)
+        the_player.execute_user_command('goto r4_3')
+        self.assertEqual(the_player.current_room.name, 'r4_3')
+        self.assertEqual(len(the_player.visited_rooms), 8)
+
+        the_world.router.max_rooms = 3
+        self.assertFalse(the_player.execute('goto r0_0').ok)
+
+    def test_bounded_memory(self):
+        """Tests that searches and ids do not grow the world."""
+        the_world = LazyWorld(lazy_world.infinite_grid(), capacity=50)
+        the_player = Explorer(the_world, 'r0_0')
+        the_player.execute_user_command('move right')
+        generated = the_world.generated
+        self.assertFalse(the_player.execute('goto r200_0').ok)
+        self.assertLessEqual(the_world.generated, generated + 1)
+        self.assertEqual(the_world.evicted, 0)
+        self.assertLessEqual(len(the_world), 50)
+        room_id = the_world.get_room_id('r-3_7')
+        self.assertEqual(the_world.get_room_by_id(room_id).name, 'r-3_7')
+
+        the_world = LazyWorld(lambda name: None if name != 'a' else
+                              lazy_world.RoomSpec('a', None, {}))
+        self.assertEqual(the_world.get_room_id('a'), 0)
+
+    def test_visited_rooms_stay_small(self):
+        """Tests that walking far keeps the visited rooms proportional to
+        the rooms visited."""
+        the_world = LazyWorld(lazy_world.infinite_grid(), capacity=50)
+        the_player = Explorer(the_world, 'r0_0')
+        for _ in range(5000):
+            the_player.execute('move right')
+        self.assertEqual(the_player.current_room.name, 'r5000_0')
+        visited_rooms = the_player.visited_rooms
+        self.assertEqual(len(visited_rooms), 5001)
+        self.assertLessEqual(len(visited_rooms._bits),
+                             visited.DENSE_MIN_BYTES)
+        self.assertEqual(len(visited_rooms._sparse), 5001)
+        self.assertTrue(the_player.has_already_visited('r0_0', 'r4999_0'))
+        self.assertFalse(the_player.has_already_visited('r0_1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""Tests the world loader."""
+
+import os
+import tempfile
+import unittest
+
+import impl.compact_world as compact_world
+import impl.exceptions as exceptions
+import impl.loader as loader
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+Direction = loader.Direction
+InvalidWorldDefinition = exceptions.InvalidWorldDefinition
+
+_JSONL = '''
+{"kind": "room_class", "name": "restaurant", "path": "mentoring.RestaurantRoom"}
+{"kind": "room", "name": "theater", "description": "lecture theater"}
+{"kind": "room", "name": "pub", "description": "pub"}
+{"kind": "room", "name": "restaurant", "room_class": "restaurant"}
+{"kind": "connect", "from": "theater", "to": "pub", "direction": "NORTH"}
+{"kind": "connect", "from": "theater", "to": "restaurant", "direction": "down"}
+{"kind": "start", "name": "theater"}
+'''
+
+_CSV = '''kind,name,description,from,to,direction
+room,theater,lecture theater,,,
+room,pub,pub,,,
+connect,,,theater,pub,up
+start,theater,,,,
+'''
+
+
+class LoaderTest(unittest.TestCase):
+    """Tests the world loader."""
+
+    def write(self, suffix, contents):
+        """Writes a temporary world file.
+
+        :param str suffix: The extension of the file.
+        :param str contents: The contents of the file.
+
+        :return: The path of the file.
+        :rtype: str.
+        """
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, 'w') as stream:
+            stream.write(contents)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_load_jsonl(self):
+        """Tests loading a JSON Lines file."""
+        the_world, start_room = loader.load_world(
+            self.write('.jsonl', _JSONL), batch_size=2
+        )
+        self.assertEqual(start_room, 'theater')
+        self.assertEqual(len(the_world), 3)
+
+        theater = the_world.get_room('theater')
+        restaurant = the_world.get_room('restaurant')
+        self.assertEqual(str(theater), 'lecture theater')
+        self.assertEqual(str(restaurant), 'restaurant')
+        self.assertEqual(type(restaurant).__name__, 'RestaurantRoom')
+        self.assertIs(theater.get_neighbor(Direction.SOUTH), restaurant)
+        self.assertIs(restaurant.get_neighbor(Direction.NORTH), theater)
+
+    def test_load_csv_into_compact_world(self):
+        """Tests loading a CSV file into a CompactWorld."""
+        the_world, start_room = loader.load_world(
+            self.write('.csv', _CSV), the_world=CompactWorld()
+        )
+        self.assertEqual(start_room, 'theater')
+        pub = the_world.get_room('pub')
+        self.assertEqual(
+            pub.get_neighbor(Direction.SOUTH), the_world.get_room(start_room)
+        )
+
+    def test_invalid_definition(self):
+        """Tests that all the problems are reported at once."""
+        path = self.write('.jsonl', '\n'.join([
+            '{"kind": "room", "name": "theater"}',
+            '{"kind": "room", "name": "theater"}',
+            '{"kind": "connect", "from": "theater", "to": "pub",'
+            ' "direction": "up"}',
+            '{"kind": "connect", "from": "theater", "to": "theater",'
+            ' "direction": "sideways"}',
+        ]))
+        with self.assertRaises(InvalidWorldDefinition) as context:
+            loader.load_world(path)
+        msg = str(context.exception)
+        self.assertIn('Line 2', msg)
+        self.assertIn('Line 3', msg)
+        self.assertIn('Line 4', msg)
+
+    def test_failed_load_leaves_world_unchanged(self):
+        """Tests that the rooms of an invalid file are not added."""
+        path = self.write('.jsonl', '\n'.join([
+            '{"kind": "room_class", "name": "shell", "path": "os.system"}',
+            '{"kind": "room", "name": "theater"}',
+            '{"kind": "room", "name": "pub"}',
+            '{"kind": "start", "name": "library"}',
+        ]))
+        the_world = CompactWorld()
+        the_world.add_room('hall', 'hall')
+        with self.assertRaises(InvalidWorldDefinition) as context:
+            loader.load_world(path, the_world=the_world, batch_size=1)
+        msg = str(context.exception)
+        self.assertIn('Line 1', msg)
+        self.assertIn('not a Room derived class', msg)
+        self.assertListEqual(list(the_world), ['hall'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Tests the Metrics class."""
+
+import json
+import os
+import tempfile
+import unittest
+
+import impl.dummygame as dummygame
+import impl.game as game
+import impl.metrics as metrics
+import mentoring
+
+# Aliases.
+DummyPlayer = dummygame.DummyPlayer
+Game = game.Game
+Histogram = metrics.Histogram
+Metrics = metrics.Metrics
+
+
+class InstrumentedPlayer(mentoring.MentoringPlayer):
+    """A player class instrumented by the tests."""
+
+
+class MetricsTest(unittest.TestCase):
+    """Tests the Metrics class."""
+
+    def setUp(self):
+        """Instruments a player class."""
+        self.metrics = Metrics()
+        self.metrics.instrument(InstrumentedPlayer)
+        self.the_world, self.start_room = mentoring.make_the_world()
+
+    def tearDown(self):
+        """Removes the instrumentation."""
+        Metrics.uninstrument(InstrumentedPlayer)
+
+    def test_histogram(self):
+        """Tests the fixed buckets of the histogram."""
+        histogram = Histogram()
+        for duration in [0, 255, 256, 1000, 10 ** 12]:
+            histogram.record(duration)
+        self.assertEqual(histogram.count, 5)
+        self.assertEqual(histogram.counts[0], 2)
+        self.assertEqual(histogram.counts[1], 1)
+        self.assertEqual(histogram.counts[-1], 1)
+        self.assertEqual(histogram.percentile(50), 512)
+        self.assertEqual(histogram.percentile(20), 256)
+        self.assertIsNone(histogram.percentile(100))
+        self.assertIsNone(Histogram().percentile(50))
+
+    def test_commands(self):
+        """Tests recording commands, errors and room updates."""
+        entered = []
+        self.metrics.add_room_entry_hook(
+            lambda the_player, the_room: entered.append(the_room.name)
+        )
+        the_player = InstrumentedPlayer(self.the_world, self.start_room)
+        for command in ['move down', 'move down', 'mo up', 'fly', 'ls']:
+            the_player.execute(command)
+
+        commands = self.metrics.commands
+        self.assertEqual(commands['move'].calls, 3)
+        self.assertEqual(commands['move'].latency.count, 3)
+        self.assertDictEqual(commands['move'].errors,
+                             {'FailedToExecuteAction': 1})
+        self.assertDictEqual(commands[metrics.UNPARSED].errors,
+                             {'UnsupportedCommand': 1})
+        self.assertEqual(commands['ls'].calls, 1)
+        self.assertListEqual(entered, ['restaurant', 'theater'])
+        self.assertEqual(
+            self.metrics.room_updates['RestaurantRoom'].count, 1
+        )
+        self.assertEqual(self.metrics.room_updates['Room'].count, 1)
+
+        # Player classes that are not instrumented record nothing.
+        the_world, the_room = dummygame.make_the_world()
+        DummyPlayer(the_world, the_room).execute('move up')
+        self.assertEqual(commands['move'].calls, 3)
+
+    def test_game_and_exports(self):
+        """Tests recording a game and exporting the statistics."""
+        commands = iter(['move up', 'quit'])
+        the_game = Game(
+            input_reader=lambda: next(commands),
+            output_writer=lambda msg: None,
+            the_player=InstrumentedPlayer(self.the_world, self.start_room),
+            metrics=self.metrics
+        )
+        with self.assertRaises(SystemExit):
+            the_game.play()
+        self.assertEqual(self.metrics.rounds.count, 2)
+        self.assertEqual(self.metrics.games, 1)
+
+        text = self.metrics.render_text()
+        self.assertIn('zuul_command_calls_total{command="move"} 1', text)
+        self.assertIn('zuul_command_latency_seconds_bucket{command="quit",'
+                      'le="+Inf"} 1', text)
+        self.assertIn('zuul_games_total 1', text)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'metrics.json')
+            self.metrics.dump(path)
+            with open(path) as metrics_file:
+                snapshot = json.load(metrics_file)
+        self.assertEqual(snapshot['commands']['move']['calls'], 1)
+        self.assertEqual(snapshot['rounds']['count'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Tests the buffered output writers."""
+
+import os
+import socket
+import unittest
+
+import impl.dummygame as dummygame
+import impl.game as game
+import impl.output as output
+
+# Aliases.
+BufferedWriter = output.BufferedWriter
+BytesWriter = output.BytesWriter
+DummyPlayer = dummygame.DummyPlayer
+Game = game.Game
+
+
+class FakeClock:
+    """A clock advanced by hand.
+
+    :ivar float now: The current time.
+    """
+
+    def __init__(self):
+        """Initializer."""
+        self.now = 0.0
+
+    def __call__(self):
+        """Returns the current time."""
+        return self.now
+
+
+class OutputTest(unittest.TestCase):
+    """Tests the buffered output writers."""
+
+    def test_flush_policies(self):
+        """Tests flushing by size, number of messages and age."""
+        batches = []
+        clock = FakeClock()
+        writer = BufferedWriter(batches.append, max_bytes=10,
+                                max_messages=3, max_delay=1.0, clock=clock)
+        writer('a')
+        writer('b')
+        self.assertListEqual(batches, [])
+        self.assertEqual(len(writer), 2)
+        writer('c')
+        self.assertListEqual(batches, ['a\nb\nc\n'])
+
+        writer('0123456789')
+        self.assertListEqual(batches[1:], ['0123456789\n'])
+
+        writer('d')
+        clock.now = 0.5
+        writer('e')
+        self.assertEqual(len(batches), 2)
+        clock.now = 1.0
+        writer('f')
+        self.assertListEqual(batches[2:], ['d\ne\nf\n'])
+
+        writer('g')
+        writer.close()
+        self.assertListEqual(batches[3:], ['g\n'])
+        self.assertEqual(writer.writes, 4)
+        writer.flush()
+        self.assertEqual(writer.writes, 4)
+
+    def test_bytes_writer(self):
+        """Tests writing batches of bytes to a file descriptor."""
+        read_fd, write_fd = os.pipe()
+        try:
+            writer = BytesWriter(output.fd_sink(write_fd), max_messages=None,
+                                 max_delay=None)
+            writer('café')
+            writer.write_bytes(b'raw\n')
+            writer.flush()
+            self.assertEqual(os.read(read_fd, 100), 'café\nraw\n'.encode())
+        finally:
+            os.close(read_fd)
+            os.close(write_fd)
+
+        left, right = socket.socketpair()
+        with left, right:
+            writer = BytesWriter(output.socket_sink(left))
+            writer('one')
+            writer('two')
+            writer.close()
+            self.assertEqual(right.recv(100), b'one\ntwo\n')
+            self.assertEqual(writer.writes, 1)
+
+    def test_game(self):
+        """Tests flushing the output of a game."""
+        the_world, the_room = dummygame.make_the_world()
+        batches = []
+        commands = iter(['move up', 'move down', 'move right'])
+        writer = BufferedWriter(batches.append, max_delay=None)
+        the_game = Game(
+            input_reader=lambda: next(commands),
+            output_writer=writer,
+            the_player=DummyPlayer(world=the_world, start_room=the_room),
+            flush_on_input=False
+        )
+        with self.assertRaises(SystemExit):
+            the_game.play()
+        self.assertListEqual(batches, [
+            'You are now in: pub \nYou are now in: lecture theater \n'
+            'You won!\n'
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
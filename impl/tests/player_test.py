@@ -0,0 +1,121 @@
+"""Tests the Player class."""
+
+import unittest
+
+import impl.dummygame as dummygame
+import impl.exceptions as exceptions
+import impl.player as player
+
+# Aliases.
+DummyPlayer = dummygame.DummyPlayer
+FailedToExecuteAction = exceptions.FailedToExecuteAction
+ItemNotInInventory = exceptions.ItemNotInInventory
+ThePlayerQuitTheGame = exceptions.ThePlayerQuitTheGame
+ThePlayerWonTheGame = exceptions.ThePlayerWonTheGame
+UnsupportedCommand = exceptions.UnsupportedCommand
+UserCommand = player.UserCommand
+
+
+class KeyPlayer(DummyPlayer):
+    """A player with a command using the bag."""
+
+    @UserCommand
+    def unlock(self):
+        """Unlocks a door using a key."""
+        self.remove_from_bag('key')
+        return 'Unlocked.'
+
+
+class PlayerTest(unittest.TestCase):
+    """Tests the Player class."""
+
+    def setUp(self):
+        """Creates a player in the dummy world."""
+        the_world, the_room = dummygame.make_the_world()
+        self.the_player = DummyPlayer(world=the_world, start_room=the_room)
+
+    def test_execute_batch(self):
+        """Tests executing strings and pre-parsed commands."""
+        records = self.the_player.execute_batch([
+            'move up',
+            ('move', ['down']),
+            'jump',
+            ('move', ['left']),
+            'move right',
+            'where',
+        ])
+        self.assertEqual(len(records), 5)
+        self.assertEqual(records[0].output, 'You are now in: pub ')
+        self.assertIsNone(records[1].error)
+        self.assertIsInstance(records[2].error, UnsupportedCommand)
+        self.assertIsInstance(records[3].error, FailedToExecuteAction)
+        self.assertIn('move left', str(records[3].error))
+        self.assertTrue(records[4].won)
+
+    def test_goto(self):
+        """Tests going to a room through the shortest path."""
+        self.assertEqual(self.the_player.execute_user_command('goto pub'),
+                         'You are now in: pub ')
+        with self.assertRaises(FailedToExecuteAction):
+            self.the_player.execute_user_command('goto library')
+        with self.assertRaises(ThePlayerWonTheGame):
+            self.the_player.execute_user_command('goto classroom1')
+        self.assertTrue(self.the_player.has_already_visited('theater', 'pub'))
+
+    def test_visited_rooms(self):
+        """Tests tracking the visited rooms by name."""
+        self.assertTrue(self.the_player.has_already_visited('theater'))
+        self.assertFalse(self.the_player.has_already_visited('pub'))
+        self.assertFalse(self.the_player.has_already_visited('library'))
+        self.assertEqual(len(self.the_player.unvisited_neighbors()), 2)
+
+        self.the_player.execute_user_command('move up')
+        self.the_player.execute_user_command('move down')
+        self.assertTrue(self.the_player.has_already_visited('theater', 'pub'))
+        self.assertEqual(len(self.the_player.visited_rooms), 2)
+        self.assertEqual(len(self.the_player.unvisited_neighbors()), 1)
+        self.assertTrue(self.the_player.execute_user_command('where')
+                        .endswith('<lecture theater> <pub>'))
+
+    def test_bag(self):
+        """Tests collecting and consuming items."""
+        self.the_player.add_to_bag('coin', 3)
+        self.assertTrue(self.the_player.is_in_bag('coin'))
+        self.assertTrue(self.the_player.consume('coin', 2))
+        self.assertFalse(self.the_player.consume('coin', 2))
+        self.the_player.remove_from_bag('coin')
+        self.assertFalse(self.the_player.is_in_bag('coin'))
+
+        self.the_player.bag.capacity = 1
+        self.assertTrue(self.the_player.add_to_bag('coin'))
+        self.assertFalse(self.the_player.add_to_bag('coin'))
+
+    def test_execute_batch_stops(self):
+        """Tests stopping at the first error and at quit."""
+        records = self.the_player.execute_batch(
+            ['move left', 'move up'], stop_on_error=True
+        )
+        self.assertEqual(len(records), 1)
+
+        records = self.the_player.execute_batch(['quit', 'move up'])
+        self.assertEqual(len(records), 1)
+        self.assertIsInstance(records[0].error, ThePlayerQuitTheGame)
+
+    def test_domain_error(self):
+        """Tests that a ZuulException raised by a command is a result."""
+        the_world, the_room = dummygame.make_the_world()
+        the_player = KeyPlayer(world=the_world, start_room=the_room)
+        command_result = the_player.execute('unlock')
+        self.assertFalse(command_result.ok)
+        self.assertFalse(command_result.game_over)
+        self.assertIsInstance(command_result.error, ItemNotInInventory)
+
+        the_player.add_to_bag('key')
+        records = the_player.execute_batch(['unlock', 'unlock', 'where'])
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0].output, 'Unlocked.')
+        self.assertIsInstance(records[1].error, ItemNotInInventory)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+"""Tests the PlayerPool class."""
+
+import unittest
+
+import impl.exceptions as exceptions
+import impl.pool as pool
+import mentoring
+
+# Aliases.
+MentoringPlayer = mentoring.MentoringPlayer
+PlayerPool = pool.PlayerPool
+ThePlayerWonTheGame = exceptions.ThePlayerWonTheGame
+
+# Wins the mentoring game.
+_WINNING_COMMANDS = ['move down', 'move up', 'move right', 'move left',
+                     'move down', 'move left', 'move up', 'move right']
+
+
+class PlayerPoolTest(unittest.TestCase):
+    """Tests the PlayerPool class."""
+
+    def setUp(self):
+        """Creates a pool in the mentoring world."""
+        self.the_world, self.the_room = mentoring.make_the_world()
+        self.pool = PlayerPool(self.the_world, MentoringPlayer)
+
+    def test_handles(self):
+        """Tests that handles behave like players."""
+        first = self.pool.spawn(self.the_room)
+        second = self.pool.spawn(self.the_room)
+        self.assertIsInstance(first, MentoringPlayer)
+        self.assertEqual(len(self.pool), 2)
+
+        self.assertEqual(first.execute_user_command('move down'),
+                         'You are now in: restaurant ')
+        self.assertEqual(str(first.current_room), 'restaurant')
+        self.assertEqual(str(second.current_room), 'lecture theater')
+        self.assertTrue(first.is_in_bag('textbook'))
+        self.assertFalse(second.is_in_bag('textbook'))
+        self.assertTrue(first.has_already_visited('theater', 'restaurant'))
+        self.assertFalse(second.has_already_visited('restaurant'))
+        self.assertIn('<lecture theater> <restaurant>',
+                      first.execute_user_command('where'))
+
+        # The state lives in the pool, not in the handle.
+        self.assertEqual(self.pool.get_player(0), first)
+        self.assertTrue(self.pool.get_player(0).is_in_bag('textbook'))
+        self.assertEqual(self.pool.visited_counts[0], 2)
+        self.assertEqual(self.pool.item_columns['textbook'][1], 0)
+
+    def test_winning(self):
+        """Tests that the goal of the player class is tracked per agent."""
+        self.pool.spawn_many(self.the_room, 3)
+        agent = self.pool.get_player(1)
+        with self.assertRaises(ThePlayerWonTheGame):
+            for command in _WINNING_COMMANDS:
+                agent.execute_user_command(command)
+        self.assertFalse(self.pool.get_player(0).have_won())
+
+    def test_growing_world(self):
+        """Tests adding rooms after creating the agents."""
+        agent = self.pool.spawn(self.the_room)
+        for index in range(20):
+            self.the_world.add_room('extra{}'.format(index), 'extra')
+        self.the_world.connect_rooms('pub', 'extra19',
+                                     mentoring.Direction.NORTH)
+        agent.execute_user_command('move up')
+        agent.execute_user_command('move up')
+        self.assertTrue(agent.has_already_visited('pub', 'extra19',
+                                                  'theater'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""Tests the CommandResult class."""
+
+import unittest
+
+import impl.dummygame as dummygame
+import impl.exceptions as exceptions
+import impl.game as game
+import impl.player as player
+import impl.result as result
+
+# Aliases.
+CommandCannotBeExecuted = exceptions.CommandCannotBeExecuted
+CommandResult = result.CommandResult
+DummyPlayer = dummygame.DummyPlayer
+FailedToExecuteAction = exceptions.FailedToExecuteAction
+UnsupportedCommand = exceptions.UnsupportedCommand
+UserCommand = player.UserCommand
+
+
+class LegacyPlayer(DummyPlayer):
+    """A player with a command raising exceptions."""
+
+    @UserCommand
+    def jump(self):
+        """Cannot jump."""
+        raise CommandCannotBeExecuted
+
+
+class CommandResultTest(unittest.TestCase):
+    """Tests the CommandResult class."""
+
+    def setUp(self):
+        """Creates a player in the dummy world."""
+        the_world, the_room = dummygame.make_the_world()
+        self.the_player = LegacyPlayer(world=the_world, start_room=the_room)
+
+    def test_lazy_message(self):
+        """Tests rendering the message only when it is read."""
+        rendered = []
+        command_result = CommandResult(
+            result.OK, 'pub', lambda payload: rendered.append(payload) or
+            'rendered ' + payload
+        )
+        self.assertListEqual(rendered, [])
+        self.assertEqual(command_result.message, 'rendered pub')
+        self.assertEqual(str(command_result), 'rendered pub')
+        self.assertListEqual(rendered, ['pub'])
+
+    def test_execute(self):
+        """Tests the results of the built-in commands."""
+        command_result = self.the_player.execute('move down')
+        self.assertEqual(command_result.status, result.FAILED)
+        self.assertEqual(command_result.message,
+                         'Command <move down> cannot be executed.')
+        self.assertIsInstance(command_result.error, FailedToExecuteAction)
+
+        command_result = self.the_player.execute('move up')
+        self.assertTrue(command_result.ok)
+        self.assertEqual(command_result.payload.name, 'pub')
+        self.assertEqual(command_result.message, 'You are now in: pub ')
+        self.assertIsNone(command_result.error)
+
+        command_result = self.the_player.execute('fly')
+        self.assertEqual(command_result.status, result.UNSUPPORTED)
+        self.assertIsInstance(command_result.error, UnsupportedCommand)
+
+        self.assertEqual(self.the_player.execute('jump').status,
+                         result.FAILED)
+
+        command_result = self.the_player.execute(('goto', ['classroom1']))
+        self.assertTrue(command_result.won)
+        self.assertTrue(command_result.game_over)
+        self.assertEqual(command_result.message, game.WINNING_MSG)
+
+        command_result = self.the_player.execute('quit')
+        self.assertTrue(command_result.game_over)
+        self.assertIsNone(command_result.message)
+
+    def test_run_command(self):
+        """Tests running commands for a game."""
+        self.assertTupleEqual(game.run_command(self.the_player, 'move left'),
+                              ('Command <move left> cannot be executed.',
+                               False))
+        self.assertTupleEqual(game.run_command(self.the_player, 'quit'),
+                              (None, True))
+        self.assertTupleEqual(game.run_command(self.the_player, 'move right'),
+                              (game.WINNING_MSG, True))
+
+
+if __name__ == '__main__':
+    unittest.main()
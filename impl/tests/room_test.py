@@ -27,6 +27,7 @@ class RoomTest(unittest.TestCase):
         room1.add_neighbor(Direction.NORTH, room2)
 
         self.assertIsNotNone(room1.get_neighbor(Direction.NORTH))
+        self.assertDictEqual(room1.neighbors, {Direction.NORTH: room2})
         self.assertIsNone(room1.get_neighbor(Direction.SOUTH))
         self.assertIsNone(room1.get_neighbor(Direction.EAST))
         self.assertIsNone(room1.get_neighbor(Direction.WEST))
@@ -0,0 +1,93 @@
+"""Tests the Router class."""
+
+import unittest
+
+import impl.compact_world as compact_world
+import impl.routing as routing
+import impl.world as world
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+Direction = world.Direction
+World = world.World
+
+
+class RouterTest(unittest.TestCase):
+    """Tests the Router class."""
+
+    def make_world(self, world_class):
+        """Makes a line of rooms a - b - c - d going east.
+
+        :param type world_class: The class of the world to make.
+        :rtype: World.
+        """
+        the_world = world_class()
+        for name in 'abcd':
+            the_world.add_room(name, name)
+        the_world.connect_rooms('a', 'b', Direction.EAST)
+        the_world.connect_rooms('b', 'c', Direction.EAST)
+        the_world.connect_rooms('c', 'd', Direction.EAST)
+        return the_world
+
+    def check_routing(self, world_class):
+        """Checks finding paths and invalidating them.
+
+        :param type world_class: The class of the world to check.
+        """
+        the_world = self.make_world(world_class)
+        router = the_world.router
+        a, b, c, d = [the_world.get_room(name) for name in 'abcd']
+
+        self.assertListEqual(router.find_path(a, d), [Direction.EAST] * 3)
+        self.assertListEqual(router.find_path(d, b), [Direction.WEST] * 2)
+        self.assertListEqual(router.find_path(a, a), [])
+
+        # A one way shortcut drops the tree of a but keeps the tree of d.
+        tree_of_d = router.get_tree(d)
+        a.add_neighbor(Direction.NORTH, d)
+        self.assertIs(router.get_tree(d), tree_of_d)
+        self.assertListEqual(router.find_path(a, d), [Direction.NORTH])
+
+        # Removing an exit drops only the trees using it.
+        tree_of_a = router.get_tree(a)
+        c.remove_neighbor(Direction.WEST)
+        self.assertIs(router.get_tree(a), tree_of_a)
+        self.assertIsNone(router.find_path(d, b))
+        self.assertEqual(router.get_distance(a, c), 2)
+
+    def test_world(self):
+        """Tests routing in a World."""
+        self.check_routing(World)
+
+    def test_compact_world(self):
+        """Tests routing in a CompactWorld."""
+        self.check_routing(CompactWorld)
+
+    def test_bounded_cache(self):
+        """Tests bounding the cache by the rooms of all its trees."""
+        the_world = self.make_world(World)
+        the_world.add_room('e', 'e')
+        router = routing.Router(max_entries=8)
+        a, b, _, d, e = [the_world.get_room(name) for name in 'abcde']
+        tree_of_a = router.get_tree(a)
+        tree_of_e = router.get_tree(e)
+        self.assertIs(router.get_tree(a), tree_of_a)
+        self.assertEqual(router._entries, 5)
+
+        # The tree of b does not fit with both, so the tree of e goes.
+        router.get_tree(b)
+        self.assertIs(router.get_tree(a), tree_of_a)
+        self.assertIsNot(router.get_tree(e), tree_of_e)
+        self.assertEqual(router._entries, 5)
+
+        # A tree larger than the bound is kept on its own.
+        router = routing.Router(max_entries=2)
+        router.get_tree(a)
+        self.assertListEqual(router.find_path(a, d), [Direction.EAST] * 3)
+        self.assertEqual(router._entries, 4)
+        router.clear()
+        self.assertEqual(router._entries, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
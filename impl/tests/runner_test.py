@@ -0,0 +1,86 @@
+"""Tests the headless runner of scripts."""
+
+import json
+import os
+import tempfile
+import unittest
+
+import impl.runner as runner
+
+# The path of the world factory and of the player class of the scripts.
+WORLD_FACTORY = 'mentoring.make_the_world'
+PLAYER_CLASS = 'mentoring.MentoringPlayer'
+
+SCRIPTS = {
+    'win.txt': '# Wins the game.\nmove right\nmove left\nmove down\n\n'
+               'move left\nmove up\nmove right\nmove left\n',
+    'lose.txt': 'move up\nmove up\nfly\n',
+    'quit.txt': 'move down\nquit\nmove up\n',
+    'notes.md': 'move down\n',
+}
+
+
+class RunnerTest(unittest.TestCase):
+    """Tests the headless runner of scripts."""
+
+    def setUp(self):
+        """Writes the scripts."""
+        self.directory = tempfile.TemporaryDirectory()
+        for name, script in SCRIPTS.items():
+            with open(os.path.join(self.directory.name, name), 'w') as stream:
+                stream.write(script)
+        self.paths = runner.find_scripts(self.directory.name)
+
+    def tearDown(self):
+        """Removes the scripts."""
+        self.directory.cleanup()
+
+    def assert_report(self, report):
+        """Checks the report of the scripts.
+
+        :param RunReport report: The report.
+        """
+        results = {os.path.basename(script_result.script): script_result
+                   for script_result in report.results}
+        self.assertListEqual(sorted(results),
+                             ['lose.txt', 'quit.txt', 'win.txt'])
+        self.assertTrue(results['win.txt'].won)
+        self.assertEqual(results['win.txt'].steps, 6)
+        self.assertEqual(results['win.txt'].final_room, 'exam_room')
+        self.assertFalse(results['lose.txt'].won)
+        self.assertEqual(results['lose.txt'].errors, 2)
+        self.assertEqual(results['lose.txt'].final_room, 'pub')
+        self.assertTrue(results['quit.txt'].quit)
+        self.assertEqual(results['quit.txt'].steps, 2)
+        self.assertEqual(report.wins, 1)
+        self.assertEqual(report.steps, 11)
+        self.assertListEqual(report.crashes, [])
+        summary = json.loads(json.dumps(report.to_dict()))
+        self.assertEqual(summary['losses'], 2)
+
+    def test_in_process(self):
+        """Tests playing the scripts in this process."""
+        self.assert_report(runner.run_scripts(WORLD_FACTORY, PLAYER_CLASS,
+                                              self.paths, processes=1))
+
+    def test_process_pool(self):
+        """Tests sharding the scripts across processes."""
+        report = runner.run_scripts(WORLD_FACTORY, PLAYER_CLASS,
+                                    self.paths * 4, processes=2,
+                                    chunk_size=2)
+        self.assertEqual(len(report), 12)
+        self.assertListEqual([script_result.script
+                              for script_result in report.results],
+                             self.paths * 4)
+        self.assertEqual(report.wins, 4)
+
+    def test_crash(self):
+        """Tests reporting a script that raised an exception."""
+        report = runner.run_scripts(WORLD_FACTORY, 'impl.player.Player',
+                                    self.paths, processes=1)
+        self.assertEqual(len(report.crashes), 3)
+        self.assertIn('NotImplementedError', report.crashes[0].crash)
+
+
+if __name__ == '__main__':
+    unittest.main()
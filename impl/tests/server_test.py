@@ -0,0 +1,100 @@
+"""Tests the asyncio game server."""
+
+import asyncio
+import unittest
+
+import impl.game as game
+import impl.player as player
+import impl.server as server
+import mentoring
+
+# Aliases.
+GameClient = server.GameClient
+GameServer = server.GameServer
+MentoringPlayer = mentoring.MentoringPlayer
+UserCommand = player.UserCommand
+
+
+class BrokenPlayer(MentoringPlayer):
+    """A player with a command failing unexpectedly."""
+
+    @UserCommand
+    def crash(self):
+        """Fails with a ValueError."""
+        raise ValueError('crash')
+
+
+class GameServerTest(unittest.TestCase):
+    """Tests the asyncio game server."""
+
+    def run_with_server(self, session, player_class=MentoringPlayer):
+        """Runs a coroutine against a running server.
+
+        :param callable session: Receives the server and returns a
+        coroutine to run.
+
+        :param type player_class: The Player derived class of the sessions.
+        """
+        async def run():
+            """Starts the server, runs the session and stops the server."""
+            the_world, the_room = mentoring.make_the_world()
+            the_server = await GameServer(
+                the_world, player_class, the_room
+            ).start()
+            try:
+                return await session(the_server)
+            finally:
+                await the_server.stop()
+
+        return asyncio.run(run())
+
+    def test_concurrent_sessions(self):
+        """Tests that sessions are independent and end without exiting."""
+        winning = ['move right', 'move left', 'move down', 'move left',
+                   'move up', 'move right']
+
+        async def play(the_server, commands):
+            """Plays a list of commands returning the responses."""
+            client = await GameClient.connect('127.0.0.1', the_server.port)
+            responses = [await client.send(command) for command in commands]
+            responses.append(await client.send('where'))
+            await client.close()
+            return responses
+
+        async def session(the_server):
+            """Plays a winning and a quitting session concurrently."""
+            return await asyncio.gather(
+                play(the_server, winning),
+                play(the_server, ['ls', 'move nowhere', 'quit']),
+            )
+
+        won, quit = self.run_with_server(session)
+        self.assertEqual(won[-2], game.WINNING_MSG)
+        self.assertIsNone(won[-1])
+        self.assertIn('Available commands', quit[0])
+        self.assertIn('cannot be executed', quit[1])
+        self.assertEqual(quit[2], '')
+        self.assertIsNone(quit[-1])
+
+    def test_failing_command(self):
+        """Tests that an unexpected error is answered and logged."""
+        async def session(the_server):
+            """Sends a failing command."""
+            client = await GameClient.connect('127.0.0.1', the_server.port)
+            responses = [await client.send('crash'),
+                         await client.send('ls')]
+            await client.close()
+            return responses
+
+        with self.assertLogs('impl.server') as logs:
+            responses = self.run_with_server(session, BrokenPlayer)
+        self.assertListEqual(responses, [server.INTERNAL_ERROR_MSG, None])
+        self.assertIn('ValueError: crash', logs.output[0])
+
+    def test_encode_response(self):
+        """Tests escaping lines that start with a dot."""
+        self.assertEqual(server.encode_response('a\n.b'), b'a\n..b\n.\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+"""Tests the Monte Carlo simulator."""
+
+import unittest
+
+import impl.compact_world as compact_world
+import impl.dummygame as dummygame
+import impl.goals as goals
+import impl.player as player
+import impl.simulation as simulation
+import mentoring
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+Direction = compact_world.Direction
+Player = player.Player
+
+
+class BookPlayer(Player):
+    """A player who wins once it holds a textbook."""
+
+    goal = goals.has_item('textbook')
+
+
+@unittest.skipIf(simulation.numpy is None, "NumPy is not installed.")
+class SimulationTest(unittest.TestCase):
+    """Tests the Monte Carlo simulator."""
+
+    def test_export_adjacency(self):
+        """Tests exporting the adjacency of both kinds of world."""
+        for the_world in (dummygame.World(), CompactWorld()):
+            the_world.add_room('a', 'a')
+            the_world.add_room('b', 'b')
+            the_world.connect_rooms('a', 'b', Direction.EAST)
+            adjacency = simulation.export_adjacency(the_world)
+            self.assertListEqual(adjacency.tolist(),
+                                 [[-1, -1, -1, 1], [-1, -1, 0, -1]])
+
+    def test_probe_effects(self):
+        """Tests finding the items added by the rooms."""
+        the_world, _ = mentoring.make_the_world()
+        items, effects = simulation.probe_effects(the_world)
+        self.assertListEqual(items, ['textbook'])
+        restaurant = the_world.get_room_id('restaurant')
+        self.assertEqual(effects[restaurant, 0], 1)
+        self.assertEqual(effects.sum(), 1)
+
+    def test_goal(self):
+        """Tests simulating a player class with a goal."""
+        the_world, the_room = mentoring.make_the_world()
+        report = simulation.simulate(
+            the_world, the_room, mentoring.MentoringPlayer, agents=500,
+            max_steps=500, seed=1
+        )
+        self.assertGreater(report.win_rate, 0.9)
+        # The shortest winning walk needs 6 moves.
+        self.assertGreaterEqual(report.steps_to_win.min(), 6)
+        frequencies = report.visit_frequencies(the_world)
+        self.assertAlmostEqual(sum(frequencies.values()), 1.0)
+        self.assertGreater(report.dead_end_rate, 0)
+
+        greedy = simulation.simulate(
+            the_world, the_room, mentoring.MentoringPlayer, agents=500,
+            max_steps=500, policy=simulation.GREEDY, seed=1
+        )
+        self.assertLess(greedy.percentile(50), report.percentile(50))
+
+    def test_have_won(self):
+        """Tests simulating a player class overriding have_won."""
+        the_world, the_room = dummygame.make_the_world()
+        report = simulation.simulate(
+            the_world, the_room, dummygame.DummyPlayer, agents=200,
+            max_steps=100, seed=2
+        )
+        self.assertEqual(report.win_rate, 1.0)
+        self.assertEqual(report.steps_to_win.min(), 1)
+        self.assertEqual(report.stuck_agents, 0)
+
+    def test_effect_start_room(self):
+        """Tests that the hooks of the start room do not run."""
+        the_world = dummygame.World()
+        the_world.add_room('restaurant', 'restaurant',
+                           mentoring.RestaurantRoom)
+        the_world.add_room('pub', 'pub')
+        the_world.connect_rooms('restaurant', 'pub', Direction.EAST)
+        report = simulation.simulate(the_world, 'restaurant', BookPlayer,
+                                     agents=50, max_steps=10, seed=3)
+        # The textbook is added when the player comes back.
+        self.assertEqual(report.win_rate, 1.0)
+        self.assertEqual(report.steps_to_win.min(), 2)
+        self.assertEqual(report.steps_to_win.max(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Tests the binary world snapshots."""
+
+import os
+import tempfile
+import unittest
+
+import impl.compact_world as compact_world
+import impl.exceptions as exceptions
+import impl.snapshot as snapshot
+import mentoring
+
+# Aliases.
+CompactWorld = compact_world.CompactWorld
+Direction = compact_world.Direction
+InvalidSnapshot = exceptions.InvalidSnapshot
+RoomDoesNotExist = exceptions.RoomDoesNotExist
+World = mentoring.World
+WorldIsReadOnly = exceptions.WorldIsReadOnly
+
+
+class SnapshotTest(unittest.TestCase):
+    """Tests the binary world snapshots."""
+
+    def setUp(self):
+        """Creates the path of the snapshot file."""
+        handle, self.path = tempfile.mkstemp(suffix='.zuu')
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+
+    def test_save_and_open(self):
+        """Tests a round trip of the mentoring world."""
+        the_world, start_room = mentoring.make_the_world()
+        the_world.save_snapshot(self.path)
+
+        snapshot_world = World.open_snapshot(self.path)
+        self.assertEqual(len(snapshot_world), len(the_world))
+        self.assertListEqual(sorted(snapshot_world), sorted(the_world))
+        self.assertIn('exam_room', snapshot_world)
+        self.assertNotIn('library', snapshot_world)
+
+        for name in the_world:
+            original = the_world.get_room(name)
+            restored = snapshot_world.get_room(name)
+            self.assertEqual(str(restored), str(original))
+            self.assertIs(type(original), snapshot_world.get_room_class(
+                restored.room_id
+            ))
+            self.assertDictEqual(
+                {direction: str(neighbor) for direction, neighbor
+                 in restored.neighbors.items()},
+                {direction: str(neighbor) for direction, neighbor
+                 in original.neighbors.items()},
+            )
+        self.assertIsInstance(snapshot_world.get_room('restaurant'),
+                              mentoring.RestaurantRoom)
+
+        with self.assertRaises(RoomDoesNotExist):
+            snapshot_world.get_room('library')
+
+        # The snapshot can be played.
+        the_player = mentoring.MentoringPlayer(world=snapshot_world,
+                                               start_room=start_room)
+        the_player.execute_user_command('move down')
+        self.assertTrue(the_player.is_in_bag('textbook'))
+
+    def test_compact_world_round_trip(self):
+        """Tests saving a CompactWorld and changing the opened snapshot."""
+        the_world = CompactWorld()
+        the_world.add_room('a', "room a")
+        the_world.add_room('b', "room b")
+        the_world.connect_rooms('a', 'b', Direction.EAST)
+        the_world.save_snapshot(self.path)
+
+        snapshot_world = CompactWorld.open_snapshot(self.path)
+        room_a = snapshot_world.get_room('a')
+        self.assertIs(room_a.get_neighbor(Direction.EAST),
+                      snapshot_world.get_room('b'))
+
+        room_a.remove_neighbor(Direction.EAST)
+        self.assertIsNone(room_a.get_neighbor(Direction.EAST))
+        # The changes are private to the process.
+        self.assertIsNotNone(
+            CompactWorld.open_snapshot(self.path).get_room('a')
+            .get_neighbor(Direction.EAST)
+        )
+
+        with self.assertRaises(WorldIsReadOnly):
+            snapshot_world.add_room('c', "room c")
+
+    def test_invalid_snapshot(self):
+        """Tests opening a file that is not a snapshot."""
+        with open(self.path, 'wb') as stream:
+            stream.write(b'not a snapshot' * 10)
+        with self.assertRaises(InvalidSnapshot):
+            snapshot.SnapshotWorld(self.path)
+        for data in [b'', b'short']:
+            with open(self.path, 'wb') as stream:
+                stream.write(data)
+            with self.assertRaises(InvalidSnapshot):
+                snapshot.SnapshotWorld(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests the Solver class."""
+
+import unittest
+
+import impl.dummygame as dummygame
+import impl.exceptions as exceptions
+import impl.goals as goals
+import impl.player as player
+import impl.room as room
+import impl.solver as solver
+import impl.world as world
+import mentoring
+
+# Aliases.
+Direction = world.Direction
+DummyPlayer = dummygame.DummyPlayer
+has_item = goals.has_item
+MentoringPlayer = mentoring.MentoringPlayer
+Player = player.Player
+Room = room.Room
+Solver = solver.Solver
+SolverLimitReached = exceptions.SolverLimitReached
+
+
+class VaultRoom(Room):
+    """A room giving a key when entered."""
+
+    def on_enter(self, the_player):
+        """Gives a key.
+
+        :param Player the_player: The player.
+        """
+        the_player.add_to_bag('key')
+
+
+class KeyPlayer(Player):
+    """A player winning with a key."""
+
+    goal = has_item('key')
+
+
+class SolverTest(unittest.TestCase):
+    """Tests the Solver class."""
+
+    def test_solves_a_goal(self):
+        """Tests solving a player class with a goal."""
+        the_world, start_room = mentoring.make_the_world()
+        the_solver = Solver(the_world, MentoringPlayer)
+        solution = the_solver.solve(start_room)
+        self.assertEqual(solution.length, 6)
+        self.assertEqual(len(solution.moves), 6)
+
+        breadth_first = the_solver.solve(start_room, use_heuristic=False)
+        self.assertEqual(breadth_first.length, solution.length)
+        self.assertLessEqual(solution.explored, breadth_first.explored)
+
+        the_player = MentoringPlayer(the_world, start_room)
+        records = the_player.execute_batch(the_solver.get_commands(solution))
+        self.assertTrue(records[-1].won)
+        self.assertEqual(len(records), 6)
+
+    def test_solves_have_won(self):
+        """Tests solving a player class overriding have_won."""
+        the_world, start_room = dummygame.make_the_world()
+        solution = solver.solve(the_world, start_room, DummyPlayer)
+        self.assertListEqual(solution.moves, [Direction.EAST])
+
+    def test_unwinnable(self):
+        """Tests a world that cannot be won."""
+        the_world, start_room = dummygame.make_the_world()
+        the_world.get_room('theater').remove_neighbor(Direction.EAST)
+        self.assertIsNone(solver.solve(the_world, start_room, DummyPlayer))
+
+        the_world, start_room = mentoring.make_the_world()
+        the_world.get_room('engineering_reception').remove_neighbor(
+            Direction.EAST
+        )
+        self.assertIsNone(
+            solver.solve(the_world, start_room, MentoringPlayer)
+        )
+
+    def test_max_states(self):
+        """Tests giving up after exploring too many states."""
+        the_world, start_room = mentoring.make_the_world()
+        with self.assertRaises(SolverLimitReached):
+            solver.solve(the_world, start_room, MentoringPlayer,
+                         use_heuristic=False, max_states=3)
+
+    def test_on_enter_effects(self):
+        """Tests the effects of the rooms overriding on_enter."""
+        the_world = world.World()
+        the_world.add_room('hall', 'hall')
+        the_world.add_room('vault', 'vault', VaultRoom)
+        the_world.connect_rooms('hall', 'vault', Direction.EAST)
+        solution = solver.solve(the_world, 'hall', KeyPlayer)
+        self.assertListEqual(solution.moves, [Direction.EAST])
+
+
+if __name__ == '__main__':
+    unittest.main()
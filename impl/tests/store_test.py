@@ -0,0 +1,133 @@
+"""Tests the SessionStore class."""
+
+import os
+import tempfile
+import unittest
+
+import impl.dummygame as dummygame
+import impl.game as game
+import impl.store as store
+import mentoring
+
+# Aliases.
+Game = game.Game
+MentoringPlayer = mentoring.MentoringPlayer
+SessionStore = store.SessionStore
+
+
+class SessionStoreTest(unittest.TestCase):
+    """Tests the SessionStore class."""
+
+    def setUp(self):
+        """Creates a database."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'sessions.db')
+        self.the_world, self.start_room = mentoring.make_the_world()
+
+    def tearDown(self):
+        """Removes the database."""
+        self.directory.cleanup()
+
+    def make_store(self, **kwargs):
+        """Opens the store.
+
+        :param kwargs: The options of the store.
+        :rtype: SessionStore.
+        """
+        return SessionStore(self.path, self.the_world, MentoringPlayer,
+                            self.start_room, **kwargs)
+
+    def test_write_behind(self):
+        """Tests batching writes and hydrating sessions."""
+        the_store = self.make_store(capacity=2, batch_size=100)
+        alice = the_store.get('alice')
+        alice.execute_user_command('move down')
+        self.assertIs(the_store.get('alice'), alice)
+        self.assertEqual(the_store.writes, 0)
+
+        # Evicting alice keeps her state until the batch is written.
+        the_store.get('bob').execute_user_command('move up')
+        the_store.get('carol')
+        self.assertNotIn('alice', the_store)
+        self.assertEqual(len(the_store), 2)
+        self.assertEqual(the_store.writes, 0)
+        alice = the_store.get('alice')
+        self.assertEqual(alice.current_room.name, 'restaurant')
+        self.assertTrue(alice.is_in_bag('textbook'))
+
+        the_store.close()
+        self.assertEqual(the_store.writes, 1)
+
+        the_store = self.make_store()
+        self.assertEqual(len(the_store), 0)
+        alice = the_store.get('alice')
+        self.assertEqual(alice.current_room.name, 'restaurant')
+        self.assertTrue(alice.is_in_bag('textbook'))
+        self.assertTrue(alice.has_already_visited('theater', 'restaurant'))
+        self.assertEqual(the_store.get('bob').current_room.name, 'pub')
+        the_store.close()
+
+    def test_batches(self):
+        """Tests writing a batch once enough sessions are dirty."""
+        the_store = self.make_store(batch_size=3)
+        for name in ['a', 'b']:
+            the_store.get(name)
+        self.assertEqual(the_store.writes, 0)
+        the_store.get('c')
+        the_store.get('a').execute_user_command('move up')
+        self.assertEqual(the_store.writes, 0)
+        the_store.get('b').execute_user_command('move up')
+        the_store.get('c').execute_user_command('move up')
+        self.assertEqual(the_store.writes, 1)
+        the_store.flush()
+        self.assertEqual(the_store.writes, 1)
+
+        the_store.delete('a')
+        the_store.close()
+        the_store = self.make_store()
+        self.assertEqual(the_store.get('a').current_room.name, 'theater')
+        self.assertEqual(the_store.get('b').current_room.name, 'pub')
+        the_store.close()
+
+    def test_game_end(self):
+        """Tests ending a session when its game ends."""
+        the_store = self.make_store()
+        commands = iter(['move up', 'quit'])
+        the_game = Game(input_reader=lambda: next(commands),
+                        output_writer=lambda msg: None,
+                        the_player=the_store.get('alice'))
+        the_store.bind_game(the_game, 'alice')
+        with self.assertRaises(SystemExit):
+            the_game.play()
+        self.assertNotIn('alice', the_store)
+        self.assertEqual(the_store.writes, 1)
+        self.assertEqual(the_store.get('alice').current_room.name, 'pub')
+        the_store.close()
+
+    def test_live_sessions_are_not_evicted(self):
+        """Tests that the sessions bound to a game stay cached."""
+        the_store = self.make_store(capacity=1, batch_size=100)
+        alice = the_store.get('alice')
+        the_game = Game(input_reader=lambda: 'quit',
+                        output_writer=lambda msg: None,
+                        the_player=alice)
+        the_store.bind_game(the_game, 'alice')
+        the_store.get('bob')
+        the_store.get('carol')
+        self.assertIn('alice', the_store)
+        self.assertNotIn('bob', the_store)
+        self.assertEqual(len(the_store), 2)
+
+        alice.execute_user_command('move down')
+        self.assertIs(the_store.get('alice'), alice)
+        the_store.end_session('alice')
+        self.assertNotIn('alice', the_store)
+        alice = the_store.get('alice')
+        self.assertEqual(alice.current_room.name, 'restaurant')
+        self.assertNotIn('carol', the_store)
+        the_store.close()
+
+
+
+if __name__ == '__main__':
+    unittest.main()
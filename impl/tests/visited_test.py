@@ -0,0 +1,77 @@
+"""Tests the VisitedRooms class."""
+
+import types
+import unittest
+
+import impl.visited as visited
+import impl.world as world
+
+# Aliases.
+Direction = world.Direction
+VisitedRooms = visited.VisitedRooms
+World = world.World
+
+
+class VisitedRoomsTest(unittest.TestCase):
+    """Tests the VisitedRooms class."""
+
+    def setUp(self):
+        """Creates a world of many rooms."""
+        self.the_world = World()
+        for index in range(100):
+            self.the_world.add_room('room{}'.format(index),
+                                    'description{}'.format(index))
+        self.the_world.connect_rooms('room0', 'room1', Direction.NORTH)
+        self.the_world.connect_rooms('room0', 'room99', Direction.SOUTH)
+
+    def test_add(self):
+        """Tests marking rooms as visited."""
+        rooms = VisitedRooms(self.the_world)
+        room99 = self.the_world.get_room('room99')
+        self.assertTrue(rooms.add(room99))
+        self.assertFalse(rooms.add(room99))
+        self.assertTrue(rooms.add(self.the_world.get_room('room3')))
+        self.assertEqual(len(rooms), 2)
+        self.assertIn(99, rooms)
+        self.assertNotIn(98, rooms)
+        self.assertNotIn(1000, rooms)
+        self.assertListEqual(list(rooms), [99, 3])
+        self.assertTrue(rooms.contains_all([3, 99]))
+        self.assertFalse(rooms.contains_all([3, 4]))
+
+    def test_unvisited_neighbors(self):
+        """Tests finding the unvisited neighbors."""
+        rooms = VisitedRooms(self.the_world)
+        room0 = self.the_world.get_room('room0')
+        rooms.add(room0)
+        rooms.add(self.the_world.get_room('room1'))
+        self.assertDictEqual(rooms.unvisited_neighbors(room0), {
+            Direction.SOUTH: self.the_world.get_room('room99')
+        })
+
+    def test_render(self):
+        """Tests rendering the visited rooms incrementally."""
+        rooms = VisitedRooms(self.the_world)
+        self.assertEqual(rooms.render(), '')
+        rooms.add(self.the_world.get_room('room5'))
+        self.assertEqual(rooms.render(), '<description5>')
+        rooms.add(self.the_world.get_room('room2'))
+        self.assertEqual(rooms.render(), '<description5> <description2>')
+
+    def test_sparse_ids(self):
+        """Tests moving sparse ids from the bitset to a set."""
+        rooms = VisitedRooms(self.the_world)
+        rooms.add(self.the_world.get_room('room3'))
+        far_room = types.SimpleNamespace(room_id=10 ** 9)
+        self.assertTrue(rooms.add(far_room))
+        self.assertFalse(rooms.add(far_room))
+        self.assertEqual(len(rooms._bits), 0)
+        self.assertSetEqual(rooms._sparse, {3, 10 ** 9})
+        self.assertIn(10 ** 9, rooms)
+        self.assertIn(3, rooms)
+        self.assertNotIn(4, rooms)
+        self.assertListEqual(list(rooms), [3, 10 ** 9])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -41,7 +41,26 @@ class WorldTest(unittest.TestCase):
 
         self.assertIs(theater, pub.get_neighbor(Direction.SOUTH))
         self.assertIs(pub, theater.get_neighbor(Direction.NORTH))
-        
+
+    def test_bulk_build(self):
+        """Tests adding and connecting rooms in bulk."""
+        the_world = World()
+        the_world.add_rooms([
+            ('theater', "in a lecture theater", None),
+            ('pub', "in the campus pub", None),
+        ])
+        the_world.connect_many([('theater', 'pub', Direction.NORTH)])
+        self.assertEqual(len(the_world), 2)
+        self.assertIs(
+            the_world.get_room('theater').get_neighbor(Direction.NORTH),
+            the_world.get_room('pub')
+        )
+
+        with self.assertRaises(world.RoomAlreadyExists):
+            the_world.add_rooms([('library', "library", None),
+                                 ('pub', "pub", None)])
+        self.assertNotIn('library', the_world)
+
 
 if __name__ == '__main__':
     unittest.main()
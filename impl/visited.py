@@ -0,0 +1,141 @@
+"""Implements the VisitedRooms class tracking the rooms a player visited."""
+
+import array
+
+# The size in bytes up to which the bitset always grows.
+DENSE_MIN_BYTES = 4096
+
+# The number of bytes of bitset per visited room past which the ids are
+# kept in a set instead.
+DENSE_BYTES_PER_ROOM = 8
+
+
+class VisitedRooms:
+    """A set of visited rooms backed by a bitset of room ids.
+
+    Every room of a world has a stable id, so a player needs a single bit
+    per room of the world.  When the ids are sparse (like the ids of an
+    infinite LazyWorld grid, which grow with the square of the distance)
+    the bitset would outgrow the rooms visited, so once it would take more
+    than DENSE_BYTES_PER_ROOM bytes per visited room the ids are moved to a
+    set.  The descriptions of the visited rooms are rendered incrementally:
+    only the rooms visited since the last rendering are formatted.
+
+    :ivar World _world: The world of the rooms.
+    :ivar bytearray _bits: One bit per room id.
+    :ivar set _sparse: The ids of the visited rooms once they are too sparse
+    for the bitset, or None.
+    :ivar array _order: The ids of the visited rooms in the order of visit.
+    :ivar int _rendered_count: The number of rooms already rendered.
+    :ivar str _rendered: The rendering of the visited rooms.
+    """
+
+    __slots__ = ('_world', '_bits', '_sparse', '_order', '_rendered_count',
+                 '_rendered')
+
+    def __init__(self, world):
+        """Initializer.
+
+        :param World world: The world of the rooms.
+        """
+        self._world = world
+        self._bits = bytearray()
+        self._sparse = None
+        self._order = array.array('q')
+        self._rendered_count = 0
+        self._rendered = ''
+
+    def __len__(self):
+        """Returns the number of visited rooms."""
+        return len(self._order)
+
+    def __contains__(self, room_id):
+        """Checks if a room was visited.
+
+        :param int room_id: The id of the room.
+        :rtype: bool.
+        """
+        if self._sparse is not None:
+            return room_id in self._sparse
+        index = room_id >> 3
+        return index < len(self._bits) and \
+            bool(self._bits[index] & (1 << (room_id & 7)))
+
+    def __iter__(self):
+        """Iterates over the ids of the visited rooms in the order of visit."""
+        return iter(self._order)
+
+    def add(self, the_room):
+        """Marks a room as visited.
+
+        :param Room the_room: The visited room.
+
+        :return: True if the room was not visited before.
+        :rtype: bool.
+        """
+        room_id = the_room.room_id
+        sparse = self._sparse
+        if sparse is not None:
+            if room_id in sparse:
+                return False
+            sparse.add(room_id)
+            self._order.append(room_id)
+            return True
+        index = room_id >> 3
+        bits = self._bits
+        if index >= len(bits):
+            if index >= max(DENSE_MIN_BYTES,
+                            DENSE_BYTES_PER_ROOM * (len(self._order) + 1)):
+                self._sparse = set(self._order)
+                self._bits = bytearray()
+                return self.add(the_room)
+            bits.extend(bytes(index + 1 - len(bits)))
+        mask = 1 << (room_id & 7)
+        if bits[index] & mask:
+            return False
+        bits[index] |= mask
+        self._order.append(room_id)
+        return True
+
+    def contains_all(self, room_ids):
+        """Checks if all the rooms were visited.
+
+        :param iterable room_ids: The ids of the rooms.
+        :rtype: bool.
+        """
+        for room_id in room_ids:
+            if room_id not in self:
+                return False
+        return True
+
+    def unvisited_neighbors(self, the_room):
+        """Returns the neighbors of a room that were not visited.
+
+        :param Room the_room: The room.
+
+        :return: The unvisited neighbors by direction.
+        :rtype: dict.
+        """
+        return {
+            direction: neighbor
+            for direction, neighbor in the_room.neighbors.items()
+            if neighbor.room_id not in self
+        }
+
+    def render(self):
+        """Renders the descriptions of the visited rooms.
+
+        :return: The descriptions of the visited rooms in the order of
+        their first visit, like "<pub> <restaurant>".
+        :rtype: str.
+        """
+        if self._rendered_count < len(self._order):
+            get_room_by_id = self._world.get_room_by_id
+            rendered = ' '.join(
+                '<{}>'.format(str(get_room_by_id(room_id)))
+                for room_id in self._order[self._rendered_count:]
+            )
+            self._rendered = '{} {}'.format(self._rendered, rendered) \
+                if self._rendered else rendered
+            self._rendered_count = len(self._order)
+        return self._rendered
@@ -1,18 +1,73 @@
 """Implements a world consisting of rooms."""
 
+import impl.directions as directions
+import impl.events as events
 import impl.exceptions as exceptions
 import impl.room as room
+import impl.routing as routing
 
 # Aliases.
 Direction = room.Direction
+FOUR_WAY = directions.FOUR_WAY
 Room = room.Room
 RoomAlreadyExists = exceptions.RoomAlreadyExists
 RoomDoesNotExist = exceptions.RoomDoesNotExist
+RoomEvents = events.RoomEvents
+UnsupportedDirection = exceptions.UnsupportedDirection
 
 
 class World:
-    def __init__(self):
+    def __init__(self, directions=FOUR_WAY):
+        """Initializer.
+
+        :param DirectionTable directions: The directions the rooms can be
+        connected in.
+        """
+        self.directions = directions
         self._rooms = {}
+        self._room_list = []
+        self._graph_listeners = []
+        self._router = None
+        self.events = RoomEvents()
+        self._analysis = None
+
+    def __len__(self):
+        """Returns the number of rooms."""
+        return len(self._rooms)
+
+    def __contains__(self, name):
+        """Checks if a room exists.
+
+        :param str name: The name of the room.
+        """
+        return name in self._rooms
+
+    def __iter__(self):
+        """Iterates over the room names."""
+        return iter(self._rooms)
+
+    def save_snapshot(self, path):
+        """Saves the world in a binary snapshot file.
+
+        :param str path: The path of the snapshot file.
+        """
+        import impl.snapshot as snapshot
+        snapshot.save_snapshot(self, path)
+
+    @staticmethod
+    def open_snapshot(path):
+        """Opens a world from a binary snapshot file.
+
+        The returned world shares the memory mapped file with any other
+        process that opens it and decodes its rooms lazily.
+
+        :param str path: The path of the snapshot file.
+
+        :return: The world backed by the memory mapped snapshot.
+        :rtype: SnapshotWorld.
+        """
+        import impl.snapshot as snapshot
+        return snapshot.SnapshotWorld(path)
 
     def add_room(self, name, description, room_class=None):
         """Adds a room.
@@ -30,7 +85,33 @@ class World:
                 "Room {} already exists.".format(name)
             )
         room_class = room_class or Room
-        self._rooms[name] = room_class(description)
+        the_room = room_class(description)
+        the_room.bind_world(self, name, len(self._room_list))
+        self._rooms[name] = the_room
+        self._room_list.append(the_room)
+
+    def add_rooms(self, rooms):
+        """Adds many rooms at once.
+
+        None of the rooms is added if any of them already exists.
+
+        :param iterable rooms: Tuples of name, description and room class
+        (which can be None).
+
+        :raises: RoomAlreadyExists.
+        """
+        new_rooms = {}
+        next_id = len(self._room_list)
+        for name, description, room_class in rooms:
+            if name in self._rooms or name in new_rooms:
+                raise RoomAlreadyExists(
+                    "Room {} already exists.".format(name)
+                )
+            the_room = (room_class or Room)(description)
+            the_room.bind_world(self, name, next_id + len(new_rooms))
+            new_rooms[name] = the_room
+        self._rooms.update(new_rooms)
+        self._room_list.extend(new_rooms.values())
 
     def get_room(self, name):
         """Gets a room by its name.
@@ -47,6 +128,28 @@ class World:
         except KeyError:
             raise RoomDoesNotExist("Room {} does not exist.".format(name))
 
+    def get_room_id(self, name):
+        """Gets the id of a room by its name.
+
+        :param str name: The name of the room.
+
+        :returns: The id of the room.
+        :rtype: int.
+
+        :raises: RoomDoesNotExist.
+        """
+        return self.get_room(name).room_id
+
+    def get_room_by_id(self, room_id):
+        """Gets a room by its id.
+
+        :param int room_id: The id of the room.
+
+        :returns: The room.
+        :rtype: Room.
+        """
+        return self._room_list[room_id]
+
     def connect_rooms(self, room_name_1, room_name_2, direction):
         """Connects two rooms.
 
@@ -54,9 +157,98 @@ class World:
         :param str room_name_2: The name of the room to be connected.
         :param Direction direction: The direction to connect.
 
-        :raises: RoomDoesNotExist.
+        :raises: RoomDoesNotExist, UnsupportedDirection.
         """
         room1 = self.get_room(room_name_1)
         room2 = self.get_room(room_name_2)
+        self._check_direction(direction)
         room1.add_neighbor(direction, room2)
-        room2.add_neighbor(direction.get_opposite_direction(), room1)
+        room2.add_neighbor(direction.opposite, room1)
+
+    def connect_many(self, connections):
+        """Connects many pairs of rooms at once.
+
+        None of the rooms is connected if any of them does not exist.
+
+        :param iterable connections: Tuples of the names of the two rooms
+        and the direction from the first to the second.
+
+        :raises: RoomDoesNotExist, UnsupportedDirection.
+        """
+        get_room = self.get_room
+        resolved = [
+            (get_room(room_name_1), get_room(room_name_2), direction)
+            for room_name_1, room_name_2, direction in connections
+        ]
+        for _, _, direction in resolved:
+            self._check_direction(direction)
+        for room1, room2, direction in resolved:
+            room1.add_neighbor(direction, room2)
+            room2.add_neighbor(direction.opposite, room1)
+
+    def _check_direction(self, direction):
+        """Checks that the rooms can be connected in a direction.
+
+        :param Direction direction: The direction.
+
+        :raises: UnsupportedDirection.
+        """
+        if direction not in self.directions.slots:
+            raise UnsupportedDirection("{} does not support {}.".format(
+                self.directions.name, direction.name
+            ))
+
+    @property
+    def router(self):
+        """Returns the router finding the shortest paths between rooms.
+
+        :rtype: Router.
+        """
+        if self._router is None:
+            self._router = routing.Router()
+            self.add_graph_listener(self._router)
+        return self._router
+
+    @property
+    def analysis(self):
+        """Returns the analysis of the graph of the rooms.
+
+        The analysis is created on first access and then kept up to date
+        as the exits of the rooms change.
+
+        :rtype: GraphAnalysis.
+        """
+        if self._analysis is None:
+            import impl.analysis as analysis
+            self._analysis = analysis.GraphAnalysis(self)
+            self.add_graph_listener(self._analysis)
+        return self._analysis
+
+    def add_graph_listener(self, listener):
+        """Adds a listener to the changes of the exits of the rooms.
+
+        :param listener: An object implementing on_neighbor_added and
+        on_neighbor_removed, both receiving the room, the direction and the
+        neighbor.
+        """
+        self._graph_listeners.append(listener)
+
+    def on_neighbor_added(self, the_room, direction, neighbor):
+        """Notifies the graph listeners of a new exit.
+
+        :param Room the_room: The room that got a new exit.
+        :param Direction direction: The direction of the exit.
+        :param Room neighbor: The room the exit leads to.
+        """
+        for listener in self._graph_listeners:
+            listener.on_neighbor_added(the_room, direction, neighbor)
+
+    def on_neighbor_removed(self, the_room, direction, neighbor):
+        """Notifies the graph listeners of a removed exit.
+
+        :param Room the_room: The room that lost an exit.
+        :param Direction direction: The direction of the exit.
+        :param Room neighbor: The room the exit used to lead to.
+        """
+        for listener in self._graph_listeners:
+            listener.on_neighbor_removed(the_room, direction, neighbor)
@@ -1,6 +1,8 @@
 """Implements the first example of the exercise."""
 
 import impl.game as game
+import impl.goals as goals
+import impl.output as output
 import impl.player as player
 import impl.room as room
 import impl.world as world
@@ -16,18 +18,8 @@ Room = room.Room
 class MentoringPlayer(Player):
     """Specializes the Player class for the mentoring game."""
 
-    def have_won(self):
-        """Checks if the player has won the game.
-
-        To be re-implemented in derived Player classes.
-
-        :return: True if the player has won the game.
-        :rtype: bool.
-        """
-        if not self.has_already_visited('exam_room', 'mentoring-room'):
-            return False
-
-        return self.is_in_bag('textbook')
+    goal = goals.visited('exam_room', 'mentoring-room') & \
+        goals.has_item('textbook')
 
 
 class RestaurantRoom(Room):
@@ -108,7 +100,7 @@ def read_from_stdio():
 
 
 def write_to_stdio(msg):
-    """Writes a message to the standard output.
+    """Writes a message to the standard output without buffering it.
 
     :param str msg: The string to write.
     """
@@ -123,7 +115,7 @@ def main():
 
     the_game = Game(
         input_reader=read_from_stdio,
-        output_writer=write_to_stdio,
+        output_writer=output.make_stdio_writer(),
         the_player=the_player
     )
     the_game.play()